@@ -12,7 +12,7 @@ load_dotenv()
 from app.core.database import Base
 
 # Import ALL model files so Alembic can detect them
-from app.models import user, club, member, role, event, game, enums
+from app.models import user, club, member, role, event, game, enums, club_join_request
 
 # this is the Alembic Config object
 config = context.config
@@ -0,0 +1,45 @@
+"""Add club coordinates and earthdistance geo index
+
+Revision ID: 5624975d0103
+Revises: 4262084d8b6f
+Create Date: 2026-10-17 23:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5624975d0103'
+down_revision: Union[str, None] = '4262084d8b6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS cube")
+    op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance")
+
+    op.add_column('clubs', sa.Column('lat', sa.Float(), nullable=True))
+    op.add_column('clubs', sa.Column('lng', sa.Float(), nullable=True))
+
+    # backfill from the location JSON
+    op.execute("""
+        UPDATE clubs
+        SET lat = NULLIF(location->>'lat', '')::float,
+            lng = NULLIF(location->>'lng', '')::float
+        WHERE location IS NOT NULL
+    """)
+
+    # GiST index serves both the earth_box radius filter and <-> nearest-first ordering
+    op.execute("CREATE INDEX ix_clubs_earth_location ON clubs USING gist (ll_to_earth(lat, lng))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_clubs_earth_location")
+    op.drop_column('clubs', 'lng')
+    op.drop_column('clubs', 'lat')
@@ -0,0 +1,29 @@
+"""Add the shared SSE event id sequence
+
+Revision ID: a7d3e9b41c05
+Revises: f5b2d8c9a614
+Create Date: 2026-10-18 01:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9b41c05'
+down_revision: Union[str, None] = 'f5b2d8c9a614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE SEQUENCE sse_event_ids")
+    # start above the clock based ids (microseconds) clients may still send as Last-Event-ID
+    op.execute("SELECT setval('sse_event_ids', (extract(epoch from clock_timestamp()) * 1000000)::bigint)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP SEQUENCE IF EXISTS sse_event_ids")
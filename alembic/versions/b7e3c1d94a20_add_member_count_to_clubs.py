@@ -0,0 +1,38 @@
+"""Add member_count to clubs
+
+Revision ID: b7e3c1d94a20
+Revises: 5624975d0103
+Create Date: 2026-10-17 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3c1d94a20'
+down_revision: Union[str, None] = '5624975d0103'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('clubs', sa.Column('member_count', sa.Integer(), server_default='0', nullable=False))
+
+    # backfill from members
+    op.execute("""
+        UPDATE clubs
+        SET member_count = counts.total
+        FROM (SELECT club_id, COUNT(*) AS total FROM members GROUP BY club_id) AS counts
+        WHERE clubs.id = counts.club_id
+    """)
+    op.execute("UPDATE clubs SET status = 'FULL' WHERE member_count >= max_players AND status = 'ACTIVE'")
+    op.execute("UPDATE clubs SET status = 'ACTIVE' WHERE member_count < max_players AND status = 'FULL'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('clubs', 'member_count')
@@ -0,0 +1,69 @@
+"""Add club_join_requests table replacing clubs.pending_requests
+
+Revision ID: c41f8a6e2d57
+Revises: b7e3c1d94a20
+Create Date: 2026-10-18 00:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f8a6e2d57'
+down_revision: Union[str, None] = 'b7e3c1d94a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('club_join_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('club_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM('PENDING', 'ACCEPTED', 'REJECTED', name='requeststatusenum'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('club_id', 'user_id', name='uq_club_join_requests_club_user')
+    )
+    op.create_index(op.f('ix_club_join_requests_id'), 'club_join_requests', ['id'], unique=False)
+    op.create_index(op.f('ix_club_join_requests_user_id'), 'club_join_requests', ['user_id'], unique=False)
+
+    # backfill from the array (skip ids of users that no longer exist)
+    op.execute("""
+        INSERT INTO club_join_requests (club_id, user_id, status)
+        SELECT DISTINCT clubs.id, requests.user_id, 'PENDING'::requeststatusenum
+        FROM clubs, unnest(clubs.pending_requests) AS requests(user_id)
+        WHERE EXISTS (SELECT 1 FROM users WHERE users.id = requests.user_id)
+        ON CONFLICT ON CONSTRAINT uq_club_join_requests_club_user DO NOTHING
+    """)
+
+    op.drop_column('clubs', 'pending_requests')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('clubs', sa.Column('pending_requests', postgresql.ARRAY(sa.INTEGER()), autoincrement=False, nullable=True))
+    op.execute("""
+        UPDATE clubs
+        SET pending_requests = pending.user_ids
+        FROM (
+            SELECT club_id, array_agg(user_id ORDER BY created_at) AS user_ids
+            FROM club_join_requests
+            WHERE status = 'PENDING'
+            GROUP BY club_id
+        ) AS pending
+        WHERE clubs.id = pending.club_id
+    """)
+    # the old code appended to / searched the array, an empty one rather than NULL
+    op.execute("UPDATE clubs SET pending_requests = '{}' WHERE pending_requests IS NULL")
+    op.drop_index(op.f('ix_club_join_requests_user_id'), table_name='club_join_requests')
+    op.drop_index(op.f('ix_club_join_requests_id'), table_name='club_join_requests')
+    op.drop_table('club_join_requests')
+    op.execute("DROP TYPE IF EXISTS requeststatusenum")
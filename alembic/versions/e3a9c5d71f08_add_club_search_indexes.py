@@ -0,0 +1,42 @@
+"""Add trigram, full-text and prefix indexes for club search
+
+Revision ID: e3a9c5d71f08
+Revises: c41f8a6e2d57
+Create Date: 2026-10-17 23:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c5d71f08'
+down_revision: Union[str, None] = 'c41f8a6e2d57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # name ILIKE '%q%' and similarity ranking
+    op.execute("CREATE INDEX ix_clubs_name_trgm ON clubs USING gin (name gin_trgm_ops)")
+
+    # full-text over name + description (must match CLUB_SEARCH_VECTOR_SQL in app/models/club.py)
+    op.execute(
+        "CREATE INDEX ix_clubs_search_vector ON clubs "
+        "USING gin (to_tsvector('simple'::regconfig, name || ' ' || description))"
+    )
+
+    # autocomplete: lower(name) LIKE 'q%'
+    op.execute("CREATE INDEX ix_clubs_name_prefix ON clubs (lower(name) text_pattern_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_clubs_name_prefix")
+    op.execute("DROP INDEX IF EXISTS ix_clubs_search_vector")
+    op.execute("DROP INDEX IF EXISTS ix_clubs_name_trgm")
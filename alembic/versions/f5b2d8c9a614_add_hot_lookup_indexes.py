@@ -0,0 +1,89 @@
+"""Add foreign-key / lookup indexes and unique (club_id, user_id) on members
+
+Revision ID: f5b2d8c9a614
+Revises: e3a9c5d71f08
+Create Date: 2026-10-17 23:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b2d8c9a614'
+down_revision: Union[str, None] = 'e3a9c5d71f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def dedupe_members() -> None:
+    """Keep the oldest row of every duplicated (club_id, user_id) so the unique constraint can be added"""
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        "SELECT dup.id AS dup_id, keep.id AS keep_id, dup.club_id "
+        "FROM members dup JOIN members keep "
+        "ON keep.club_id = dup.club_id AND keep.user_id = dup.user_id AND keep.id < dup.id "
+        "WHERE NOT EXISTS (SELECT 1 FROM members older "
+        "WHERE older.club_id = dup.club_id AND older.user_id = dup.user_id AND older.id < keep.id)"
+    )).all()
+    if not duplicates:
+        return
+
+    # captains point at member ids, move them to the kept row
+    for row in duplicates:
+        bind.execute(
+            sa.text(
+                "UPDATE clubs SET captains_ids = array_replace(captains_ids, :dup_id, :keep_id) "
+                "WHERE id = :club_id AND :dup_id = ANY(captains_ids)"
+            ),
+            {"dup_id": row.dup_id, "keep_id": row.keep_id, "club_id": row.club_id}
+        )
+    # a captain kept twice after the replace
+    bind.execute(sa.text(
+        "UPDATE clubs SET captains_ids = ARRAY(SELECT DISTINCT unnest(captains_ids)) "
+        "WHERE id = ANY(:club_ids)"
+    ), {"club_ids": sorted({row.club_id for row in duplicates})})
+
+    bind.execute(sa.text("DELETE FROM members WHERE id = ANY(:ids)"), {"ids": [row.dup_id for row in duplicates]})
+
+    # duplicates were counted as seats too
+    bind.execute(sa.text(
+        "UPDATE clubs SET member_count = counts.total, "
+        "status = CASE WHEN clubs.status = 'FULL' AND counts.total < clubs.max_players "
+        "THEN 'ACTIVE'::clubstatusenum ELSE clubs.status END "
+        "FROM (SELECT club_id, count(*) AS total FROM members WHERE club_id = ANY(:club_ids) GROUP BY club_id) counts "
+        "WHERE clubs.id = counts.club_id"
+    ), {"club_ids": sorted({row.club_id for row in duplicates})})
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dedupe_members()
+
+    # join_club / leave_club existence checks and selectinload(Club.members) (club_id is the leading column)
+    op.create_unique_constraint('uq_members_club_user', 'members', ['club_id', 'user_id'])
+    # my-clubs: clubs the user is a member of
+    op.create_index(op.f('ix_members_user_id'), 'members', ['user_id'], unique=False)
+    # my-clubs / create_club: clubs the user owns
+    op.create_index(op.f('ix_clubs_admin_id'), 'clubs', ['admin_id'], unique=False)
+    op.create_index(op.f('ix_events_club_id'), 'events', ['club_id'], unique=False)
+    op.create_index(op.f('ix_games_event_id'), 'games', ['event_id'], unique=False)
+
+    # register: User.phone['number'].astext == ... (same expression as crud.user)
+    op.execute("CREATE INDEX ix_users_phone_number ON users ((phone ->> 'number'))")
+
+    # clubs a member captains: captains_ids @> ARRAY[member_id] (member_id = ANY(...) can't use it)
+    op.execute("CREATE INDEX ix_clubs_captains_ids ON clubs USING gin (captains_ids)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_clubs_captains_ids")
+    op.execute("DROP INDEX IF EXISTS ix_users_phone_number")
+    op.drop_index(op.f('ix_games_event_id'), table_name='games')
+    op.drop_index(op.f('ix_events_club_id'), table_name='events')
+    op.drop_index(op.f('ix_clubs_admin_id'), table_name='clubs')
+    op.drop_index(op.f('ix_members_user_id'), table_name='members')
+    op.drop_constraint('uq_members_club_user', 'members', type_='unique')
@@ -1,12 +1,15 @@
+import hmac
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_session
 from app.utils.security import verify_token
-from app.crud.user import get_user_by_id  
+from app.crud.user_async import AnySession, get_user_by_id  
 from app.models.user import User
 from app.core.logger import get_logger  
+from app.core.cache import principal_cache
+from app.core.config import settings
 
 logger = get_logger(__name__)  
 security = HTTPBearer()
@@ -14,9 +17,19 @@ security = HTTPBearer()
 DEBUG_TOKEN = "ori13690"
 DEBUG_USER_ID = 1
 
-def get_current_user(
+async def load_principal(db: AnySession, user_id: int):
+  """Return the cached principal for user_id, loading it from the db on a miss"""
+  user_data = principal_cache.get(user_id)
+  if user_data is not None:
+    return user_data
+  
+  user_data = await get_user_by_id(db, user_id)
+  principal_cache.set(user_id, user_data)
+  return user_data
+
+async def get_current_user(
   credentials: HTTPAuthorizationCredentials = Depends(security),
-  db: Session = Depends(get_db)
+  db: AnySession = Depends(get_session)
 ) -> User:
   logger.info(" Attempting to authenticate user via token")
   
@@ -27,12 +40,12 @@ def get_current_user(
   )
      # Debug mode bypass
   if credentials.credentials == DEBUG_TOKEN:
-    logger.info(f" DEBUG MODE: Using debug token for user ID: {DEBUG_USER_ID}")
-    user_data = get_user_by_id(db, DEBUG_USER_ID)
+    logger.info(" DEBUG MODE: Using debug token for user ID: %s", DEBUG_USER_ID)
+    user_data = await load_principal(db, DEBUG_USER_ID)
     if user_data is None:
-        logger.error(f"❌ DEBUG: User not found in database for ID: {DEBUG_USER_ID}")
+        logger.error("❌ DEBUG: User not found in database for ID: %s", DEBUG_USER_ID)
         raise credentials_exception
-    logger.info(f"✅ DEBUG: User authenticated successfully: {user_data.email} (ID: {DEBUG_USER_ID})")
+    logger.info("✅ DEBUG: User authenticated successfully: %s (ID: %s)", user_data.email, DEBUG_USER_ID)
     return user_data
   # check token
   user_id_str = verify_token(credentials.credentials)  
@@ -43,16 +56,34 @@ def get_current_user(
   # convert to int
   try:
       user_id = int(user_id_str)
-      logger.info(f" Token validated for user ID: {user_id}")
+      logger.info(" Token validated for user ID: %s", user_id)
   except ValueError:
-      logger.error(f"❌ Invalid user ID format in token: {user_id_str}")
+      logger.error("❌ Invalid user ID format in token: %s", user_id_str)
       raise credentials_exception
   
-  # search user
-  user_data = get_user_by_id(db, user_id)  
+  # search user (cached principal, see app/core/cache.py)
+  user_data = await load_principal(db, user_id)  
   if user_data is None:
-      logger.warning(f"❌ User not found in database for ID: {user_id}")
+      logger.warning("❌ User not found in database for ID: %s", user_id)
       raise credentials_exception
   
-  logger.info(f"✅ User authenticated successfully: {user_data.email} (ID: {user_id})")
-  return user_data
\ No newline at end of file
+  logger.info("✅ User authenticated successfully: %s (ID: %s)", user_data.email, user_id)
+  return user_data
+
+ADMIN_ROLE_ID = 5
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+  """site admins only (role 5) - debug/health endpoints"""
+  if current_user.role_id != ADMIN_ROLE_ID:
+      logger.warning("❌ User %s is not an admin", current_user.id)
+      raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+  return current_user
+
+async def require_metrics_access(
+  credentials: HTTPAuthorizationCredentials = Depends(security),
+  db: AnySession = Depends(get_session)
+):
+  """/metrics: the METRICS_TOKEN bearer (prometheus) or a site admin"""
+  if settings.METRICS_TOKEN and hmac.compare_digest(credentials.credentials, settings.METRICS_TOKEN):
+    return
+  await get_admin_user(await get_current_user(credentials, db))
@@ -1,18 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query,Header
-from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.core.database import get_db
-from app.crud import club as crud_club
+from app.core.database import get_session
+from app.crud import club_async as crud_club
+from app.crud.club_async import AnySession
 from app.models.user import User
 from app.schemas.club import ClubCreate, ClubFull
 from app.models.enums import SportCategoryEnum
-from app.utils.response import success_response, error_response
+from app.utils.response import success_response, error_response, json_response
 from app.api.deps import get_current_user
 from app.core.logger import get_logger
 
 # pubsub
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
+from app.core.cache import etag_matches
 from app.core.sse_manager import sse_manager
 import asyncio
 
@@ -20,16 +21,16 @@ logger = get_logger(__name__)
 router = APIRouter()
 
 @router.post("/")
-def create_club(
+async def create_club(
     club: ClubCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
-    logger.info(f"POST /clubs - Creating club: {club.name} by user: {current_user.email}")
+    logger.info("POST /clubs - Creating club: %s by user: %s", club.name, current_user.email)
     
     try:
-        result = crud_club.create_club(db, club, current_user)
-        logger.info(f"Club creation successful for: {current_user.email}")
+        result = await crud_club.create_club(db, club, current_user)
+        logger.info("Club creation successful for: %s", current_user.email)
         return success_response(
             data=result,
             message="Club created successfully",
@@ -41,27 +42,32 @@ def create_club(
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Club creation processing error: {e}")
+        logger.error("Club creation processing error: %s", e)
         return error_response(
             message=f"Failed to create club: {str(e)}",
             status=500
         )
 
 @router.get("/search")
-def search_clubs(
+async def search_clubs(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(get_session),
     name: Optional[str] = Query(None, description="Search by club name"),
-    sort_by: str = Query("name", description="Sort by: name, created_at, members_count, distance"),
+    sort_by: str = Query("name", description="Sort by: name, created_at, members_count, distance, relevance (with name)"),
     sport_category: Optional[SportCategoryEnum] = Query(None, description="Filter by sport category"),
     is_private: Optional[bool] = Query(None, description="Filter by privacy status"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return")
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    radius_km: Optional[float] = Query(None, gt=0, description="Only clubs within this distance (km) of the user"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    view: str = Query("summary", pattern="^(summary|full)$", description="summary: club cards, full: with members/admin/captains"),
+    fields: Optional[str] = Query(None, description="Comma separated summary fields, e.g. name,member_count"),
+    full_text: bool = Query(False, description="Also match words in the club description (with name)")
 ):
-    logger.info(f"GET /clubs/search - Search request by user: {current_user.email}")
+    logger.info("GET /clubs/search - Search request by user: %s", current_user.email)
     
     try:
-        result = crud_club.search_clubs(
+        result, next_cursor = await crud_club.search_clubs(
             current_user=current_user,
             db=db,
             name=name,
@@ -69,13 +75,19 @@ def search_clubs(
             sport_category=sport_category,
             is_private=is_private,
             skip=skip,
-            limit=limit
+            limit=limit,
+            radius_km=radius_km,
+            cursor=cursor,
+            view=view,
+            fields=fields,
+            full_text=full_text
         )
-        logger.info(f"Search completed for user: {current_user.email}")
-        return success_response(
+        logger.info("Search completed for user: %s", current_user.email)
+        return json_response(
             data=result,
             message="Clubs retrieved successfully",
-            status=200
+            status=200,
+            next_cursor=next_cursor
         )
     except HTTPException as e:
         return error_response(
@@ -83,25 +95,25 @@ def search_clubs(
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Search clubs processing error: {e}")
+        logger.error("Search clubs processing error: %s", e)
         return error_response(
             message=f"Failed to search clubs: {str(e)}",
             status=500
         )
 
-@router.get("/my-clubs")
-def get_my_clubs(
+# declared before /{club_id} so "autocomplete" isn't parsed as an id
+@router.get("/autocomplete")
+async def autocomplete_clubs(
+    q: str = Query(..., min_length=1, max_length=30, description="Start of the club name"),
+    limit: int = Query(10, ge=1, le=20, description="Maximum number of suggestions"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
-    logger.info(f"GET /clubs/my-clubs - Request by user: {current_user.email}")
-    
     try:
-        result = crud_club.get_user_clubs(db, current_user)
-        logger.info(f"User clubs retrieved for: {current_user.email}")
+        result = await crud_club.autocomplete_clubs(db, q.strip(), limit)
         return success_response(
             data=result,
-            message="User clubs retrieved successfully",
+            message="Suggestions retrieved successfully",
             status=200
         )
     except HTTPException as e:
@@ -110,51 +122,84 @@ def get_my_clubs(
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Get user clubs processing error: {e}")
+        logger.error("Autocomplete clubs processing error: %s", e)
+        return error_response(
+            message=f"Failed to autocomplete clubs: {str(e)}",
+            status=500
+        )
+
+@router.get("/my-clubs")
+async def get_my_clubs(
+    current_user: User = Depends(get_current_user),
+    db: AnySession = Depends(get_session),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match")
+):
+    logger.info("GET /clubs/my-clubs - Request by user: %s", current_user.email)
+    
+    try:
+        etag, payload = await crud_club.get_user_clubs_payload(db, current_user)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        
+        logger.info("User clubs retrieved for: %s", current_user.email)
+        # payload is already serialized, wrapped in the success_response envelope as is
+        body = '{"status": 200, "message": "User clubs retrieved successfully", "data": ' + payload + '}'
+        return Response(content=body, media_type="application/json", headers=headers)
+    except HTTPException as e:
+        return error_response(
+            message=e.detail,
+            status=e.status_code
+        )
+    except Exception as e:
+        logger.error("Get user clubs processing error: %s", e)
         return error_response(
             message=f"Failed to retrieve user clubs: {str(e)}",
             status=500
         )
 
 @router.get("/{club_id}")
-def get_club(
+async def get_club(
     club_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match")
 ):
-    logger.info(f"GET /clubs/{club_id} - Requested by: {current_user.email}")
+    logger.info("GET /clubs/%s - Requested by: %s", club_id, current_user.email)
     
     try:
-        result = crud_club.get_club_by_id(db, club_id)
-        logger.info(f"Club {club_id} retrieved for: {current_user.email}")
-        return success_response(
-            data=result,
-            message="Club retrieved successfully",
-            status=200
-        )
+        etag, payload = await crud_club.get_club_payload(db, club_id)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        
+        logger.info("Club %s retrieved for: %s", club_id, current_user.email)
+        # payload is already serialized, wrapped in the success_response envelope as is
+        body = '{"status": 200, "message": "Club retrieved successfully", "data": ' + payload + '}'
+        return Response(content=body, media_type="application/json", headers=headers)
     except HTTPException as e:
         return error_response(
             message=e.detail,
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Get club processing error: {e}")
+        logger.error("Get club processing error: %s", e)
         return error_response(
             message=f"Failed to retrieve club: {str(e)}",
             status=500
         )
 
 @router.post("/{club_id}/join")
-def join_club(
+async def join_club(
     club_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
-    logger.info(f"POST /clubs/{club_id}/join - Request by user: {current_user.email}")
+    logger.info("POST /clubs/%s/join - Request by user: %s", club_id, current_user.email)
     
     try:
-        result = crud_club.join_club(db, club_id, current_user)
-        logger.info(f"Join club {club_id} processed for: {current_user.email}")
+        result = await crud_club.join_club(db, club_id, current_user)
+        logger.info("Join club %s processed for: %s", club_id, current_user.email)
         
         message = "Join request sent successfully" if result.get("request_status") == "pending" else \
                  "Join request already pending" if result.get("request_status") == "already_pending" else \
@@ -173,24 +218,24 @@ def join_club(
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Join club processing error: {e}")
+        logger.error("Join club processing error: %s", e)
         return error_response(
             message=f"Failed to join club: {str(e)}",
             status=500
         )
 
 @router.post("/{club_id}/accept-request/{request_id}")
-def accept_request(
+async def accept_request(
     club_id: int,
     request_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
-    logger.info(f"POST /clubs/{club_id}/accept-request/{request_id} - Request by user: {current_user.email}")
+    logger.info("POST /clubs/%s/accept-request/%s - Request by user: %s", club_id, request_id, current_user.email)
     
     try:
-        result = crud_club.accept_request(db, club_id, current_user, request_id)
-        logger.info(f"Accept request {request_id} for club {club_id} processed by: {current_user.email}")
+        result = await crud_club.accept_request(db, club_id, current_user, request_id)
+        logger.info("Accept request %s for club %s processed by: %s", request_id, club_id, current_user.email)
         return success_response(
             data=result,
             message="Request accepted successfully",
@@ -202,27 +247,27 @@ def accept_request(
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Accept request processing error: {e}")
+        logger.error("Accept request processing error: %s", e)
         return error_response(
             message=f"Failed to accept request: {str(e)}",
             status=500
         )
 
 @router.delete("/{club_id}/leave")
-def leave_club(
+async def leave_club(
     club_id: int,
     user_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
-    logger.info(f"DELETE /clubs/{club_id}/leave - Request by user: {current_user.email}")
+    logger.info("DELETE /clubs/%s/leave - Request by user: %s", club_id, current_user.email)
     
     try:
-        result = crud_club.leave_club(db, club_id, current_user, user_id)
+        result = await crud_club.leave_club(db, club_id, current_user, user_id)
         
         message = f"User removed from club successfully" if user_id else "Successfully left the club"
         
-        logger.info(f"Leave club {club_id} processed for: {current_user.email}")
+        logger.info("Leave club %s processed for: %s", club_id, current_user.email)
         return success_response(
             data=result,
             message=message,
@@ -234,7 +279,7 @@ def leave_club(
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Leave club processing error: {e}")
+        logger.error("Leave club processing error: %s", e)
         return error_response(
             message=f"Failed to leave club: {str(e)}",
             status=500
@@ -244,17 +289,26 @@ def leave_club(
 # pubsub
 @router.get("/notifications/stream")
 async def club_notifications_stream(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
 ):
     """
     SSE endpoint for real-time club notifications
     מיועד לאדמינים שרוצים לקבל התראות על פעילות במועדונים שלהם
+    Reconnecting clients send Last-Event-ID and get the events they missed replayed.
     """
-    logger.info(f"SSE connection initiated by user: {current_user.email}")
+    logger.info("SSE connection initiated by user: %s", current_user.email)
+    
+    resume_from = None
+    if last_event_id:
+        try:
+            resume_from = int(last_event_id)
+        except ValueError:
+            logger.warning("Ignoring invalid Last-Event-ID %r from user %s", last_event_id, current_user.id)
     
     async def event_generator():
         # יצירת חיבור SSE עבור המשתמש
-        queue = await sse_manager.connect(current_user.id)
+        connection = await sse_manager.connect(current_user.id, last_event_id=resume_from)
         
         try:
             # שלח heartbeat ראשוני
@@ -263,7 +317,10 @@ async def club_notifications_stream(
             while True:
                 try:
                     # המתן לאירוע חדש (עם timeout של 30 שניות)
-                    event = await asyncio.wait_for(queue.get(), timeout=30.0)
+                    event = await asyncio.wait_for(connection.get(), timeout=30.0)
+                    if event is None:
+                        # closed as a slow consumer, the client reconnects
+                        break
                     yield event.to_sse_format()
                     
                 except asyncio.TimeoutError:
@@ -271,15 +328,15 @@ async def club_notifications_stream(
                     yield f"data: {{'type': 'heartbeat', 'timestamp': '{asyncio.get_event_loop().time()}'}}\n\n"
                     
                 except Exception as e:
-                    logger.error(f"Error in SSE event generator for user {current_user.id}: {e}")
+                    logger.error("Error in SSE event generator for user %s: %s", current_user.id, e)
                     break
                     
         except Exception as e:
-            logger.error(f"SSE connection error for user {current_user.id}: {e}")
+            logger.error("SSE connection error for user %s: %s", current_user.id, e)
         finally:
             # ניקוי החיבור
-            await sse_manager.disconnect(current_user.id, queue)
-            logger.info(f"SSE connection closed for user: {current_user.email}")
+            await sse_manager.disconnect(current_user.id, connection)
+            logger.info("SSE connection closed for user: %s", current_user.email)
     
     return StreamingResponse(
         event_generator(),
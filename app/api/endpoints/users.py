@@ -1,55 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional
 
-from app.core.database import get_db
-from app.crud import user as crud_user
+from app.core.database import get_session
+from app.crud import user_async as crud_user
+from app.crud.user_async import AnySession
 from app.models.user import User  
 from app.schemas.user import UserCreate, UserLogin, UserFull
 from app.utils.security import create_token
 from app.utils.response import success_response, error_response
 from app.api.deps import get_current_user
+from app.core.config import settings
 from app.core.logger import get_logger  
+from app.websocket.live_positions import live_positions
 
 logger = get_logger(__name__)  
 router = APIRouter()
 
 @router.post("/register")
-def register_user(
+async def register_user(
     user: UserCreate,
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
-    logger.info(f"POST /register - Registration attempt for: {user.email}")
+    logger.info("POST /register - Registration attempt for: %s", user.email)
     
     try:
-        result = crud_user.register(db, user)
-        logger.info(f"Registration successful for: {user.email}")
+        result = await crud_user.register(db, user)
+        logger.info("Registration successful for: %s", user.email)
         return success_response(
             data=result,
             message="User registered successfully",
             status=201
         )
     except HTTPException as e:
+        if e.status_code == 503:
+            # password pool saturated - a real 503 with Retry-After, not the 200 envelope
+            raise
         return error_response(
             message=e.detail,
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Registration processing error: {e}")
+        logger.error("Registration processing error: %s", e)
         return error_response(
             message=f"Registration failed: {str(e)}",
             status=500
         )
 
 @router.post("/login")
-def login_user(
+async def login_user(
     user_data: UserLogin,
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
-    logger.info(f"POST /login - Login attempt for: {user_data.email}")
+    logger.info("POST /login - Login attempt for: %s", user_data.email)
     
     try:
-        user = crud_user.login(db, user_data.email, user_data.password)
+        user = await crud_user.login(db, user_data.email, user_data.password)
         token = create_token(str(user.id))
         
         login_data = {
@@ -58,7 +63,7 @@ def login_user(
             "user": user
         }
         
-        logger.info(f"Login successful for: {user_data.email} (ID: {user.id})")
+        logger.info("Login successful for: %s (ID: %s)", user_data.email, user.id)
         return success_response(
             data=login_data,
             message="Login successful",
@@ -66,20 +71,23 @@ def login_user(
         )
         
     except HTTPException as e:
+        if e.status_code == 503:
+            # password pool saturated - a real 503 with Retry-After, not the 200 envelope
+            raise
         return error_response(
             message=e.detail,
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Login processing error: {e}")
+        logger.error("Login processing error: %s", e)
         return error_response(
             message=f"Login processing failed: {str(e)}",
             status=500
         )
 
 @router.get("/auth")
-def auth(current_user: User = Depends(get_current_user)):
-    logger.info(f"GET /users/auth - User: {current_user.email}")
+async def auth(current_user: User = Depends(get_current_user)):
+    logger.info("GET /users/auth - User: %s", current_user.email)
     
     return success_response(
         data=current_user,
@@ -89,21 +97,23 @@ def auth(current_user: User = Depends(get_current_user)):
 
 
 @router.get("/")
-def get_all_users(
+async def get_all_users(
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    db: AnySession = Depends(get_session)
 ):
-    logger.info(f"GET /users - Fetching users (skip={skip}, limit={limit}) by user: {current_user.email}")
+    logger.info("GET /users - Fetching users (skip=%s, limit=%s, cursor=%s) by user: %s", skip, limit, cursor is not None, current_user.email)
     
     try:
-        result = crud_user.get_all_users(db, skip=skip, limit=limit)
-        logger.info(f"Successfully returned users to: {current_user.email}")
+        result, next_cursor = await crud_user.get_all_users(db, skip=skip, limit=limit, cursor=cursor)
+        logger.info("Successfully returned users to: %s", current_user.email)
         return success_response(
             data=result,
             message="Users retrieved successfully",
-            status=200
+            status=200,
+            next_cursor=next_cursor
         )
     except HTTPException as e:
         return error_response(
@@ -111,23 +121,57 @@ def get_all_users(
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Get users processing error: {e}")
+        logger.error("Get users processing error: %s", e)
         return error_response(
             message=f"Failed to retrieve users: {str(e)}",
             status=500
         )
 
+# declared before /{user_id} so "nearby" isn't parsed as an id
+@router.get("/nearby")
+async def get_nearby_players(
+    radius_km: float = Query(2.0, gt=0),
+    limit: int = Query(50, gt=0, le=500),
+    current_user: User = Depends(get_current_user)
+):
+    """live players around the current user, from the in-memory position store"""
+    logger.info("GET /users/nearby - radius=%skm by user: %s", radius_km, current_user.email)
+    
+    # live position first, stored location as a fallback
+    position = live_positions.get(current_user.id)
+    if position is not None:
+        lat, lng, _ = position
+    elif current_user.location and current_user.location.get('lat') is not None and current_user.location.get('lng') is not None:
+        lat, lng = current_user.location['lat'], current_user.location['lng']
+    else:
+        return error_response(
+            message="User location is required for nearby search",
+            status=400
+        )
+    
+    players = live_positions.nearby(
+        lat, lng,
+        min(radius_km, settings.LIVE_NEARBY_MAX_RADIUS_KM),
+        limit=limit,
+        exclude_user_id=current_user.id
+    )
+    return success_response(
+        data=players,
+        message="Nearby players retrieved successfully",
+        status=200
+    )
+
 @router.get("/{user_id}")
-def get_user(
+async def get_user(
     user_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
-    logger.info(f"GET /users/{user_id} - Requested by: {current_user.email}")
+    logger.info("GET /users/%s - Requested by: %s", user_id, current_user.email)
     
     try:
-        result = crud_user.get_user_by_id(db, user_id)
-        logger.info(f"Successfully returned user {user_id} to: {current_user.email}")
+        result = await crud_user.get_user_by_id(db, user_id)
+        logger.info("Successfully returned user %s to: %s", user_id, current_user.email)
         return success_response(
             data=result,
             message="User retrieved successfully",
@@ -139,31 +183,31 @@ def get_user(
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Get user processing error: {e}")
+        logger.error("Get user processing error: %s", e)
         return error_response(
             message=f"Failed to retrieve user: {str(e)}",
             status=500
         )
 
 @router.put("/role")
-def change_role(
+async def change_role(
     user_id: int,
     new_role_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_session)
 ):
-    logger.info(f"PUT /role - Changing role for user {user_id} to {new_role_id} by: {current_user.email}")
+    logger.info("PUT /role - Changing role for user %s to %s by: %s", user_id, new_role_id, current_user.email)
     
     if user_id != current_user.id and current_user.role_id != 5:
-        logger.warning(f"Unauthorized attempt to change role for user {user_id} by: {current_user.email}")
+        logger.warning("Unauthorized attempt to change role for user %s by: %s", user_id, current_user.email)
         return error_response(
             message="Unauthorized to change role",
             status=403
         )
     
     try:
-        result = crud_user.change_role(db, user_id, new_role_id)
-        logger.info(f"Successfully changed role for user {user_id} to {new_role_id} by: {current_user.email}")
+        result = await crud_user.change_role(db, user_id, new_role_id)
+        logger.info("Successfully changed role for user %s to %s by: %s", user_id, new_role_id, current_user.email)
         return success_response(
             data=result,
             message="Role changed successfully",
@@ -175,7 +219,7 @@ def change_role(
             status=e.status_code
         )
     except Exception as e:
-        logger.error(f"Change role processing error: {e}")
+        logger.error("Change role processing error: %s", e)
         return error_response(
             message=f"Failed to change role: {str(e)}",
             status=500
@@ -0,0 +1,310 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 60.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # Format: {key: (expires_at, value)}, oldest first
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None if missing/expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Live value without touching the LRU order or the hit/miss counters"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def replace(self, key: Hashable, update: Callable[[Any], Any]) -> bool:
+        """
+        Swap a live entry for update(value), keeping its expiry and LRU position.
+        Readers holding the old value keep it unchanged. False if missing/expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return False
+            self._entries[key] = (entry[0], update(entry[1]))
+            return True
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+# Authenticated principals (UserFull) keyed by user id, used by get_current_user
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+class CacheBackend:
+    """String key/value store behind ClubPayloadCache"""
+
+    # blocking backends (network) are called from the threadpool in async code
+    blocking = False
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process LRU (TTLCache), versions are plain counters"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._values = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._counters:
+                return str(self._counters[key])
+        return self._values.get(key)
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        self._values.set(key, value, ttl_seconds=ttl_seconds)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return self._values.stats()
+
+class RedisCacheBackend(CacheBackend):
+    """Shared between workers, takes a redis.Redis-like client"""
+
+    blocking = True
+
+    def __init__(self, client):
+        self.client = client
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        self.client.set(key, value, ex=max(int(ttl_seconds), 1))
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class ClubPayloadCache:
+    """
+    Serialized ClubFull payloads keyed by club id + version. Writes bump the
+    version (invalidate) so stale payloads are never read again and just expire.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float = 300.0, prefix: str = "club"):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def _version_key(self, club_id: int) -> str:
+        return f"{self.prefix}:{club_id}:version"
+
+    def version(self, club_id: int) -> int:
+        return int(self.backend.get(self._version_key(club_id)) or 0)
+
+    def get(self, club_id: int, version: int) -> Optional[Tuple[str, str]]:
+        """(etag, payload) of the given version, None on a miss"""
+        entry = self.backend.get(f"{self.prefix}:{club_id}:v{version}")
+        if entry is None:
+            return None
+        etag, _, payload = entry.partition("\n")
+        return etag, payload
+
+    def set(self, club_id: int, version: int, payload: str) -> str:
+        """Store the payload under the version read before loading it, returns its ETag"""
+        etag = make_etag(payload)
+        self.backend.set(f"{self.prefix}:{club_id}:v{version}", f"{etag}\n{payload}", self.ttl_seconds)
+        return etag
+
+    def invalidate(self, club_id: int):
+        try:
+            self.backend.incr(self._version_key(club_id))
+        except Exception as e:
+            logger.error("Failed to invalidate cached club %s: %s", club_id, e)
+
+    async def run(self, fn, *args):
+        """Call a cache method from async code without blocking the loop on network backends"""
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self.backend).__name__, "ttl_seconds": self.ttl_seconds, **self.backend.stats()}
+
+class UserClubsCache:
+    """
+    Serialized /clubs/my-clubs payloads per user. An entry stays valid while the
+    user's membership version and the club_cache version of every club in it are
+    unchanged, so membership changes (invalidate) and club writes both retire it.
+    """
+
+    def __init__(self, club_cache: ClubPayloadCache, ttl_seconds: float = 60.0, prefix: str = "user_clubs"):
+        self.club_cache = club_cache
+        self.backend = club_cache.backend  # same store, versions of the clubs are read from it
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def _version_key(self, user_id: int) -> str:
+        return f"{self.prefix}:{user_id}:version"
+
+    def version(self, user_id: int) -> int:
+        return int(self.backend.get(self._version_key(user_id)) or 0)
+
+    def get(self, user_id: int, version: int) -> Optional[Tuple[str, str]]:
+        """(etag, payload) of the given version, None on a miss or if one of its clubs changed"""
+        entry = self.backend.get(f"{self.prefix}:{user_id}:v{version}")
+        if entry is None:
+            return None
+        # Format: etag\nclub_id:version,club_id:version\npayload
+        etag, _, rest = entry.partition("\n")
+        club_versions, _, payload = rest.partition("\n")
+        for pair in filter(None, club_versions.split(",")):
+            club_id, club_version = pair.split(":")
+            if self.club_cache.version(int(club_id)) != int(club_version):
+                return None
+        return etag, payload
+
+    def set(self, user_id: int, version: int, club_ids: List[int], payload: str) -> str:
+        """
+        Store the payload under the user version read before loading it, returns its ETag.
+        Club versions are read after the load (the ids aren't known before), a club write
+        racing with the load can be served until the TTL at worst.
+        """
+        etag = make_etag(payload)
+        club_versions = ",".join(f"{club_id}:{self.club_cache.version(club_id)}" for club_id in club_ids)
+        self.backend.set(f"{self.prefix}:{user_id}:v{version}", f"{etag}\n{club_versions}\n{payload}", self.ttl_seconds)
+        return etag
+
+    def invalidate(self, user_id: int):
+        try:
+            self.backend.incr(self._version_key(user_id))
+        except Exception as e:
+            logger.error("Failed to invalidate cached clubs of user %s: %s", user_id, e)
+
+    async def run(self, fn, *args):
+        return await self.club_cache.run(fn, *args)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self.backend).__name__, "ttl_seconds": self.ttl_seconds}
+
+def make_etag(payload: str) -> str:
+    return '"' + hashlib.sha1(payload.encode()).hexdigest()[:20] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match can hold several (possibly weak) tags or *"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def create_cache_backend() -> CacheBackend:
+    """Backend selected by CLUB_CACHE_BACKEND (memory | redis)"""
+    if settings.CLUB_CACHE_BACKEND == "redis":
+        import redis  # optional dependency, only needed for this backend
+
+        return RedisCacheBackend(redis.Redis.from_url(settings.REDIS_URL))
+    return InMemoryCacheBackend(max_size=settings.CLUB_CACHE_MAX_SIZE, ttl_seconds=settings.CLUB_CACHE_TTL_SECONDS)
+
+
+# Serialized GET /clubs/{club_id} payloads, invalidated by the club CRUD writes
+club_cache = ClubPayloadCache(create_cache_backend(), ttl_seconds=settings.CLUB_CACHE_TTL_SECONDS)
+
+# Serialized GET /clubs/my-clubs payloads, invalidated on membership changes and club writes
+user_clubs_cache = UserClubsCache(club_cache, ttl_seconds=settings.USER_CLUBS_CACHE_TTL_SECONDS)
@@ -1,6 +1,8 @@
 from sqlalchemy import create_engine, text  
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.core.logger import get_logger
@@ -13,14 +15,40 @@ def create_database_engine():
             settings.DATABASE_URL, 
             echo=False,  
             pool_pre_ping=True,  #check the connection before use
-            pool_size=10,  
-            max_overflow=20  
+            pool_size=settings.DB_POOL_SIZE,  
+            max_overflow=settings.DB_MAX_OVERFLOW  
         )
         logger.info("Successfully connected to the database")
         return engine
     
     except Exception as e:
-        logger.error(f"Error connecting to the database: {e}", exc_info=True)
+        logger.error("Error connecting to the database: %s", e, exc_info=True)
+        raise
+
+def get_async_database_url() -> str:
+    """asyncpg url, derived from DATABASE_URL unless set explicitly"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = settings.DATABASE_URL
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+def create_async_database_engine():
+    try:
+        engine = create_async_engine(
+            get_async_database_url(),
+            echo=False,
+            pool_pre_ping=True,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW
+        )
+        logger.info("Successfully created the async database engine")
+        return engine
+    
+    except Exception as e:
+        logger.error("Error creating the async database engine: %s", e, exc_info=True)
         raise
 
 #create the engine
@@ -33,6 +61,14 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+#async engine + session, only when enabled (asyncpg is not needed otherwise)
+async_engine = create_async_database_engine() if settings.USE_ASYNC_DB else None
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=True
+) if async_engine is not None else None
+
 #base for the models
 Base = declarative_base()
 
@@ -45,4 +81,24 @@ def get_db():
         raise
     finally:
         db.close()
-        
\ No newline at end of file
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            raise
+
+#the session dependency used by the routers (sync or async by config)
+get_session = get_async_db if settings.USE_ASYNC_DB else get_db
+
+async def run_in_session(db, fn):
+    """
+    Run a sync CRUD callable fn(session) against either session type.
+    AsyncSession: runs through run_sync on the asyncpg engine (no threadpool slot).
+    Session: runs in the threadpool, same as a plain def endpoint.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn)
+    return await run_in_threadpool(fn, db)
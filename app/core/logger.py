@@ -1,17 +1,105 @@
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.config import settings
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes, everything else on a record came from extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, extra={...} fields are kept as keys"""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a fraction of the INFO/DEBUG lines of hot-path loggers, warnings and errors always pass"""
+
+    def __init__(self, rate: float, logger_names):
+        super().__init__()
+        self.rate = rate
+        self.logger_names = tuple(logger_names)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        if not record.name.startswith(self.logger_names):
+            return True
+        return random.random() < self.rate
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Only merges msg % args here (args can be ORM objects that shouldn't be touched
+    from another thread), the formatting and I/O happen on the listener thread.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
 
 def setup_logging():
-    logging.basicConfig(
-        level=logging.INFO, 
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',  
-        handlers=[ #where the logs 
-            logging.StreamHandler(sys.stdout),  #for the console
-            logging.FileHandler('app.log', encoding='utf-8')  #for log file
-        ]
-    )
+    """
+    Request threads / the event loop only put records on a queue, a QueueListener
+    thread formats them and does the console/file I/O.
+    """
+    global _listener
+
+    formatter = JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]  #for the console
+    if settings.LOG_FILE:
+        handlers.append(logging.FileHandler(settings.LOG_FILE, encoding='utf-8'))  #for log file
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    if settings.LOG_SAMPLED_LOGGERS:
+        queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATE, settings.LOG_SAMPLED_LOGGERS))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Flush whatever is still queued (called at exit)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
-setup_logging() 
+setup_logging()
 
 def get_logger(name):
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
@@ -0,0 +1,227 @@
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def label_set(**labels) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = ",".join(f'{key}="{value}"'.replace("\n", " ") for key, value in pairs)
+    return "{" + escaped + "}"
+
+
+class Histogram:
+    """Prometheus style cumulative histogram, one series per label set"""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # Format: {labels: [bucket counts..., +Inf count, sum]}
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = label_set(**labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            for index, bound in enumerate(self.buckets):
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', str(bound)))} {series[index]}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {series[len(self.buckets)]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[len(self.buckets)]}")
+        return lines
+
+
+class CounterMetric:
+    """Monotonic counter, one series per label set"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = label_set(**labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(label_set(**labels), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for key, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+GaugeValue = Union[float, Dict[Labels, float]]
+
+class MetricsRegistry:
+    """Histograms/counters recorded by the app plus gauges read on every scrape"""
+
+    def __init__(self):
+        self._metrics: List[Union[Histogram, CounterMetric]] = []
+        # Format: [(name, help, callback)]
+        self._gauges: List[Tuple[str, str, Callable[[], GaugeValue]]] = []
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...]) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str) -> CounterMetric:
+        metric = CounterMetric(name, help_text)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, callback: Callable[[], GaugeValue]):
+        """callback returns a number, or {labels: number} for labelled series"""
+        self._gauges.append((name, help_text, callback))
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, help_text, callback in self._gauges:
+            try:
+                value = callback()
+            except Exception as e:
+                logger.warning("Failed to read gauge %s: %s", name, e)
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            if isinstance(value, dict):
+                for key, series_value in sorted(value.items()):
+                    lines.append(f"{name}{_format_labels(key)} {series_value}")
+            else:
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+request_latency = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route template", LATENCY_BUCKETS
+)
+request_queries = registry.histogram(
+    "db_queries_per_request", "SQL statements executed per request", QUERY_COUNT_BUCKETS
+)
+request_db_time = registry.histogram(
+    "db_time_per_request_seconds", "Time spent in SQL per request", LATENCY_BUCKETS
+)
+n_plus_one_total = registry.counter(
+    "db_n_plus_one_total", "Requests that ran more queries than METRICS_N_PLUS_ONE_THRESHOLD"
+)
+
+
+class RequestStats:
+    """Per-request db counters, shared by the request task and its threadpool calls"""
+
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # on the execution context, not a per-connection stack: a failing statement never
+    # reaches after_cursor_execute and would shift every later pairing
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+def _record_query(context, statement):
+    started = getattr(context, "_query_start", None)
+    stats = current_request_stats.get()
+    if started is None or stats is None:
+        return
+    stats.queries += 1
+    stats.db_seconds += time.perf_counter() - started
+    stats.statements[statement] += 1
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(context, statement)
+
+def _handle_error(exception_context):
+    # failed statements cost db time too
+    if exception_context.execution_context is not None and exception_context.statement is not None:
+        _record_query(exception_context.execution_context, exception_context.statement)
+
+def instrument_engine(engine):
+    """Count queries and db time of the current request (sync engine or AsyncEngine.sync_engine)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+
+def record_request(method: str, route: str, status_code: int, elapsed: float, stats: RequestStats):
+    """Store the timings of a finished request and flag N+1 patterns"""
+    request_latency.observe(elapsed, method=method, route=route, status=status_code)
+    request_queries.observe(stats.queries, method=method, route=route)
+    request_db_time.observe(stats.db_seconds, method=method, route=route)
+
+    if stats.queries > settings.METRICS_N_PLUS_ONE_THRESHOLD:
+        n_plus_one_total.inc(method=method, route=route)
+        statement, repeats = stats.statements.most_common(1)[0]
+        logger.warning(
+            "Possible N+1 on %s %s: %s queries (%.1f ms in db), most repeated x%s: %s",
+            method, route, stats.queries, stats.db_seconds * 1000, repeats, " ".join(statement.split())[:200]
+        )
+
+async def metrics_middleware(request, call_next):
+    """Latency / query count per route template (the path with {params}, keeps label cardinality low)"""
+    stats = RequestStats()
+    token = current_request_stats.set(stats)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        current_request_stats.reset(token)
+        route = request.scope.get("route")
+        record_request(request.method, getattr(route, "path", "unmatched"), status_code, elapsed, stats)
@@ -0,0 +1,162 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# a batch of (user_id, event dict) pairs handed to SSEManager for local delivery
+DeliverBatch = Callable[[List[Tuple[int, dict]]], Awaitable[None]]
+
+# pg_notify payloads are capped at 8000 bytes
+MAX_NOTIFY_PAYLOAD = 7900
+
+# event ids shared by every worker (see migration a7d3e9b41c05), per-process clocks drift apart
+EVENT_ID_SEQUENCE = "sse_event_ids"
+
+class SSEBackend:
+    """Pub/sub transport between publishers (any worker) and the workers holding the streams"""
+
+    def attach(self, deliver: DeliverBatch):
+        """Set the callback that fans a batch out to this process' connections"""
+        self._deliver = deliver
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @property
+    def assigns_event_ids(self) -> bool:
+        """True when publish() gives id-less events a globally ordered id itself"""
+        return False
+
+    async def publish(self, user_id: int, event: dict):
+        raise NotImplementedError
+
+class InMemoryBackend(SSEBackend):
+    """Single process: publish delivers straight to the local connections"""
+
+    async def publish(self, user_id: int, event: dict):
+        await self._deliver([(user_id, event)])
+
+class PostgresNotifyBackend(SSEBackend):
+    """
+    Multi worker / multi node: publish does pg_notify, every worker LISTENs on the
+    channel and delivers to its own connections. Notifications are buffered and
+    handed over in one batch per flush interval.
+    """
+
+    def __init__(self, dsn: str, channel: str, batch_interval: float = 0.01):
+        self.dsn = dsn
+        self.channel = channel
+        self.batch_interval = batch_interval
+        self._listen_conn = None
+        self._publish_pool = None
+        self._pending: List[Tuple[int, dict]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._stopping = False
+
+    async def start(self):
+        import asyncpg  # optional dependency, only needed for this backend
+
+        self._stopping = False
+        self._publish_pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=4)
+        await self._listen()
+        logger.info("SSE postgres backend listening on channel %s", self.channel)
+
+    async def _listen(self):
+        import asyncpg
+
+        self._listen_conn = await asyncpg.connect(self.dsn)
+        self._listen_conn.add_termination_listener(self._on_terminated)
+        await self._listen_conn.add_listener(self.channel, self._on_notify)
+
+    def _on_terminated(self, connection):
+        if self._stopping:
+            return
+        logger.warning("SSE postgres listener connection lost, reconnecting")
+        asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 0.5
+        while not self._stopping:
+            try:
+                await self._listen()
+                logger.info("SSE postgres listener reconnected")
+                return
+            except Exception as e:
+                logger.error("SSE postgres listener reconnect failed: %s", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    async def stop(self):
+        self._stopping = True
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush()
+        if self._listen_conn is not None:
+            await self._listen_conn.close()
+            self._listen_conn = None
+        if self._publish_pool is not None:
+            await self._publish_pool.close()
+            self._publish_pool = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+            self._pending.append((int(message["user_id"]), message["event"]))
+        except Exception as e:
+            logger.error("Dropping malformed SSE notification: %s", e)
+            return
+
+        # first notification of a batch schedules the flush
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.batch_interval, self._flush)
+
+    @property
+    def assigns_event_ids(self) -> bool:
+        return self._publish_pool is not None
+
+    def _flush(self):
+        self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._deliver(batch))
+
+    async def publish(self, user_id: int, event: dict):
+        payload = json.dumps({"user_id": user_id, "event": event})
+        if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+            logger.error("SSE event %s for user %s is too large for NOTIFY, dropped", event.get("event_type"), user_id)
+            return
+
+        if self._publish_pool is None:
+            # not started (e.g. scripts/tests) - behave like the in-memory backend
+            logger.warning("SSE postgres backend not started, delivering locally")
+            await self._deliver([(user_id, event)])
+            return
+
+        if event.get("id") is not None:
+            await self._publish_pool.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            return
+        # id from the shared sequence, set into the payload in the same round trip
+        await self._publish_pool.execute(
+            "SELECT pg_notify($1, jsonb_set($2::jsonb, '{event,id}', to_jsonb(nextval($3::regclass)))::text)",
+            self.channel, payload, EVENT_ID_SEQUENCE
+        )
+
+def create_sse_backend() -> SSEBackend:
+    """Backend selected by SSE_BACKEND (memory | postgres)"""
+    if settings.SSE_BACKEND == "postgres":
+        # asyncpg takes a plain postgresql:// dsn
+        dsn = (settings.SSE_DATABASE_URL or settings.DATABASE_URL).replace("+psycopg2", "").replace("+asyncpg", "")
+        return PostgresNotifyBackend(
+            dsn=dsn,
+            channel=settings.SSE_NOTIFY_CHANNEL,
+            batch_interval=settings.SSE_BATCH_INTERVAL_SECONDS
+        )
+    return InMemoryBackend()
@@ -1,14 +1,25 @@
 import asyncio
 import json
-from typing import Dict, List, Any
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+from app.core.config import settings
+from app.core.sse_backends import SSEBackend, create_sse_backend
+from app.core.logger import get_logger
+from app.core.metrics import registry
+
+logger = get_logger(__name__)
+
 @dataclass
 class SSEEvent:
     event_type: str
     data: Dict[str, Any]
     timestamp: datetime = None
+    id: Optional[int] = None  # assigned when published, sent as the SSE id: field
     
     def __post_init__(self):
         if self.timestamp is None:
@@ -16,51 +27,316 @@ class SSEEvent:
     
     def to_sse_format(self) -> str:
         """Convert event to SSE format"""
-        return f"data: {json.dumps({'type': self.event_type, 'data': self.data, 'timestamp': self.timestamp.isoformat()})}\n\n"
+        data = f"data: {json.dumps({'type': self.event_type, 'data': self.data, 'timestamp': self.timestamp.isoformat()})}\n\n"
+        if self.id is None:
+            return data
+        return f"id: {self.id}\n{data}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Wire format for the pub/sub backend"""
+        return {"id": self.id, "event_type": self.event_type, "data": self.data, "timestamp": self.timestamp.isoformat()}
+    
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "SSEEvent":
+        return cls(
+            event_type=payload["event_type"],
+            data=payload["data"],
+            timestamp=datetime.fromisoformat(payload["timestamp"]),
+            id=payload.get("id")
+        )
 
-class SSEManager:
+class EventIdGenerator:
+    """
+    Monotonic event ids seeded from the wall clock (microseconds), so ids keep
+    increasing across restarts. Only ordered within one process: with several workers
+    the postgres backend takes ids from a shared sequence instead.
+    """
+    
     def __init__(self):
+        self._last = 0
+        self._lock = threading.Lock()
+    
+    def next(self) -> int:
+        with self._lock:
+            self._last = max(self._last + 1, time.time_ns() // 1000)
+            return self._last
+
+class ReplayBuffer:
+    """Last N events per user for Last-Event-ID resume, LRU-bounded on the number of users"""
+    
+    def __init__(self, size: int = 100, max_users: int = 10000):
+        self.size = size
+        self.max_users = max_users
+        # Format: {user_id: deque of SSEEvent}, least recently used first
+        self._events: "OrderedDict[int, Deque[SSEEvent]]" = OrderedDict()
+        # Format: {user_id: id of the newest event pushed out of the ring}
+        self._evicted_up_to: Dict[int, int] = {}
+    
+    def append(self, user_id: int, event: SSEEvent):
+        if event.id is None:
+            return
+        
+        events = self._events.get(user_id)
+        if events is None:
+            events = self._events[user_id] = deque(maxlen=self.size)
+            while len(self._events) > self.max_users:
+                evicted_user, _ = self._events.popitem(last=False)
+                self._evicted_up_to.pop(evicted_user, None)
+        else:
+            self._events.move_to_end(user_id)
+        
+        if len(events) == events.maxlen:
+            self._evicted_up_to[user_id] = events[0].id
+        events.append(event)
+    
+    def since(self, user_id: int, last_event_id: int) -> Tuple[List[SSEEvent], bool]:
+        """Events after last_event_id and whether some were already evicted (gap)"""
+        events = self._events.get(user_id)
+        if not events:
+            return [], False
+        
+        # arrival order, not id order: a publish that took a lower id can still arrive after
+        # the client's last event (concurrent publishers), comparing ids would skip it
+        for index in range(len(events) - 1, -1, -1):
+            if events[index].id == last_event_id:
+                return list(events)[index + 1:], False
+        
+        missed = [event for event in events if event.id > last_event_id]
+        gap = self._evicted_up_to.get(user_id, 0) > last_event_id
+        return missed, gap
+    
+    def __len__(self) -> int:
+        return len(self._events)
+
+# overflow policies for a full connection buffer
+DROP_OLDEST = "drop_oldest"   # drop the oldest buffered event
+COALESCE = "coalesce"         # newest event replaces a buffered one of the same type (else drop oldest)
+DISCONNECT = "disconnect"     # close the slow consumer, the client reconnects
+OVERFLOW_POLICIES = (DROP_OLDEST, COALESCE, DISCONNECT)
+
+# process wide, streams that already closed still count (the per-stream "dropped" resets with the stream)
+sse_dropped_events = registry.counter("sse_dropped_events_total", "SSE events dropped by the overflow policy")
+
+class SSEConnection:
+    """One SSE stream: bounded buffer, overflow policy and lag metrics"""
+    
+    def __init__(self, user_id: int, maxsize: int = 100, policy: str = DROP_OLDEST):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown SSE overflow policy: {policy}")
+        self.user_id = user_id
+        self.maxsize = maxsize
+        self.policy = policy
+        self.closed = False
+        # Format: deque of (enqueued_at, event), oldest first
+        self._buffer: Deque[Tuple[float, SSEEvent]] = deque()
+        # control event (stream:resync) delivered before the buffer, never dropped by the overflow policy
+        self._control: Optional[SSEEvent] = None
+        self._ready = asyncio.Event()
+        
+        # metrics
+        self.connected_at = time.monotonic()
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.last_lag_seconds = 0.0
+    
+    def offer(self, event: SSEEvent) -> bool:
+        """Non-blocking enqueue. Returns False if the connection was closed as a slow consumer."""
+        if self.closed:
+            return False
+        
+        if len(self._buffer) >= self.maxsize:
+            if self.policy == DISCONNECT:
+                self.dropped += len(self._buffer) + 1
+                sse_dropped_events.inc(len(self._buffer) + 1, policy=self.policy)
+                self.close()
+                return False
+            if self.policy == COALESCE and self._replace_same_type(event):
+                self.coalesced += 1
+                return True
+            self._buffer.popleft()
+            self.dropped += 1
+            sse_dropped_events.inc(policy=self.policy)
+        
+        self._buffer.append((time.monotonic(), event))
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, len(self._buffer))
+        self._ready.set()
+        return True
+    
+    def _replace_same_type(self, event: SSEEvent) -> bool:
+        """Drop the oldest buffered event of the same type and append the new one"""
+        for index, (_, buffered) in enumerate(self._buffer):
+            if buffered.event_type == event.event_type:
+                del self._buffer[index]
+                self._buffer.append((time.monotonic(), event))
+                return True
+        return False
+    
+    def offer_control(self, event: SSEEvent):
+        """Queue a control event ahead of the buffered ones, outside maxsize and the overflow policy"""
+        if self.closed:
+            return
+        self._control = event
+        self._ready.set()
+    
+    async def get(self) -> Optional[SSEEvent]:
+        """Wait for the next event, None once the connection is closed"""
+        while not self._buffer and self._control is None:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        
+        if self._control is not None:
+            event, self._control = self._control, None
+            self.delivered += 1
+            return event
+        
+        enqueued_at, event = self._buffer.popleft()
+        self.last_lag_seconds = time.monotonic() - enqueued_at
+        self.delivered += 1
+        return event
+    
+    def close(self):
+        self.closed = True
+        self._buffer.clear()
+        self._control = None
+        self._ready.set()  # wake up a waiting get()
+    
+    def lag_seconds(self) -> float:
+        """Age of the oldest undelivered event"""
+        if not self._buffer:
+            return 0.0
+        return time.monotonic() - self._buffer[0][0]
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "depth": len(self._buffer),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "lag_seconds": round(self.lag_seconds(), 3),
+            "last_lag_seconds": round(self.last_lag_seconds, 3),
+            "connected_seconds": round(time.monotonic() - self.connected_at, 1)
+        }
+
+class SSEManager:
+    def __init__(self, backend: Optional[SSEBackend] = None, queue_maxsize: Optional[int] = None, overflow_policy: Optional[str] = None):
         # Dictionary to store active connections
-        # Format: {user_id: [queue1, queue2, ...]}
-        self._connections: Dict[int, List[asyncio.Queue]] = {}
+        # Format: {user_id: [connection1, connection2, ...]}
+        self._connections: Dict[int, List[SSEConnection]] = {}
+        self.queue_maxsize = queue_maxsize or settings.SSE_QUEUE_MAXSIZE
+        self.overflow_policy = overflow_policy or settings.SSE_OVERFLOW_POLICY
+        self.disconnected_slow_consumers = 0
+        self._event_ids = EventIdGenerator()
+        self._replay = ReplayBuffer(size=settings.SSE_REPLAY_BUFFER_SIZE, max_users=settings.SSE_REPLAY_MAX_USERS)
+        
+        # pub/sub backend: publishes go through it so every worker delivers to its own connections
+        self._backend = backend or create_sse_backend()
+        self._backend.attach(self._deliver_batch)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def start(self):
+        """Start the backend (app startup)"""
+        self._loop = asyncio.get_running_loop()
+        await self._backend.start()
     
-    async def connect(self, user_id: int) -> asyncio.Queue:
-        """Add a new connection for a user"""
-        queue = asyncio.Queue()
+    async def stop(self):
+        """Stop the backend (app shutdown)"""
+        await self._backend.stop()
+        self._loop = None
+    
+    async def connect(self, user_id: int, last_event_id: Optional[int] = None) -> SSEConnection:
+        """Add a new connection for a user, replaying what it missed after last_event_id"""
+        connection = SSEConnection(user_id, maxsize=self.queue_maxsize, policy=self.overflow_policy)
+        
+        if last_event_id is not None:
+            missed, gap = self._replay.since(user_id, last_event_id)
+            if gap or len(missed) > connection.maxsize:
+                # older events were already evicted (or wouldn't fit the buffer) - the client has to
+                # refetch its state anyway, so only the resync is sent, outside the overflow policy
+                connection.offer_control(SSEEvent(event_type="stream:resync", data={"last_event_id": last_event_id}))
+            else:
+                for event in missed:
+                    connection.offer(event)
         
         if user_id not in self._connections:
             self._connections[user_id] = []
         
-        self._connections[user_id].append(queue)
-        print(f"User {user_id} connected to SSE. Active connections: {len(self._connections[user_id])}")
-        return queue
+        self._connections[user_id].append(connection)
+        logger.debug("User %s connected to SSE. Active connections: %s", user_id, len(self._connections[user_id]))
+        return connection
     
-    async def disconnect(self, user_id: int, queue: asyncio.Queue):
+    async def disconnect(self, user_id: int, connection: SSEConnection):
         """Remove a connection for a user"""
-        if user_id in self._connections and queue in self._connections[user_id]:
-            self._connections[user_id].remove(queue)
+        connection.close()
+        if user_id in self._connections and connection in self._connections[user_id]:
+            self._connections[user_id].remove(connection)
             
             # Clean up empty connection list
             if not self._connections[user_id]:
                 del self._connections[user_id]
                 
-            print(f"User {user_id} disconnected from SSE")
+            logger.debug("User %s disconnected from SSE", user_id)
     
     async def send_to_user(self, user_id: int, event: SSEEvent):
-        """Send event to a specific user"""
+        """Send event to a specific user (on whichever worker holds the connection)"""
+        if event.id is None and not self._backend.assigns_event_ids:
+            event.id = self._event_ids.next()
+        await self._backend.publish(user_id, event.to_dict())
+    
+    def publish(self, user_id: int, event: SSEEvent):
+        """
+        Fire-and-forget send_to_user that is safe from sync code: CRUD functions run
+        in the threadpool (sync db path) or inside the event loop (async db path).
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        if loop is not None:
+            loop.create_task(self._publish_safely(user_id, event))
+        elif self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._publish_safely(user_id, event), self._loop)
+        else:
+            logger.warning("Could not send SSE event %s to user %s - no active event loop", event.event_type, user_id)
+    
+    async def _publish_safely(self, user_id: int, event: SSEEvent):
+        try:
+            await self.send_to_user(user_id, event)
+        except Exception as e:
+            logger.error("Failed to publish SSE event to user %s: %s", user_id, e)
+    
+    async def _deliver_batch(self, batch: List[Tuple[int, Dict[str, Any]]]):
+        """Fan a batch of published events out to this process' connections"""
+        for user_id, payload in batch:
+            self._deliver_local(user_id, SSEEvent.from_dict(payload))
+    
+    def _deliver_local(self, user_id: int, event: SSEEvent):
+        """Offer the event to every local connection of the user (never blocks)"""
+        # retained even without a connection here, so a reconnect can resume from Last-Event-ID
+        self._replay.append(user_id, event)
+        
         if user_id not in self._connections:
-            print(f"No active connections for user {user_id}")
             return
         
         # Send to all connections for this user (multiple tabs/devices)
-        for queue in self._connections[user_id][:]:  # Create copy to avoid modification during iteration
-            try:
-                await queue.put(event)
-                print(f"Event sent to user {user_id}: {event.event_type}")
-            except Exception as e:
-                print(f"Failed to send event to user {user_id}: {e}")
-                # Remove broken connection
-                self._connections[user_id].remove(queue)
+        for connection in self._connections[user_id][:]:  # Create copy to avoid modification during iteration
+            if not connection.offer(event):
+                # slow consumer closed by the overflow policy
+                logger.warning("Disconnecting slow SSE consumer for user %s (buffer of %s full)", user_id, connection.maxsize)
+                self.disconnected_slow_consumers += 1
+                self._connections[user_id].remove(connection)
+        
+        if not self._connections[user_id]:
+            del self._connections[user_id]
     
     async def send_to_multiple_users(self, user_ids: List[int], event: SSEEvent):
         """Send event to multiple users"""
@@ -78,6 +354,22 @@ class SSEManager:
     def get_connected_users(self) -> List[int]:
         """Get list of currently connected user IDs"""
         return list(self._connections.keys())
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-connection lag/drop metrics plus totals"""
+        connections = [connection.stats() for connections in self._connections.values() for connection in connections]
+        return {
+            "active_connections": len(connections),
+            "connected_users": len(self._connections),
+            "queue_maxsize": self.queue_maxsize,
+            "overflow_policy": self.overflow_policy,
+            "dropped_events": sum(connection["dropped"] for connection in connections),
+            "coalesced_events": sum(connection["coalesced"] for connection in connections),
+            "disconnected_slow_consumers": self.disconnected_slow_consumers,
+            "replay_users": len(self._replay),
+            "max_lag_seconds": max((connection["lag_seconds"] for connection in connections), default=0.0),
+            "connections": connections
+        }
 
 # Global SSE manager instance
 sse_manager = SSEManager()
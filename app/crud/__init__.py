@@ -1,4 +1,6 @@
 from . import user
 from . import club
+from . import user_async
+from . import club_async
 
-__all__ = ["user", "club"]
\ No newline at end of file
+__all__ = ["user", "club", "user_async", "club_async"]
\ No newline at end of file
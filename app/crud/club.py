@@ -1,25 +1,32 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, case, and_, or_
-from typing import Optional, List
-from app.models.club import Club
-from app.schemas.club import ClubCreate, ClubFull
+from sqlalchemy.orm import Session, joinedload, selectinload, load_only, raiseload
+from sqlalchemy import func, case, cast, and_, or_, tuple_, literal, literal_column, Float, update
+from operator import attrgetter
+from typing import Optional, List, Tuple, Union
+from pydantic import TypeAdapter
+from app.models.club import Club, CLUB_SEARCH_VECTOR_SQL
+from app.schemas.club import ClubCreate, ClubFull, ClubSummary
 from app.models.enums import SportCategoryEnum
 from app.core.logger import get_logger
+from app.core.cache import principal_cache, club_cache, user_clubs_cache
+from app.utils.pagination import encode_cursor, decode_cursor, parse_datetime
 from app.models.user import User
 from app.models.member import Member
-from app.models.enums import ClubStatusEnum
+from app.models.club_join_request import ClubJoinRequest
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from app.models.enums import ClubStatusEnum, RequestStatusEnum
 from fastapi import HTTPException
 from app.core.sse_manager import sse_manager, create_club_join_event, create_member_joined_event, create_member_approved_event
 
 logger = get_logger(__name__)
 
 def create_club(db: Session, club: ClubCreate, current_user: User) -> ClubFull:
-    logger.info(f"Creating club: {club.name} by admin: {current_user.id}")
+    logger.info("Creating club: %s by admin: %s", club.name, current_user.id)
     
     try:
         current_clubs_count = len(current_user.owned_clubs)
         if current_clubs_count >= current_user.role.max_clubs:
-            logger.warning(f"User {current_user.id} reached max clubs limit: {current_user.role.max_clubs}")
+            logger.warning("User %s reached max clubs limit: %s", current_user.id, current_user.role.max_clubs)
             raise HTTPException(
                 status_code=403,
                 detail=f"Maximum {current_user.role.max_clubs} clubs allowed for your role"
@@ -42,10 +49,10 @@ def create_club(db: Session, club: ClubCreate, current_user: User) -> ClubFull:
             sport_category=club.sport_category,
             is_private=club.is_private,
             max_players=current_user.role.max_players,
+            member_count=1,  # the admin
             status=ClubStatusEnum.ACTIVE,
             location=location_dict,  # Use dict instead of Pydantic model
-            captains_ids=[],
-            pending_requests=[]
+            captains_ids=[]
         )
         
         db.add(db_club)
@@ -65,44 +72,223 @@ def create_club(db: Session, club: ClubCreate, current_user: User) -> ClubFull:
         db.flush()
         db.commit()
         db.refresh(db_club)
+        principal_cache.invalidate(current_user.id)  # owned_clubs/memberships changed
+        user_clubs_cache.invalidate(current_user.id)
         
-        logger.info(f"Club created successfully: {club.name} (ID: {db_club.id})")
+        logger.info("Club created successfully: %s (ID: %s)", club.name, db_club.id)
         return ClubFull.model_validate(db_club)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to create club {club.name}: {e}")
+        logger.error("Failed to create club %s: %s", club.name, e)
         db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to create club: {str(e)}"
         )
 
+# seat counting only moves ACTIVE <-> FULL, an INACTIVE club keeps its status
+_SEAT_STATUSES = (ClubStatusEnum.ACTIVE, ClubStatusEnum.FULL)
+
+def claim_seat_statement(club_id: int):
+    """UPDATE behind claim_seat (split out so the SQL can be checked without a db)"""
+    return update(Club)\
+        .where(Club.id == club_id, Club.member_count < Club.max_players)\
+        .values({
+            Club.member_count: Club.member_count + 1,
+            Club.status: case(
+                (
+                    and_(Club.status.in_(_SEAT_STATUSES), Club.member_count + 1 >= Club.max_players),
+                    literal(ClubStatusEnum.FULL, Club.status.type)
+                ),
+                else_=Club.status
+            )
+        })\
+        .execution_options(synchronize_session=False)
+
+def release_seat_statement(club_id: int):
+    """UPDATE behind release_seat"""
+    return update(Club)\
+        .where(Club.id == club_id)\
+        .values({
+            Club.member_count: func.greatest(Club.member_count - 1, 0),
+            Club.status: case(
+                (Club.status == ClubStatusEnum.FULL, literal(ClubStatusEnum.ACTIVE, Club.status.type)),
+                else_=Club.status
+            )
+        })\
+        .execution_options(synchronize_session=False)
+
+def claim_seat(db: Session, club_id: int) -> bool:
+    """
+    Atomically take one seat in the club (member_count + 1), flipping an ACTIVE club to FULL
+    on the last seat. Returns False if the club is already full.
+    The conditional UPDATE locks the row, so concurrent joins can't both pass.
+    """
+    return db.execute(claim_seat_statement(club_id)).rowcount == 1
+
+def release_seat(db: Session, club_id: int):
+    """Give back one seat (member_count - 1), a FULL club becomes ACTIVE again"""
+    db.execute(release_seat_statement(club_id))
+
 # Helper function to convert Club model to dict with captains
+# precomputed once: column names + a single attrgetter for all of them
+CLUB_COLUMNS = tuple(column.name for column in Club.__table__.columns)
+_get_club_columns = attrgetter(*CLUB_COLUMNS)
+
+# validators built once at import instead of per call
+_club_full_adapter = TypeAdapter(ClubFull)
+_club_full_list_adapter = TypeAdapter(List[ClubFull])
+_club_summary_list_adapter = TypeAdapter(List[ClubSummary])
+
 def populate_captains(club: Club) -> dict:
     """
     Convert Club model to dict with captains
     """
     # Get all fields from the model
-    club_dict = {}
-    for column in club.__table__.columns:
-        club_dict[column.name] = getattr(club, column.name) # Get the value of the column
+    club_dict = dict(zip(CLUB_COLUMNS, _get_club_columns(club)))
     
     # Add already loaded relationships
+    members = club.members
     club_dict['admin'] = club.admin
-    club_dict['members'] = club.members
-    
-    # Find captains from the members based on captains_ids
-    captains = []
-    if club.captains_ids and club.members:
-        captains = [member for member in club.members if member.id in club.captains_ids]
-        logger.info(f"Found {len(captains)} captains for club {club.id}")
+    club_dict['members'] = members
+    club_dict['pending_requests'] = club.pending_requests
     
-    club_dict['captains'] = captains
+    # Find captains from the members based on captains_ids (set lookup)
+    captain_ids = set(club.captains_ids) if club.captains_ids else None
+    club_dict['captains'] = [member for member in members if member.id in captain_ids] if captain_ids and members else []
     
     return club_dict
 
+def serialize_club(club: Club) -> ClubFull:
+    return _club_full_adapter.validate_python(populate_captains(club), from_attributes=True)
+
+def serialize_clubs(clubs: List[Club]) -> List[ClubFull]:
+    """Whole page of loaded clubs -> ClubFull in one validation pass"""
+    return _club_full_list_adapter.validate_python([populate_captains(club) for club in clubs], from_attributes=True)
+
+def load_clubs_by_ids(db: Session, club_ids: List[int]) -> List[Club]:
+    """
+    Load clubs with admin and members->user, keeping the order of club_ids.
+    Members come from one IN query (selectinload) instead of a clubs x members join.
+    """
+    if not club_ids:
+        return []
+    
+    clubs = db.query(Club)\
+            .options(
+                selectinload(Club.members).joinedload(Member.user),
+                joinedload(Club.admin),
+                selectinload(Club.pending_join_requests)
+            )\
+            .filter(Club.id.in_(club_ids))\
+            .all()
+    
+    clubs_by_id = {club.id: club for club in clubs}
+    return [clubs_by_id[club_id] for club_id in club_ids if club_id in clubs_by_id]
+
+SUMMARY_FIELDS = tuple(ClubSummary.model_fields)
+
+def parse_summary_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """fields= query param ("name,member_count") -> validated list (id always included)"""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in SUMMARY_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)} (available: {', '.join(SUMMARY_FIELDS)})"
+        )
+    return ["id"] + [field for field in requested if field != "id"]
+
+def summary_options(columns) -> list:
+    """load_only the given columns, never load relationships"""
+    return [load_only(*[getattr(Club, column) for column in columns]), raiseload("*")]
+
+def load_club_summaries(db: Session, club_ids: List[int], fields: Optional[List[str]] = None) -> List[Union[ClubSummary, dict]]:
+    """
+    Column-only load (load_only, relationships never loaded) keeping the order of club_ids.
+    member_count comes from the denormalized column, not from the members.
+    """
+    if not club_ids:
+        return []
+    
+    columns = fields or SUMMARY_FIELDS
+    clubs = db.query(Club)\
+            .options(*summary_options(columns))\
+            .filter(Club.id.in_(club_ids))\
+            .all()
+    
+    clubs_by_id = {club.id: club for club in clubs}
+    ordered = [clubs_by_id[club_id] for club_id in club_ids if club_id in clubs_by_id]
+    if fields:
+        return [{column: getattr(club, column) for column in fields} for club in ordered]
+    return _club_summary_list_adapter.validate_python(ordered, from_attributes=True)
+
+def escape_like(value: str) -> str:
+    """escape LIKE wildcards in user input"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def name_search_filter(name: str, full_text: bool = False):
+    """
+    substring match on the name (pg_trgm GIN index). full_text=True also matches words of
+    name + description (tsvector GIN index), Postgres combines both with a BitmapOr
+    """
+    name_match = Club.name.ilike(f"%{escape_like(name)}%", escape="\\")
+    if not full_text:
+        return name_match
+    search_vector = literal_column(CLUB_SEARCH_VECTOR_SQL)
+    return or_(
+        name_match,
+        search_vector.op('@@')(func.plainto_tsquery(literal_column("'simple'::regconfig"), name))
+    )
+
+def autocomplete_clubs(db: Session, q: str, limit: int = 10) -> List[dict]:
+    """
+    Name prefix matches first (lower(name) text_pattern_ops index), topped up with
+    trigram-similar names for typos once the query is long enough
+    """
+    logger.info("Autocomplete clubs - q: %s, limit: %s", q, limit)
+    columns = (Club.id, Club.name, Club.image, Club.sport_category, Club.member_count)
+    
+    try:
+        rows = db.query(*columns)\
+                .filter(func.lower(Club.name).like(f"{escape_like(q.lower())}%", escape="\\"))\
+                .order_by(Club.member_count.desc(), Club.name)\
+                .limit(limit)\
+                .all()
+        
+        if len(rows) < limit and len(q) >= 3:
+            seen = [row.id for row in rows]
+            similarity = func.similarity(Club.name, q)
+            query = db.query(*columns)\
+                    .filter(Club.name.op('%')(q))
+            if seen:
+                query = query.filter(Club.id.notin_(seen))
+            rows += query.order_by(similarity.desc(), Club.id)\
+                    .limit(limit - len(rows))\
+                    .all()
+        
+        return [dict(row._mapping) for row in rows]
+    
+    except Exception as e:
+        logger.error("Failed to autocomplete clubs: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to autocomplete clubs: {str(e)}"
+        )
+
+def get_user_point(current_user: User):
+    """earthdistance point for the user's location, 400 if the user has no location"""
+    if not current_user.location or not current_user.location.get('lat') or not current_user.location.get('lng'):
+        raise HTTPException(
+            status_code=400,
+            detail="User location is required for distance search"
+        )
+    return func.ll_to_earth(current_user.location['lat'], current_user.location['lng'])
+
 def search_clubs(
     current_user: User,
     db: Session, 
@@ -111,19 +297,29 @@ def search_clubs(
     sport_category: Optional[SportCategoryEnum] = None,
     is_private: Optional[bool] = None,
     skip: int = 0,
-    limit: int = 100
-) -> List[ClubFull]:
-    logger.info(f"Searching clubs - name: {name}, sort: {sort_by}, sport: {sport_category}, private: {is_private}, skip: {skip}, limit: {limit}")
+    limit: int = 100,
+    radius_km: Optional[float] = None,
+    cursor: Optional[str] = None,
+    view: str = "summary",
+    fields: Optional[str] = None,
+    full_text: bool = False
+) -> Tuple[List[Union[ClubSummary, ClubFull, dict]], Optional[str]]:
+    """
+    Returns (clubs, next_cursor). With a cursor the page continues after it (keyset),
+    otherwise skip/limit are used; next_cursor is None on the last page.
+    view="summary" (default) returns ClubSummary cards (or just the fields= columns),
+    view="full" returns ClubFull with members, admin and captains.
+    """
+    logger.info("Searching clubs - name: %s, sort: %s, sport: %s, private: %s, radius_km: %s, skip: %s, limit: %s, cursor: %s", name, sort_by, sport_category, is_private, radius_km, skip, limit, cursor is not None)
+    
+    summary_fields = parse_summary_fields(fields) if view != "full" else None
     
     try:
-        query = db.query(Club)\
-                .options(
-                    joinedload(Club.members).joinedload(Member.user),
-                    joinedload(Club.admin)
-                )
+        # phase 1: page of club ids only (no member joins, so limit/offset apply to clubs)
+        query = db.query(Club.id)
         
         if name:
-            query = query.filter(Club.name.ilike(f"%{name}%"))
+            query = query.filter(name_search_filter(name, full_text=full_text))
         
         if sport_category:
             query = query.filter(Club.sport_category == sport_category)
@@ -131,113 +327,130 @@ def search_clubs(
         if is_private is not None:
             query = query.filter(Club.is_private == is_private)
         
-        if sort_by == "name":
-            query = query.order_by(Club.name)
-        elif sort_by == "created_at":
-            query = query.order_by(Club.created_at.desc())
+        # geo search uses the GiST ll_to_earth(lat, lng) index (cube/earthdistance)
+        club_point = func.ll_to_earth(Club.lat, Club.lng)
+        if radius_km is not None:
+            user_point = get_user_point(current_user)
+            radius_m = radius_km * 1000
+            # earth_box prunes with the index, earth_distance drops the box corners
+            query = query.filter(func.earth_box(user_point, radius_m).op('@>')(club_point))\
+                         .filter(func.earth_distance(user_point, club_point) <= radius_m)
+        
+        # sort key + id tie-breaker, used for order_by and for the keyset cursor
+        if sort_by == "created_at":
+            sort_key, descending = Club.created_at, True
         elif sort_by == "members_count":
-            query = query.outerjoin(Club.members).group_by(Club.id).order_by(func.count(Club.members).desc())
+            sort_key, descending = Club.member_count, True
+        elif sort_by == "relevance" and name:
+            # trigram similarity of the name to the search text, best first. similarity() is
+            # real (float4): cast so the cursor's float8 compares equal to the row's own key
+            sort_key, descending = cast(func.similarity(Club.name, name), Float), True
         elif sort_by == "distance":
-            if not current_user.location or not current_user.location.get('lat') or not current_user.location.get('lng'):
-                raise HTTPException(
-                    status_code=400,
-                    detail="User location is required for distance sorting"
-                )
-            
-            user_lat = current_user.location['lat']
-            user_lng = current_user.location['lng']
-            
-            distance_calc = func.sqrt(
-                func.power(func.cast(Club.location['lat'].astext, func.Float()) - user_lat, 2) +
-                func.power(func.cast(Club.location['lng'].astext, func.Float()) - user_lng, 2)
-            )
-            query = query.order_by(distance_calc)
+            user_point = get_user_point(current_user)
+            query = query.filter(Club.lat.isnot(None), Club.lng.isnot(None))
+            # <-> is chord distance on the earth sphere: same order as great-circle distance, index-assisted (KNN)
+            sort_key, descending = club_point.op('<->')(user_point), False
         else:
-            query = query.order_by(Club.name)
-
-        clubs = query.offset(skip).limit(limit).all()
-        logger.info(f"Found {len(clubs)} clubs matching criteria")
+            sort_by = "name"
+            sort_key, descending = Club.name, False
         
-        # Work on each club separately to add captains
-        result = []
-        for club in clubs:
-            club_dict = populate_captains(club)
-            result.append(ClubFull.model_validate(club_dict))
-        return result
+        query = query.add_columns(sort_key)
+        if descending:
+            query = query.order_by(sort_key.desc(), Club.id.desc())
+        else:
+            query = query.order_by(sort_key, Club.id)
+        
+        if cursor:
+            last_key, last_id = decode_cursor(cursor, sort_by, size=2)
+            if sort_by == "created_at":
+                last_key = parse_datetime(last_key)
+            row_key = tuple_(sort_key, Club.id)
+            query = query.filter(row_key < (last_key, last_id) if descending else row_key > (last_key, last_id))
+        else:
+            query = query.offset(skip)
+        
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_id, last_key = rows[-1]
+            next_cursor = encode_cursor(sort_by, [last_key, last_id])
+        
+        club_ids = [club_id for club_id, _ in rows]
+        logger.info("Found %s clubs matching criteria", len(club_ids))
+        
+        # phase 2: columns only for summaries, members/users for just this page for full
+        if view != "full":
+            return load_club_summaries(db, club_ids, summary_fields), next_cursor
+        
+        clubs = load_clubs_by_ids(db, club_ids)
+        return serialize_clubs(clubs), next_cursor
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to search clubs: {e}")
+        logger.error("Failed to search clubs: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to search clubs: {str(e)}"
         )
 
 def get_club_by_id(db: Session, club_id: int) -> ClubFull:
-    logger.info(f"Fetching club by ID: {club_id}")
+    logger.info("Fetching club by ID: %s", club_id)
     
     try:
         club = db.query(Club)\
                 .options(
                     joinedload(Club.members).joinedload(Member.user),
-                    joinedload(Club.admin)
+                    joinedload(Club.admin),
+                    selectinload(Club.pending_join_requests)
                 )\
                 .filter(Club.id == club_id)\
                 .first()
         if not club:
-            logger.warning(f"Club not found with ID: {club_id}")
+            logger.warning("Club not found with ID: %s", club_id)
             raise HTTPException(
                 status_code=404,
                 detail=f"Club not found with ID: {club_id}"
             )
         
-        logger.info(f"Found club: {club.name} (ID: {club_id})")
-        club_dict = populate_captains(club)
-        return ClubFull.model_validate(club_dict)
+        logger.info("Found club: %s (ID: %s)", club.name, club_id)
+        return serialize_club(club)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Database error fetching club {club_id}: {e}")
+        logger.error("Database error fetching club %s: %s", club_id, e)
         raise HTTPException(
             status_code=500,
             detail=f"Database error fetching club: {str(e)}"
         )
 
 def get_user_clubs(db: Session, current_user: User) -> dict:
-    logger.info(f"Fetching clubs for user: {current_user.id}")
+    logger.info("Fetching clubs for user: %s", current_user.id)
     
     try:
-        # Load owned clubs with relationships
-        owned_clubs_query = db.query(Club)\
-                          .options(
-                              joinedload(Club.members).joinedload(Member.user),
-                              joinedload(Club.admin)
-                          )\
-                          .filter(Club.admin_id == current_user.id)\
-                          .all()
+        # every club the user owns or belongs to in one query (the admin_id check covers an
+        # admin without a member row), members come from one IN query instead of a join
+        member_club_ids = db.query(Member.club_id).filter(Member.user_id == current_user.id)
+        clubs = db.query(Club)\
+                .options(
+                    selectinload(Club.members).joinedload(Member.user),
+                    joinedload(Club.admin),
+                    selectinload(Club.pending_join_requests)
+                )\
+                .filter(or_(Club.admin_id == current_user.id, Club.id.in_(member_club_ids)))\
+                .order_by(Club.id)\
+                .all()
         
+        # tag each club as owned/member
         owned_clubs = []
-        for club in owned_clubs_query:
-            club_dict = populate_captains(club)
-            owned_clubs.append(ClubFull.model_validate(club_dict))
-        
-        # Load member clubs with relationships
-        member_clubs_query = db.query(Club)\
-                           .options(
-                               joinedload(Club.members).joinedload(Member.user),
-                               joinedload(Club.admin)
-                           )\
-                           .join(Member, Club.id == Member.club_id)\
-                           .filter(Member.user_id == current_user.id)\
-                           .filter(Club.admin_id != current_user.id)\
-                           .all()
-        
         member_clubs = []
-        for club in member_clubs_query:
-            club_dict = populate_captains(club)
-            member_clubs.append(ClubFull.model_validate(club_dict))
+        for club in serialize_clubs(clubs):
+            if club.admin_id == current_user.id:
+                owned_clubs.append(club)
+            else:
+                member_clubs.append(club)
         
         result_data = {
             "owned_clubs": owned_clubs,
@@ -245,27 +458,21 @@ def get_user_clubs(db: Session, current_user: User) -> dict:
             "total_clubs": len(owned_clubs) + len(member_clubs)
         }
         
-        logger.info(f"User {current_user.id} has {result_data['total_clubs']} clubs ({len(owned_clubs)} owned, {len(member_clubs)} member)")
+        logger.info("User %s has %s clubs (%s owned, %s member)", current_user.id, result_data['total_clubs'], len(owned_clubs), len(member_clubs))
         return result_data
         
     except Exception as e:
-        logger.error(f"Failed to get user clubs: {e}")
+        logger.error("Failed to get user clubs: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get user clubs: {str(e)}"
         )
 
 def join_club(db: Session, club_id: int, current_user: User) -> dict:
-    logger.info(f"User {current_user.id} attempting to join club {club_id}")
+    logger.info("User %s attempting to join club %s", current_user.id, club_id)
     
     try:
-        club = db.query(Club)\
-                .options(
-                    joinedload(Club.members).joinedload(Member.user),
-                    joinedload(Club.admin)
-                )\
-                .filter(Club.id == club_id)\
-                .first()
+        club = db.query(Club).filter(Club.id == club_id).first()
         
         # check if club exists
         if not club:
@@ -286,9 +493,8 @@ def join_club(db: Session, club_id: int, current_user: User) -> dict:
                 detail="User is already a member of this club"
             )
         
-        # check if club is full
-        current_members_count = len(club.members)
-        if current_members_count >= club.max_players:
+        # check if club is full (the public join re-checks atomically in claim_seat)
+        if club.member_count >= club.max_players:
             raise HTTPException(
                 status_code=403,
                 detail="Club has reached maximum members limit"
@@ -296,13 +502,22 @@ def join_club(db: Session, club_id: int, current_user: User) -> dict:
         
         # check if club is private
         if club.is_private:
-            current_requests = list(club.pending_requests or [])
-        
-            if current_user.id not in current_requests:
-                current_requests.append(current_user.id)
-                club.pending_requests = current_requests
+            # upsert the request row: new -> pending, rejected/accepted (left since) -> pending again,
+            # already pending -> no row returned
+            request_row = db.execute(
+                insert(ClubJoinRequest)
+                .values(club_id=club_id, user_id=current_user.id, status=RequestStatusEnum.PENDING)
+                .on_conflict_do_update(
+                    constraint="uq_club_join_requests_club_user",
+                    set_={"status": RequestStatusEnum.PENDING, "updated_at": func.now()},
+                    where=ClubJoinRequest.status != RequestStatusEnum.PENDING
+                )
+                .returning(ClubJoinRequest.id)
+            ).first()
             
+            if request_row is not None:
                 db.commit()
+                club_cache.invalidate(club_id)  # pending_requests changed
                 
                 # 🆕 שלח SSE event לאדמין על בקשה חדשה
                 user_name = f"{current_user.first_name} {current_user.last_name}"
@@ -313,20 +528,22 @@ def join_club(db: Session, club_id: int, current_user: User) -> dict:
                     admin_id=club.admin_id
                 )
                 
-                # שלח באופן אסינכרוני (לא חוסם)
-                import asyncio
-                try:
-                    asyncio.create_task(sse_manager.send_to_user(club.admin_id, event))
-                except RuntimeError:
-                    # אם אין event loop פעיל, נדלג על השליחה
-                    logger.warning(f"Could not send SSE event - no active event loop")
+                # שלח באופן אסינכרוני (לא חוסם) - publish works from the threadpool too
+                sse_manager.publish(club.admin_id, event)
                 
-                logger.info(f"Added user {current_user.id} to pending requests for club {club_id} and sent SSE notification")
+                logger.info("Added user %s to pending requests for club %s and sent SSE notification", current_user.id, club_id)
                 return {"request_status": "pending"}
             else:
+                db.rollback()
                 return {"request_status": "already_pending"}
         
         # add user to club (public club)
+        if not claim_seat(db, club_id):
+            raise HTTPException(
+                status_code=403,
+                detail="Club has reached maximum members limit"
+            )
+        
         new_member = Member(
             user_id=current_user.id,
             club_id=club_id,
@@ -340,6 +557,9 @@ def join_club(db: Session, club_id: int, current_user: User) -> dict:
         db.add(new_member)
         db.commit()
         db.refresh(new_member)
+        principal_cache.invalidate(current_user.id)
+        user_clubs_cache.invalidate(current_user.id)
+        club_cache.invalidate(club_id)
         
         # 🆕 שלח SSE event על הצטרפות מוצלחת למועדון ציבורי
         user_name = f"{current_user.first_name} {current_user.last_name}"
@@ -350,53 +570,90 @@ def join_club(db: Session, club_id: int, current_user: User) -> dict:
         )
         
         # שלח לאדמין
-        import asyncio
-        try:
-            asyncio.create_task(sse_manager.send_to_user(club.admin_id, event))
-        except RuntimeError:
-            logger.warning(f"Could not send SSE event - no active event loop")
+        sse_manager.publish(club.admin_id, event)
         
-        logger.info(f"User {current_user.id} joined club {club_id} successfully")
+        logger.info("User %s joined club %s successfully", current_user.id, club_id)
         return {"membership_status": "joined"}
         
     except HTTPException:
         raise
+    except IntegrityError:
+        # a concurrent join of the same user won (uq_members_club_user), the seat is rolled back too
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="User is already a member of this club"
+        )
     except Exception as e:
-        logger.error(f"Failed to join club {club_id}: {e}")
+        logger.error("Failed to join club %s: %s", club_id, e)
         db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to join club: {str(e)}"
         )
 
+def resolve_request_of_member(db: Session, club_id: int, user_id: int):
+    """Mark a still pending request ACCEPTED when the user is already a member of the club"""
+    try:
+        is_member = db.query(Member.id).filter(Member.club_id == club_id, Member.user_id == user_id).first() is not None
+        if not is_member:
+            return
+        db.query(ClubJoinRequest)\
+          .filter(
+              ClubJoinRequest.club_id == club_id,
+              ClubJoinRequest.user_id == user_id,
+              ClubJoinRequest.status == RequestStatusEnum.PENDING
+          )\
+          .update({ClubJoinRequest.status: RequestStatusEnum.ACCEPTED}, synchronize_session=False)
+        db.commit()
+        club_cache.invalidate(club_id)  # pending requests changed
+    except Exception as e:
+        logger.error("Failed to resolve the request of member %s in club %s: %s", user_id, club_id, e)
+        db.rollback()
+
 def accept_request(db: Session, club_id: int, current_user: User, request_id: int) -> dict:
-    logger.info(f"User {current_user.id} attempting to accept request for club {club_id}")
+    logger.info("User %s attempting to accept request for club %s", current_user.id, club_id)
     try:
         club = db.query(Club).filter(Club.id == club_id).first()
         user_request = db.query(User).filter(User.id == request_id).first()
         
         if not club:
-            logger.warning(f"Club not found with ID: {club_id}")
+            logger.warning("Club not found with ID: %s", club_id)
             raise HTTPException(
                 status_code=404,
                 detail=f"Club not found with ID: {club_id}"
             )
         
         if club.admin_id != current_user.id and current_user.role.id != 5:
-            logger.warning(f"User {current_user.id} is not the admin of club {club_id}")
+            logger.warning("User %s is not the admin of club %s", current_user.id, club_id)
             raise HTTPException(
                 status_code=403,
                 detail="Only club admin can accept requests"
             )
 
-        if request_id not in club.pending_requests:
-            logger.warning(f"Request not found with ID: {request_id} in club {club_id}")
+        # one transaction: mark the request accepted, take a seat, add the member
+        accepted = db.query(ClubJoinRequest)\
+                    .filter(
+                        ClubJoinRequest.club_id == club_id,
+                        ClubJoinRequest.user_id == request_id,
+                        ClubJoinRequest.status == RequestStatusEnum.PENDING
+                    )\
+                    .update({ClubJoinRequest.status: RequestStatusEnum.ACCEPTED}, synchronize_session=False)
+        if not accepted:
+            logger.warning("Request not found with ID: %s in club %s", request_id, club_id)
             raise HTTPException(
                 status_code=404,
                 detail=f"Request not found with ID: {request_id}"
             )
 
         # add user to club
+        if not claim_seat(db, club_id):
+            db.rollback()
+            raise HTTPException(
+                status_code=403,
+                detail="Club has reached maximum members limit"
+            )
+        
         new_member = Member(
             user_id=request_id,
             club_id=club_id,
@@ -409,14 +666,9 @@ def accept_request(db: Session, club_id: int, current_user: User, request_id: in
 
         db.add(new_member)
         db.commit()
-        db.refresh(new_member)
-
-        # remove request from pending_requests
-        current_requests = list(club.pending_requests or [])
-        if request_id in current_requests:
-            current_requests.remove(request_id)
-            club.pending_requests = current_requests
-        db.commit()
+        principal_cache.invalidate(request_id)
+        user_clubs_cache.invalidate(request_id)
+        club_cache.invalidate(club_id)
 
         # 🆕 שלח SSE events
         user_name = f"{user_request.first_name} {user_request.last_name}"
@@ -435,15 +687,11 @@ def accept_request(db: Session, club_id: int, current_user: User, request_id: in
             user_name=user_name
         )
         
-        import asyncio
-        try:
-            # שלח לשני המשתמשים
-            asyncio.create_task(sse_manager.send_to_user(current_user.id, admin_event))
-            asyncio.create_task(sse_manager.send_to_user(request_id, user_event))
-        except RuntimeError:
-            logger.warning(f"Could not send SSE events - no active event loop")
+        # שלח לשני המשתמשים
+        sse_manager.publish(current_user.id, admin_event)
+        sse_manager.publish(request_id, user_event)
 
-        logger.info(f"Request accepted for club {club_id} by user {current_user.id}")
+        logger.info("Request accepted for club %s by user %s", club_id, current_user.id)
         return {
             "membership_status": "joined",
             "user_id": request_id,
@@ -452,8 +700,17 @@ def accept_request(db: Session, club_id: int, current_user: User, request_id: in
 
     except HTTPException:
         raise
+    except IntegrityError:
+        # the user became a member meanwhile (uq_members_club_user) - the rollback also undid the
+        # ACCEPTED update, close the request so it doesn't stay pending forever
+        db.rollback()
+        resolve_request_of_member(db, club_id, request_id)
+        raise HTTPException(
+            status_code=409,
+            detail="User is already a member of this club"
+        )
     except Exception as e:
-        logger.error(f"Failed to accept request for club {club_id}: {e}")
+        logger.error("Failed to accept request for club %s: %s", club_id, e)
         db.rollback()
         raise HTTPException(
             status_code=500,
@@ -463,7 +720,7 @@ def accept_request(db: Session, club_id: int, current_user: User, request_id: in
 
 
 def leave_club(db: Session, club_id: int, current_user: User , user_id: Optional[int] = None) -> dict:
-    logger.info(f"User {current_user.id} attempting to leave club {club_id}")
+    logger.info("User %s attempting to leave club %s", current_user.id, club_id)
     
     try:
         club = db.query(Club).filter(Club.id == club_id).first()
@@ -506,16 +763,21 @@ def leave_club(db: Session, club_id: int, current_user: User , user_id: Optional
             current_captains.remove(member.id)
             club.captains_ids = current_captains
         
+        member_user_id = member.user_id
         db.delete(member)
+        release_seat(db, club_id)
         db.commit()
+        principal_cache.invalidate(member_user_id)
+        user_clubs_cache.invalidate(member_user_id)
+        club_cache.invalidate(club_id)
         
-        logger.info(f"User {current_user.id} left club {club_id} successfully")
+        logger.info("User %s left club %s successfully", current_user.id, club_id)
         return {"membership_status": "left"}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to leave club {club_id}: {e}")
+        logger.error("Failed to leave club %s: %s", club_id, e)
         db.rollback()
         raise HTTPException(
             status_code=500,
@@ -0,0 +1,95 @@
+from typing import Optional, List, Tuple, Union
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic_core import to_json
+
+from app.core.cache import club_cache, user_clubs_cache
+from app.core.database import run_in_session
+from app.crud import club as crud_club
+from app.models.user import User
+from app.models.enums import SportCategoryEnum
+from app.schemas.club import ClubCreate, ClubFull, ClubSummary
+
+# async versions of app/crud/club.py
+# the query logic lives in the sync functions, run_in_session runs them on the
+# asyncpg engine (AsyncSession) or in the threadpool (Session) - see USE_ASYNC_DB
+
+AnySession = Union[Session, AsyncSession]
+
+async def create_club(db: AnySession, club: ClubCreate, current_user: User) -> ClubFull:
+    return await run_in_session(db, lambda session: crud_club.create_club(session, club, current_user))
+
+async def search_clubs(
+    current_user: User,
+    db: AnySession,
+    name: Optional[str] = None,
+    sort_by: str = "name",
+    sport_category: Optional[SportCategoryEnum] = None,
+    is_private: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 100,
+    radius_km: Optional[float] = None,
+    cursor: Optional[str] = None,
+    view: str = "summary",
+    fields: Optional[str] = None,
+    full_text: bool = False
+) -> Tuple[List[Union[ClubSummary, ClubFull, dict]], Optional[str]]:
+    return await run_in_session(db, lambda session: crud_club.search_clubs(
+        current_user=current_user,
+        db=session,
+        name=name,
+        sort_by=sort_by,
+        sport_category=sport_category,
+        is_private=is_private,
+        skip=skip,
+        limit=limit,
+        radius_km=radius_km,
+        cursor=cursor,
+        view=view,
+        fields=fields,
+        full_text=full_text
+    ))
+
+async def autocomplete_clubs(db: AnySession, q: str, limit: int = 10) -> List[dict]:
+    return await run_in_session(db, lambda session: crud_club.autocomplete_clubs(session, q, limit))
+
+async def get_club_by_id(db: AnySession, club_id: int) -> ClubFull:
+    return await run_in_session(db, lambda session: crud_club.get_club_by_id(session, club_id))
+
+async def get_club_payload(db: AnySession, club_id: int) -> Tuple[str, str]:
+    """(etag, serialized ClubFull) through club_cache, loaded and stored on a miss"""
+    # version is read before loading so a write that lands meanwhile isn't cached as current
+    version = await club_cache.run(club_cache.version, club_id)
+    cached = await club_cache.run(club_cache.get, club_id, version)
+    if cached is not None:
+        return cached
+    
+    club = await get_club_by_id(db, club_id)
+    payload = club.model_dump_json()
+    etag = await club_cache.run(club_cache.set, club_id, version, payload)
+    return etag, payload
+
+async def get_user_clubs(db: AnySession, current_user: User) -> dict:
+    return await run_in_session(db, lambda session: crud_club.get_user_clubs(session, current_user))
+
+async def get_user_clubs_payload(db: AnySession, current_user: User) -> Tuple[str, str]:
+    """(etag, serialized my-clubs data) through user_clubs_cache, loaded and stored on a miss"""
+    version = await user_clubs_cache.run(user_clubs_cache.version, current_user.id)
+    cached = await user_clubs_cache.run(user_clubs_cache.get, current_user.id, version)
+    if cached is not None:
+        return cached
+    
+    result = await get_user_clubs(db, current_user)
+    club_ids = [club.id for club in result["owned_clubs"] + result["member_clubs"]]
+    payload = to_json(result).decode()
+    etag = await user_clubs_cache.run(user_clubs_cache.set, current_user.id, version, club_ids, payload)
+    return etag, payload
+
+async def join_club(db: AnySession, club_id: int, current_user: User) -> dict:
+    return await run_in_session(db, lambda session: crud_club.join_club(session, club_id, current_user))
+
+async def accept_request(db: AnySession, club_id: int, current_user: User, request_id: int) -> dict:
+    return await run_in_session(db, lambda session: crud_club.accept_request(session, club_id, current_user, request_id))
+
+async def leave_club(db: AnySession, club_id: int, current_user: User, user_id: Optional[int] = None) -> dict:
+    return await run_in_session(db, lambda session: crud_club.leave_club(session, club_id, current_user, user_id))
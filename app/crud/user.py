@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session, joinedload
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import datetime, timedelta
 from app.models.user import User
 from app.models.member import Member
@@ -7,17 +7,19 @@ from app.models.club import Club
 from app.schemas.user import UserCreate, UserFull
 from app.utils.security import hash_password, verify_password
 from app.core.logger import get_logger
+from app.core.cache import principal_cache
+from app.utils.pagination import encode_cursor, decode_cursor
 from fastapi import HTTPException
 
 logger = get_logger(__name__)
 
-def register(db: Session, user: UserCreate) -> UserFull:
-    logger.info(f"Attempting to register user: {user.email}")
+def register(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> UserFull:
+    logger.info("Attempting to register user: %s", user.email)
     
     try:
         existing_email = db.query(User).filter(User.email == user.email).first()
         if existing_email:
-            logger.warning(f"Email already exists: {user.email}")
+            logger.warning("Email already exists: %s", user.email)
             raise HTTPException(
                 status_code=409,
                 detail="Email already registered"
@@ -32,13 +34,14 @@ def register(db: Session, user: UserCreate) -> UserFull:
         ).first()
         
         if existing_phone and phone_dict.get('number'):  # Only check if number is provided
-            logger.warning(f"Phone number already exists: {phone_dict.get('number')}")
+            logger.warning("Phone number already exists: %s", phone_dict.get('number'))
             raise HTTPException(
                 status_code=409,
                 detail="Phone number already registered"
             )
         
-        hashed_password = hash_password(user.password)
+        if hashed_password is None:  # the async path hashes outside the session
+            hashed_password = hash_password(user.password)
         db_user = User(
             first_name=user.first_name,
             last_name=user.last_name,
@@ -56,78 +59,103 @@ def register(db: Session, user: UserCreate) -> UserFull:
         db.commit()
         db.refresh(db_user)
         
-        logger.info(f"Successfully registered user: {user.email} with ID: {db_user.id}")
+        logger.info("Successfully registered user: %s with ID: %s", user.email, db_user.id)
         return UserFull.model_validate(db_user)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to register user {user.email}: {e}")
+        logger.error("Failed to register user %s: %s", user.email, e)
         db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to register user: {str(e)}"
         )
 
-def login(db: Session, email: str, password: str) -> UserFull:
-    logger.info(f"Login attempt for email: {email}")
-    
+def get_credentials(db: Session, email: str) -> Tuple[str, UserFull]:
+    """Return (password hash, user) for email"""
     try:
         user = db.query(User).filter(User.email == email).first()
         
         if not user:
-            logger.warning(f"User not found: {email}")
+            logger.warning("User not found: %s", email)
             raise HTTPException(
                 status_code=404,
                 detail="User not found"
             )
         
-        if not verify_password(password, user.password):
-            logger.warning(f"Invalid password for user: {email}")
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid password"
-            )
-        
-        logger.info(f"Successful login for user: {email} (ID: {user.id})")
-        return UserFull.model_validate(user)
+        return user.password, UserFull.model_validate(user)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Login error for {email}: {e}")
+        logger.error("Login error for %s: %s", email, e)
         raise HTTPException(
             status_code=500,
             detail=f"Login failed: {str(e)}"
         )
 
-def get_all_users(db: Session, skip: int = 0, limit: int = 100) -> List[UserFull]:
-    logger.info(f"Fetching users with skip={skip}, limit={limit}")
+def login(db: Session, email: str, password: str) -> UserFull:
+    logger.info("Login attempt for email: %s", email)
+    
+    hashed_password, user = get_credentials(db, email)
+    
+    if not verify_password(password, hashed_password):
+        logger.warning("Invalid password for user: %s", email)
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid password"
+        )
+    
+    logger.info("Successful login for user: %s (ID: %s)", email, user.id)
+    return user
+
+def get_all_users(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[UserFull], Optional[str]]:
+    """
+    Returns (users, next_cursor), ordered by id. With a cursor the page continues
+    after it (keyset), otherwise skip/limit are used; next_cursor is None on the last page.
+    """
+    logger.info("Fetching users with skip=%s, limit=%s, cursor=%s", skip, limit, cursor is not None)
+    if limit < 1:
+        return [], None
     
     try:
         # users = db.query(User).offset(skip).limit(limit).all()
-        users = db.query(User)\
+        query = db.query(User)\
                 .options(\
                     joinedload(User.role),
                     joinedload(User.memberships).joinedload(Member.club),
                     joinedload(User.owned_clubs)
                     
                 )\
-                .offset(skip)\
-                .limit(limit)\
-                .all()        
-        logger.info(f"Successfully fetched {len(users)} users")
-        return [UserFull.model_validate(user) for user in users]
+                .order_by(User.id)
+        
+        if cursor:
+            (last_id,) = decode_cursor(cursor, "id", size=1)
+            query = query.filter(User.id > last_id)
+        else:
+            query = query.offset(skip)
+        
+        users = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor("id", [users[-1].id])
         
+        logger.info("Successfully fetched %s users", len(users))
+        return [UserFull.model_validate(user) for user in users], next_cursor
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Failed to fetch users: {e}")
+        logger.error("Failed to fetch users: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch users: {str(e)}"
         )
 
 def get_user_by_id(db: Session, user_id: int) -> UserFull:
-    logger.info(f"Fetching user by ID: {user_id}")
+    logger.info("Fetching user by ID: %s", user_id)
     
     try:
         # user = db.query(User).filter(User.id == user_id).first()
@@ -142,31 +170,42 @@ def get_user_by_id(db: Session, user_id: int) -> UserFull:
                 .first()
         
         if not user:
-            logger.warning(f"User not found with ID: {user_id}")
+            logger.warning("User not found with ID: %s", user_id)
             raise HTTPException(
                 status_code=404,
                 detail=f"User not found with ID: {user_id}"
             )
         
-        logger.info(f"Found user: {user.email} (ID: {user_id})")
+        logger.info("Found user: %s (ID: %s)", user.email, user_id)
         return UserFull.model_validate(user)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Database error fetching user {user_id}: {e}")
+        logger.error("Database error fetching user %s: %s", user_id, e)
         raise HTTPException(
             status_code=500,
             detail=f"Database error fetching user: {str(e)}"
         )
 
+def update_password_hash(db: Session, user_id: int, hashed_password: str):
+    """store an upgraded hash (rehash on login with a higher work factor)"""
+    try:
+        db.query(User).filter(User.id == user_id).update({User.password: hashed_password}, synchronize_session=False)
+        db.commit()
+        logger.info("Upgraded password hash for user %s", user_id)
+    except Exception as e:
+        # the login itself succeeded, the upgrade is retried next time
+        logger.error("Failed to upgrade password hash for user %s: %s", user_id, e)
+        db.rollback()
+
 def change_role(db: Session, user_id: int, new_role_id: int) -> UserFull:
-    logger.info(f"Changing role for user {user_id} to {new_role_id}")
+    logger.info("Changing role for user %s to %s", user_id, new_role_id)
     
     try:
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
-            logger.warning(f"User not found with ID: {user_id}")
+            logger.warning("User not found with ID: %s", user_id)
             raise HTTPException(
                 status_code=404,
                 detail=f"User not found with ID: {user_id}"
@@ -194,14 +233,15 @@ def change_role(db: Session, user_id: int, new_role_id: int) -> UserFull:
         user.role_id = new_role_id
         db.commit()
         db.refresh(user)
+        principal_cache.invalidate(user_id)
         
-        logger.info(f"Successfully changed role for user {user_id} to {new_role_id}")
+        logger.info("Successfully changed role for user %s to %s", user_id, new_role_id)
         return UserFull.model_validate(user)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Database error changing role for user {user_id}: {e}")
+        logger.error("Database error changing role for user %s: %s", user_id, e)
         db.rollback()
         raise HTTPException(
             status_code=500,
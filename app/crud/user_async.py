@@ -0,0 +1,51 @@
+from typing import List, Optional, Tuple, Union
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+
+from app.core.database import run_in_session
+from app.crud import user as crud_user
+from app.schemas.user import UserCreate, UserFull
+from app.utils.password_pool import password_pool
+from app.core.logger import get_logger
+
+# async versions of app/crud/user.py
+# queries run through run_in_session (asyncpg engine or threadpool - see USE_ASYNC_DB),
+# bcrypt runs in the password pool (dedicated processes), never on the loop or the shared threadpool
+
+logger = get_logger(__name__)
+
+AnySession = Union[Session, AsyncSession]
+
+async def register(db: AnySession, user: UserCreate) -> UserFull:
+    hashed_password = await password_pool.hash(user.password)
+    return await run_in_session(db, lambda session: crud_user.register(session, user, hashed_password=hashed_password))
+
+async def login(db: AnySession, email: str, password: str) -> UserFull:
+    logger.info("Login attempt for email: %s", email)
+    
+    hashed_password, user = await run_in_session(db, lambda session: crud_user.get_credentials(session, email))
+    
+    valid, new_hash = await password_pool.verify_and_update(password, hashed_password)
+    if not valid:
+        logger.warning("Invalid password for user: %s", email)
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid password"
+        )
+    
+    if new_hash is not None:
+        # stored hash uses an older work factor (BCRYPT_ROUNDS was raised)
+        await run_in_session(db, lambda session: crud_user.update_password_hash(session, user.id, new_hash))
+    
+    logger.info("Successful login for user: %s (ID: %s)", email, user.id)
+    return user
+
+async def get_all_users(db: AnySession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[UserFull], Optional[str]]:
+    return await run_in_session(db, lambda session: crud_user.get_all_users(session, skip=skip, limit=limit, cursor=cursor))
+
+async def get_user_by_id(db: AnySession, user_id: int) -> UserFull:
+    return await run_in_session(db, lambda session: crud_user.get_user_by_id(session, user_id))
+
+async def change_role(db: AnySession, user_id: int, new_role_id: int) -> UserFull:
+    return await run_in_session(db, lambda session: crud_user.change_role(session, user_id, new_role_id))
@@ -1,20 +1,45 @@
-from fastapi import FastAPI, WebSocket                    #the entry point of the application like express in node.js
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, WebSocket                    #the entry point of the application like express in node.js
 from fastapi.middleware.cors import CORSMiddleware #cors
+from fastapi.responses import PlainTextResponse
 
 from app.core.config import settings #the config of the application
+from app.core.cache import principal_cache, club_cache, user_clubs_cache
+from app.core.database import engine, async_engine
+from app.core.metrics import registry, instrument_engine, metrics_middleware, label_set
+from app.core.sse_manager import sse_manager
+from app.utils.password_pool import password_pool
+from app.utils.security import token_cache
 
 
 #routers
 from app.api.endpoints import users, clubs
+from app.api.deps import get_admin_user, require_metrics_access
 
 
-from app.websocket.location import live_location  #socket
+from app.websocket.location import live_location, club_nearby_players, active_connections  #socket
+from app.websocket.live_positions import live_positions
+from app.websocket.location_buffer import location_buffer
+from app.websocket.throttle import throttle_counters
+
+#startup/shutdown of background services
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await sse_manager.start()  #sse pub/sub backend (LISTEN/NOTIFY when SSE_BACKEND=postgres)
+    await location_buffer.start()  #periodic bulk write of live locations
+    await live_positions.start()  #expires stale live positions
+    yield
+    await live_positions.stop()
+    await location_buffer.stop()  #flushes what is left
+    await sse_manager.stop()
+    password_pool.shutdown()
 
 #create the app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    description="FastAPI application with PostgreSQL"
+    description="FastAPI application with PostgreSQL",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -26,6 +51,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# request timing + query counting (/metrics)
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine)
+    app.middleware("http")(metrics_middleware)
+
+# gauges read on every /metrics scrape
+def _pool_stats(pool_engine):
+    pool = pool_engine.pool
+    return {
+        label_set(state="size"): pool.size(),
+        label_set(state="checked_in"): pool.checkedin(),
+        label_set(state="checked_out"): pool.checkedout(),
+        label_set(state="overflow"): pool.overflow()
+    }
+
+registry.gauge("db_pool_connections", "Sync engine pool connections", lambda: _pool_stats(engine))
+if async_engine is not None:
+    registry.gauge("db_async_pool_connections", "Async engine pool connections", lambda: _pool_stats(async_engine.sync_engine))
+registry.gauge("sse_active_connections", "Open SSE streams in this worker", sse_manager.get_active_connections_count)
+registry.gauge("sse_connected_users", "Users with at least one SSE stream", lambda: len(sse_manager.get_connected_users()))
+registry.gauge("sse_max_lag_seconds", "Oldest undelivered SSE event", lambda: sse_manager.get_stats()["max_lag_seconds"])
+registry.gauge("websocket_location_connections", "Open /ws/location sockets", lambda: len(active_connections))
+registry.gauge("live_position_players", "Players in the live position store", lambda: len(live_positions))
+registry.gauge("location_buffer_pending", "Locations waiting for the next flush", location_buffer.pending)
+registry.gauge("location_updates", "/ws/location updates by throttle decision", lambda: {
+    label_set(decision=decision): count for decision, count in throttle_counters.items()
+})
+registry.gauge("password_pool_in_flight", "bcrypt jobs running or waiting", lambda: password_pool.stats()["in_flight"])
+registry.gauge("password_pool_rejected", "bcrypt jobs rejected with 503", lambda: password_pool.stats()["rejected"])
+registry.gauge("principal_cache_entries", "Cached principals", lambda: len(principal_cache))
+registry.gauge("principal_cache_hit_ratio", "Principal cache hit ratio", lambda: principal_cache.stats()["hit_ratio"])
+
 # Include routers   //imported       //the rout      //swagger
 app.include_router(users.router,   prefix="/users", tags=["users"])
 app.include_router(clubs.router,   prefix="/clubs", tags=["clubs"])
@@ -37,6 +96,35 @@ async def root():
 async def health_check():
     return {"status": "healthy"} #a must for docker
 
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4") #prometheus scrape
+
+@app.get("/health/cache")
+async def cache_stats():
+    return {
+        "principal_cache": principal_cache.stats(),
+        "club_cache": club_cache.stats(),
+        "user_clubs_cache": user_clubs_cache.stats(),
+        "token_cache": token_cache.stats()
+    } #hit/miss counters
+
+@app.get("/health/sse", dependencies=[Depends(get_admin_user)])
+async def sse_stats():
+    return sse_manager.get_stats() #queue depth, lag and drops per stream (has user ids, admins only)
+
+@app.get("/health/location")
+async def location_stats():
+    return {
+        "throttle": throttle_counters, #accepted / suppressed updates
+        "buffer": location_buffer.stats(),
+        "live_positions": live_positions.stats()
+    }
+
 @app.websocket("/ws/location")
 async def websocket_location(websocket: WebSocket, token: str):
-    await live_location(websocket, token)
\ No newline at end of file
+    await live_location(websocket, token)
+
+@app.websocket("/ws/clubs/{club_id}/nearby")
+async def websocket_club_nearby(websocket: WebSocket, club_id: int, token: str, radius_km: float = 2.0):
+    await club_nearby_players(websocket, club_id, token, radius_km)
\ No newline at end of file
@@ -4,5 +4,6 @@ from .club import Club
 from .event import Event
 from .member import Member
 from .game import Game
+from .club_join_request import ClubJoinRequest
 
-__all__ = ["User", "Club", "Event", "Member", "Game", "Role"]
\ No newline at end of file
+__all__ = ["User", "Club", "Event", "Member", "Game", "Role", "ClubJoinRequest"]
\ No newline at end of file
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Text, and_
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import ENUM, JSON, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 
 from app.core.database import Base
-from app.models.enums import SportCategoryEnum, ClubStatusEnum
+from app.models.enums import SportCategoryEnum, ClubStatusEnum, RequestStatusEnum
+from app.models.club_join_request import ClubJoinRequest
+
+# full-text document for club search, same expression as the ix_clubs_search_vector GIN index
+CLUB_SEARCH_VECTOR_SQL = "to_tsvector('simple'::regconfig, clubs.name || ' ' || clubs.description)"
 
 class Club(Base):
     __tablename__ = "clubs"
@@ -16,15 +20,16 @@ class Club(Base):
     image = Column(String, default="default-club.jpg")
     
     # Admin & Captains
-    admin_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    admin_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     admin = relationship("User", foreign_keys=[admin_id],back_populates="owned_clubs")
-    captains_ids = Column(ARRAY(Integer), default=[])  # IDs of captains as members
+    captains_ids = Column(ARRAY(Integer), default=[])  # IDs of captains as members (GIN index ix_clubs_captains_ids)
     # Sport
     sport_category = Column(ENUM(SportCategoryEnum), nullable=False)
     
     # Settings
     is_private = Column(Boolean, default=False)
     max_players = Column(Integer, nullable=False)
+    member_count = Column(Integer, nullable=False, default=0, server_default="0")  # kept in sync by crud.club seat helpers
     status = Column(ENUM(ClubStatusEnum), default=ClubStatusEnum.ACTIVE)
     
     # Location
@@ -35,14 +40,38 @@ class Club(Base):
         "lat": None,
         "lng": None
     })
+    # Indexed copy of location lat/lng for geo search (GiST ll_to_earth index, earthdistance)
+    lat = Column(Float)
+    lng = Column(Float)
     
-    # Members & Requests (JSON arrays)
+    # Members & Requests
     members = relationship("Member", back_populates="club")
-    pending_requests = Column(ARRAY(Integer), default=[])  
+    join_requests = relationship("ClubJoinRequest", back_populates="club")
+    pending_join_requests = relationship(
+        "ClubJoinRequest",
+        primaryjoin=lambda: and_(
+            ClubJoinRequest.club_id == Club.id,
+            ClubJoinRequest.status == RequestStatusEnum.PENDING
+        ),
+        viewonly=True
+    )
     
     #events
     events = relationship("Event", back_populates="club")
 
     # Timestamps    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    @property
+    def pending_requests(self):
+        """user ids with a pending join request (club_join_requests table)"""
+        return [request.user_id for request in self.pending_join_requests]
+
+    @validates("location")
+    def _sync_coordinates(self, key, location):
+        """keep lat/lng in sync with the location JSON"""
+        coordinates = location or {}
+        self.lat = coordinates.get("lat")
+        self.lng = coordinates.get("lng")
+        return location
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+from app.models.enums import RequestStatusEnum
+
+class ClubJoinRequest(Base):
+    __tablename__ = "club_join_requests"
+    __table_args__ = (
+        # one request row per (club, user), re-requests flip the status back to pending
+        UniqueConstraint("club_id", "user_id", name="uq_club_join_requests_club_user"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    club_id = Column(Integer, ForeignKey("clubs.id"), nullable=False)
+    club = relationship("Club", back_populates="join_requests")
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user = relationship("User")
+    status = Column(ENUM(RequestStatusEnum), nullable=False, default=RequestStatusEnum.PENDING)
+    #timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -16,7 +16,7 @@ class Event(Base):
     image = Column(String, default="default-event.jpg")
     
     # Relations
-    club_id = Column(Integer, ForeignKey("clubs.id"), nullable=False)
+    club_id = Column(Integer, ForeignKey("clubs.id"), nullable=False, index=True)
     club = relationship("Club", back_populates="events")
     field_id = Column(Integer) 
     
@@ -10,7 +10,7 @@ class Game(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     # Event connection
-    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False, index=True)
     event = relationship("Event", back_populates="games")
     # Teams playing (keys from event.teams)
     teams = Column(ARRAY(String), nullable=False)  # ["a", "c"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ARRAY, String, DateTime, func
+from sqlalchemy import Column, Integer, Float, ARRAY, String, DateTime, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from sqlalchemy import ForeignKey
@@ -6,11 +6,15 @@ from app.models.enums import FootballPositionsEnum
 from sqlalchemy.dialects.postgresql import ENUM
 class Member(Base):
     __tablename__ = "members"
+    __table_args__ = (
+        # one membership per (club, user), also the index behind the club_id lookups
+        UniqueConstraint("club_id", "user_id", name="uq_members_club_user"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     club_id = Column(Integer, ForeignKey("clubs.id"), nullable=False)
     club = relationship("Club", back_populates="members")
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     user = relationship("User", back_populates="memberships")
     #stats
     total_goals = Column(Integer, default=0)
@@ -26,7 +26,7 @@ class User(Base):
    # Contact info
    email = Column(String, unique=True, index=True, nullable=False)
    is_email_verified = Column(Boolean, default=False)
-   phone = Column(JSON, default={"prefix": None, "number": None})
+   phone = Column(JSON, default={"prefix": None, "number": None})  # phone->>'number' has an expression index (ix_users_phone_number)
 
    city = Column(String(30))
    country = Column(String(30))
@@ -60,6 +60,7 @@ class ClubFull(BaseModel):
     sport_category: SportCategoryEnum
     is_private: bool
     max_players: int
+    member_count: int = 0
     status: Optional[ClubStatusEnum] = None
     location: Optional[Dict] = None
     pending_requests: Optional[List[int]] = []
@@ -70,6 +71,23 @@ class ClubFull(BaseModel):
     class Config:
         from_attributes = True
 
+# Club card for list endpoints (search): columns only, no members/admin/requests
+class ClubSummary(BaseModel):
+    id: int
+    name: str
+    image: str
+    admin_id: int
+    sport_category: SportCategoryEnum
+    is_private: bool
+    max_players: int
+    member_count: int = 0
+    status: Optional[ClubStatusEnum] = None
+    location: Optional[Dict] = None
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
 #for single club page
 class clubById(BaseModel):
     id: int
@@ -83,6 +101,7 @@ class clubById(BaseModel):
     sport_category: SportCategoryEnum
     is_private: bool
     max_players: int
+    member_count: int = 0
     status: Optional[ClubStatusEnum] = None
     location: Optional[Dict] = None
     pending_requests: Optional[List[int]] = []
@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+from fastapi import HTTPException
+
+# opaque keyset cursors: base64(json {"s": sort_by, "k": [last sort key..., last id]})
+
+def encode_cursor(sort_by: str, keys: List[Any]) -> str:
+    """Encode the last row's sort key(s) + id into an opaque cursor token"""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in keys]
+    raw = json.dumps({"s": sort_by, "k": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_by: str, size: int) -> List[Any]:
+    """Decode a cursor made by encode_cursor for the same sort_by and key size, 400 otherwise"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload.get("s") != sort_by or not isinstance(payload.get("k"), list) or len(payload["k"]) != size:
+            raise ValueError("cursor does not match sort")
+        return payload["k"]
+    except Exception:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
+
+def parse_datetime(value: str) -> datetime:
+    """Parse a datetime key stored in a cursor, 400 if malformed"""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
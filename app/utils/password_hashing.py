@@ -0,0 +1,21 @@
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from app.core.config import settings
+
+# bcrypt only - this is what the password pool's spawned workers import, so it must stay
+# free of app.core.cache / app.core.logger (those set up handlers, threads and cache backends per process)
+
+#password hashing (work factor from BCRYPT_ROUNDS, older hashes are upgraded on login)
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+#hash the password
+def hash_password(password: str) -> str:
+   return pwd_context.hash(password)
+
+#check if the password is correct
+def verify_password(password: str, hashed_password: str) -> bool:
+   return pwd_context.verify(password, hashed_password)
+
+#check the password and return a new hash if the stored one uses an outdated work factor
+def verify_and_update_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+   return pwd_context.verify_and_update(password, hashed_password)
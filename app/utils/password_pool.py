@@ -0,0 +1,83 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.utils.password_hashing import hash_password, verify_and_update_password
+
+logger = get_logger(__name__)
+
+
+class PasswordPool:
+    """
+    bcrypt runs in a few dedicated processes so a login burst can't take over the
+    shared threadpool. When more than max_queue jobs are waiting, callers get a 503
+    right away instead of queueing behind the burst.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 32):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: the workers only import app.utils.password_hashing, not the app's threads/loop/logging
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.max_workers <= 0:
+            return await run_in_threadpool(fn, *args)
+
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            logger.warning("Password pool saturated (%s jobs in flight), rejecting", self._in_flight)
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"}
+            )
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new hash if the stored one should be upgraded)"""
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected
+        }
+
+
+password_pool = PasswordPool(
+    max_workers=settings.PASSWORD_POOL_WORKERS,
+    max_queue=settings.PASSWORD_POOL_MAX_QUEUE
+)
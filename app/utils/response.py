@@ -1,10 +1,15 @@
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
-def success_response(data: Any, message: str = "Success", status: int = 200):
+from fastapi.responses import Response
+from pydantic_core import to_json
+
+def success_response(data: Any, message: str = "Success", status: int = 200, **extra):
+    # extra envelope fields, e.g. next_cursor for paginated lists
     return {
         "status": status,
         "message": message,
-        "data": data
+        "data": data,
+        **extra
     }
 
 def error_response(message: str, status: int = 400, data: Any = None):
@@ -12,4 +17,10 @@ def error_response(message: str, status: int = 400, data: Any = None):
         "status": status,
         "message": message,
         "data": data
-    }
\ No newline at end of file
+    }
+
+def json_response(data: Any, message: str = "Success", status: int = 200, headers: Optional[Dict[str, str]] = None, **extra) -> Response:
+    # success_response serialized in one pass by pydantic-core (models included),
+    # skips jsonable_encoder walking every nested member - used by the big list endpoints
+    body = to_json(success_response(data, message=message, status=status, **extra))
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,18 +1,16 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.cache import TTLCache
 
-#password hashing
-pwd_context = CryptContext(schemes=["bcrypt"])
-
-#hash the password
-def hash_password(password: str) -> str:
-   return pwd_context.hash(password)
-
-#check if the password is correct
-def verify_password(password: str, hashed_password: str) -> bool:
-   return pwd_context.verify(password, hashed_password)
+#bcrypt lives in password_hashing (imported by the password pool workers)
+from app.utils.password_hashing import pwd_context, hash_password, verify_password, verify_and_update_password
 
 #create a JWT token with user ID
 def create_token(user_id: str) -> str:  
@@ -20,10 +18,72 @@ def create_token(user_id: str) -> str:
    data = {"sub": user_id, "exp": expire}  
    return jwt.encode(data, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
-#check the JWT token and return the user ID
-def verify_token(token: str) -> str | None:
+#verified tokens: sha256(token) -> (token, sub, exp), see verify_token
+token_cache = TTLCache(max_size=settings.TOKEN_CACHE_MAX_SIZE, ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS)
+
+_HMAC_ALGORITHMS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+def _b64url_decode(segment: str) -> bytes:
+   return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+#decode backends: claims dict on a valid, unexpired token, None otherwise
+def _decode_jose(token: str) -> Optional[dict]:
    try:
-       payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-       return payload.get("sub")  
+       return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
    except JWTError:
-       return None
\ No newline at end of file
+       return None
+
+def _decode_pyjwt(token: str) -> Optional[dict]:
+   import jwt as pyjwt  # optional dependency, only needed for JWT_BACKEND=pyjwt
+
+   try:
+       return pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+   except pyjwt.PyJWTError:
+       return None
+
+def _decode_hmac(token: str) -> Optional[dict]:
+   """HS256/384/512 only: signature check + exp, no other claims are validated (same as our jose usage)"""
+   try:
+       signing_input, _, signature = token.rpartition(".")
+       header_segment, _, payload_segment = signing_input.partition(".")
+       header = json.loads(_b64url_decode(header_segment))
+       digest = _HMAC_ALGORITHMS.get(settings.ALGORITHM)
+       if digest is None or header.get("alg") != settings.ALGORITHM:
+           return None
+       expected = hmac.new(settings.SECRET_KEY.encode(), signing_input.encode(), digest).digest()
+       if not hmac.compare_digest(expected, _b64url_decode(signature)):
+           return None
+       claims = json.loads(_b64url_decode(payload_segment))
+   except (ValueError, TypeError):
+       return None
+   if "exp" in claims and float(claims["exp"]) <= time.time():
+       return None
+   return claims
+
+JWT_BACKENDS = {"jose": _decode_jose, "pyjwt": _decode_pyjwt, "hmac": _decode_hmac}
+
+def decode_token(token: str, backend: Optional[str] = None) -> Optional[dict]:
+   return JWT_BACKENDS[backend or settings.JWT_BACKEND](token)
+
+#check the JWT token and return the user ID
+def verify_token(token: str) -> str | None:
+   now = time.time()
+   key = hashlib.sha256(token.encode()).digest()
+   cached = token_cache.get(key)
+   if cached is not None:
+       cached_token, sub, exp = cached
+       # full token compare so a digest collision can never authenticate another token
+       if hmac.compare_digest(cached_token, token) and (exp is None or exp > now):
+           return sub
+       token_cache.invalidate(key)
+
+   claims = decode_token(token)
+   if claims is None:
+       return None
+
+   sub = claims.get("sub")
+   exp = claims.get("exp")
+   ttl = settings.TOKEN_CACHE_TTL_SECONDS if exp is None else min(settings.TOKEN_CACHE_TTL_SECONDS, float(exp) - now)
+   if sub is not None and ttl > 0:
+       token_cache.set(key, (token, sub, exp if exp is None else float(exp)), ttl_seconds=ttl)
+   return sub
@@ -0,0 +1,196 @@
+import asyncio
+import math
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in km"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class LivePositionStore:
+    """
+    Latest live position per connected player. Positions live in parallel arrays
+    (one slot per user, freed slots are reused) and a uniform lat/lng grid maps
+    cells to slots, so a radius query only touches the cells around the point.
+    Entries older than ttl_seconds are ignored by queries and removed by expire().
+    Only used from the event loop thread, so there is no locking.
+    """
+
+    def __init__(self, cell_degrees: float = 0.01, ttl_seconds: float = 120.0):
+        self.cell_degrees = cell_degrees
+        self.ttl_seconds = ttl_seconds
+        self._user_ids = array("q")
+        self._lats = array("d")
+        self._lngs = array("d")
+        self._updated_at = array("d")  # wall clock seconds
+        self._free: List[int] = []
+        # Format: {user_id: slot}
+        self._slots: Dict[int, int] = {}
+        # Format: {(cell_x, cell_y): {slot, ...}}
+        self._grid: Dict[Tuple[int, int], Set[int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_degrees)), int(math.floor(lng / self.cell_degrees))
+
+    def update(self, user_id: int, lat: float, lng: float, timestamp: Optional[float] = None):
+        """Insert or move a player"""
+        timestamp = time.time() if timestamp is None else timestamp
+        slot = self._slots.get(user_id)
+
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+                self._user_ids[slot] = user_id
+                self._lats[slot] = lat
+                self._lngs[slot] = lng
+                self._updated_at[slot] = timestamp
+            else:
+                slot = len(self._user_ids)
+                self._user_ids.append(user_id)
+                self._lats.append(lat)
+                self._lngs.append(lng)
+                self._updated_at.append(timestamp)
+            self._slots[user_id] = slot
+            self._grid.setdefault(self._cell(lat, lng), set()).add(slot)
+            return
+
+        old_cell = self._cell(self._lats[slot], self._lngs[slot])
+        new_cell = self._cell(lat, lng)
+        if old_cell != new_cell:
+            self._discard_from_cell(old_cell, slot)
+            self._grid.setdefault(new_cell, set()).add(slot)
+        self._lats[slot] = lat
+        self._lngs[slot] = lng
+        self._updated_at[slot] = timestamp
+
+    def touch(self, user_id: int, timestamp: Optional[float] = None):
+        """Keep a stationary player live without moving it"""
+        slot = self._slots.get(user_id)
+        if slot is not None:
+            self._updated_at[slot] = time.time() if timestamp is None else timestamp
+
+    def _discard_from_cell(self, cell: Tuple[int, int], slot: int):
+        slots = self._grid.get(cell)
+        if slots is not None:
+            slots.discard(slot)
+            if not slots:
+                del self._grid[cell]
+
+    def remove(self, user_id: int):
+        slot = self._slots.pop(user_id, None)
+        if slot is None:
+            return
+        self._discard_from_cell(self._cell(self._lats[slot], self._lngs[slot]), slot)
+        self._free.append(slot)
+
+    def get(self, user_id: int) -> Optional[Tuple[float, float, float]]:
+        """(lat, lng, updated_at) of a live player, None if unknown or stale"""
+        slot = self._slots.get(user_id)
+        if slot is None or self._updated_at[slot] < time.time() - self.ttl_seconds:
+            return None
+        return self._lats[slot], self._lngs[slot], self._updated_at[slot]
+
+    def nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius_km: float,
+        limit: Optional[int] = None,
+        exclude_user_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Live players within radius_km of the point, closest first"""
+        min_updated_at = time.time() - self.ttl_seconds
+        lat_span = radius_km / KM_PER_DEGREE_LAT
+        # longitude degrees shrink towards the poles
+        lng_span = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+        min_x, min_y = self._cell(lat - lat_span, lng - lng_span)
+        max_x, max_y = self._cell(lat + lat_span, lng + lng_span)
+
+        found = []
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                for slot in self._grid.get((cell_x, cell_y), ()):
+                    if self._updated_at[slot] < min_updated_at:
+                        continue
+                    user_id = self._user_ids[slot]
+                    if user_id == exclude_user_id:
+                        continue
+                    distance = haversine_km(lat, lng, self._lats[slot], self._lngs[slot])
+                    if distance <= radius_km:
+                        found.append((distance, slot))
+
+        found.sort()
+        if limit is not None:
+            found = found[:limit]
+        return [
+            {
+                "user_id": self._user_ids[slot],
+                "lat": self._lats[slot],
+                "lng": self._lngs[slot],
+                "distance_km": round(distance, 3),
+                "updated_at": self._updated_at[slot]
+            }
+            for distance, slot in found
+        ]
+
+    def expire(self) -> int:
+        """Drop stale players, returns how many were removed"""
+        min_updated_at = time.time() - self.ttl_seconds
+        stale = [user_id for user_id, slot in self._slots.items() if self._updated_at[slot] < min_updated_at]
+        for user_id in stale:
+            self.remove(user_id)
+        return len(stale)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.ttl_seconds / 2)
+            removed = self.expire()
+            if removed:
+                logger.info("Expired %s stale live positions", removed)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "players": len(self._slots),
+            "slots": len(self._user_ids),
+            "free_slots": len(self._free),
+            "cells": len(self._grid),
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+live_positions = LivePositionStore(
+    cell_degrees=settings.LIVE_POSITION_CELL_DEGREES,
+    ttl_seconds=settings.LIVE_POSITION_TTL_SECONDS
+)
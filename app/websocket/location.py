@@ -1,12 +1,19 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-from typing import Dict
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Optional, Tuple
+import asyncio
 import json
 
-from app.core.database import get_db, SessionLocal
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.core.logger import get_logger  
-from app.utils.security import verify_token
+from app.models.club import Club
+from app.models.member import Member
 from app.models.user import User
+from app.utils.security import verify_token
+from app.websocket.live_positions import live_positions
+from app.websocket.location_buffer import location_buffer
+from app.websocket.throttle import LocationThrottle, ACCEPTED, NOT_MOVED, RATE_LIMITED
 
 logger = get_logger(__name__)  
 
@@ -20,21 +27,26 @@ async def live_location(websocket: WebSocket, token: str):
     user_id_str = verify_token(token)
     if not user_id_str:
         await websocket.close(code=4001, reason="Invalid token")
-        logger.error(f"❌ Invalid token: {token}")
+        logger.error("❌ Invalid token: %s", token)
         return
     
     try:
         user_id = int(user_id_str)
     except ValueError:
         await websocket.close(code=4001, reason="Invalid user ID")
-        logger.error(f"❌ Invalid user ID: {user_id_str}")
+        logger.error("❌ Invalid user ID: %s", user_id_str)
         return
     
     # get user
     await websocket.accept() #accept connection(async await)
     active_connections[user_id] = websocket
     
-    logger.info(f" User {user_id} connected to location WebSocket")
+    logger.info(" User %s connected to location WebSocket", user_id)
+    throttle = LocationThrottle(
+        min_interval=settings.LOCATION_MIN_INTERVAL_SECONDS,
+        min_distance_m=settings.LOCATION_MIN_DISTANCE_METERS,
+        max_per_second=settings.LOCATION_MAX_UPDATES_PER_SECOND
+    )
     
     try:
         while True:
@@ -47,57 +59,131 @@ async def live_location(websocket: WebSocket, token: str):
                 await websocket.send_json({
                     "error": "Missing lat or lng"
                 })
-                logger.error(f"❌ Missing lat or lng: {new_location}")
+                logger.error("❌ Missing lat or lng: %s", new_location)
                 continue
             
-            # update location in database
-            db = SessionLocal()
             try:
-                success = await update_location(
-                    db, user_id, new_location
-                )
-                
-                if success:
-                    await websocket.send_json({
-                        "status": "location updated",
-                        "lat": new_location["lat"],
-                        "lng": new_location["lng"]
-                    })
-                    logger.info(f"📍 Updated location for user {user_id}: {new_location['lat']}, {new_location['lng']}")
-                else:
-                    await websocket.send_json({
-                        "error": "Failed to update location"
-                    })
-                    logger.error(f"❌ Failed to update location for user {user_id}")
-                    
-            finally:
-                db.close()
+                lat = float(new_location["lat"])
+                lng = float(new_location["lng"])
+            except (TypeError, ValueError):
+                await websocket.send_json({
+                    "error": "Invalid lat or lng"
+                })
+                continue
+            
+            decision = throttle.check(lat, lng)
+            if decision == RATE_LIMITED:
+                await websocket.send_json({"status": "rate_limited"})
+                continue
+            if decision != ACCEPTED:
+                if decision == NOT_MOVED:
+                    live_positions.touch(user_id)  # still around, just not moving
+                await websocket.send_json({"status": "suppressed", "reason": decision})
+                continue
+            
+            # live store for nearby queries, db write is buffered for the background flush
+            live_positions.update(user_id, lat, lng)
+            location_buffer.put(user_id, lat, lng)
+            await websocket.send_json({
+                "status": "location updated",
+                "lat": lat,
+                "lng": lng
+            })
                 
     except WebSocketDisconnect:
-        logger.info(f" User {user_id} disconnected from location WebSocket")
+        logger.info(" User %s disconnected from location WebSocket (%s updates suppressed)", user_id, throttle.suppressed)
     except Exception as e:
-        logger.error(f"❌ Error in location WebSocket for user {user_id}: {e}")
+        logger.error("❌ Error in location WebSocket for user %s: %s", user_id, e)
     finally:
         # clear connection
         if user_id in active_connections:
             del active_connections[user_id]
 
-async def update_location(db: Session, user_id: int, new_location: dict) -> bool:
-    """update user location in database"""
+def get_club_coordinates(club_id: int, user_id: int) -> Tuple[Optional[Tuple[float, float]], bool]:
+    """
+    club lat/lng and whether the user may watch it - the club admin, a member or a
+    site admin (sync, run in the threadpool)
+    """
+    db = SessionLocal()
     try:
-        user = db.query(User).filter(User.id == user_id).first()
-        if user:
-            user.location = {
-                "lat": float(new_location["lat"]),
-                "lng": float(new_location["lng"])
-            }
-            db.commit()
-            return True
-        return False
+        row = db.query(Club.lat, Club.lng, Club.admin_id).filter(Club.id == club_id).first()
+        if row is None or row.lat is None or row.lng is None:
+            return None, False
+        allowed = (
+            row.admin_id == user_id
+            or db.query(Member.id).filter(Member.club_id == club_id, Member.user_id == user_id).first() is not None
+            or db.query(User.role_id).filter(User.id == user_id).scalar() == 5
+        )
+        return (row.lat, row.lng), allowed
+    finally:
+        db.close()
+
+def log_listener_error(task: asyncio.Task):
+    """done-callback of the nearby socket reader, a disconnect is the normal way out"""
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None and not isinstance(error, WebSocketDisconnect):
+        logger.error("❌ Club nearby WebSocket reader failed: %s", error)
+
+async def club_nearby_players(websocket: WebSocket, club_id: int, token: str, radius_km: float):
+    """push the live players around a club whenever the list changes"""
+    
+    user_id_str = verify_token(token)
+    if not user_id_str:
+        await websocket.close(code=4001, reason="Invalid token")
+        return
+    
+    try:
+        user_id = int(user_id_str)
+    except ValueError:
+        await websocket.close(code=4001, reason="Invalid user ID")
+        return
+    
+    # not (0 < r <= max) also catches nan
+    if not 0 < radius_km <= settings.LIVE_NEARBY_MAX_RADIUS_KM:
+        await websocket.close(code=4000, reason=f"radius_km must be in (0, {settings.LIVE_NEARBY_MAX_RADIUS_KM}]")
+        return
+    
+    coordinates, allowed = await run_in_threadpool(get_club_coordinates, club_id, user_id)
+    if coordinates is None:
+        await websocket.close(code=4004, reason="Club not found or has no location")
+        return
+    if not allowed:
+        await websocket.close(code=4003, reason="Only club members can watch this club")
+        return
+    
+    await websocket.accept()
+    lat, lng = coordinates
+    logger.info(" User %s watching players near club %s (%s km)", user_id, club_id, radius_km)
+    
+    # client messages are ignored, reading only notices the disconnect
+    async def wait_for_disconnect():
+        while True:
+            await websocket.receive_text()
+    
+    listener = asyncio.create_task(wait_for_disconnect())
+    listener.add_done_callback(log_listener_error)
+    last_sent = None
+    try:
+        while not listener.done():
+            players = live_positions.nearby(lat, lng, radius_km)
+            snapshot = [(player["user_id"], player["lat"], player["lng"]) for player in players]
+            if snapshot != last_sent:
+                await websocket.send_json({
+                    "club_id": club_id,
+                    "radius_km": radius_km,
+                    "players": players
+                })
+                last_sent = snapshot
+            await asyncio.wait({listener}, timeout=settings.LIVE_NEARBY_PUSH_INTERVAL_SECONDS)
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
-        logger.error(f"❌ Database error updating location: {e}")
-        db.rollback()
-        return False
+        logger.error("❌ Error in club nearby WebSocket for club %s: %s", club_id, e)
+    finally:
+        listener.cancel()
+        logger.info(" User %s stopped watching club %s", user_id, club_id)
 
 def get_active_connections() -> Dict[int, WebSocket]:
     """return active connections"""
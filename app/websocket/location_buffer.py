@@ -0,0 +1,144 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import principal_cache
+from app.core.config import settings
+from app.core.database import engine
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def build_bulk_update(batch: List[Tuple[int, float, float]]) -> Tuple[Any, Dict[str, Any]]:
+    """One UPDATE ... FROM (VALUES ...) statement for a batch of (user_id, lat, lng)"""
+    rows = []
+    params: Dict[str, Any] = {}
+    for index, (user_id, lat, lng) in enumerate(batch):
+        rows.append(f"(:id_{index}, CAST(:loc_{index} AS json))")
+        params[f"id_{index}"] = user_id
+        params[f"loc_{index}"] = json.dumps({"lat": lat, "lng": lng})
+
+    statement = text(
+        "UPDATE users AS u SET location = v.location "
+        f"FROM (VALUES {', '.join(rows)}) AS v(id, location) "
+        "WHERE u.id = v.id"
+    )
+    return statement, params
+
+
+class LocationBuffer:
+    """
+    Latest known position per user (last write wins). A background task flushes
+    the buffer every interval as bulk updates, so the socket never waits on the db.
+    """
+
+    def __init__(self, interval: float = 1.0, max_batch: int = 1000, max_retries: int = 5):
+        self.interval = interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        # Format: {user_id: (lat, lng)}
+        self._latest: Dict[int, Tuple[float, float]] = {}
+        # Format: {user_id: failed flushes of its pending position}
+        self._attempts: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        # metrics
+        self.received = 0
+        self.coalesced = 0
+        self.written = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+
+    def put(self, user_id: int, lat: float, lng: float):
+        """Buffer a position, replacing any pending one of the same user"""
+        if user_id in self._latest:
+            self.coalesced += 1
+        self._latest[user_id] = (lat, lng)
+        self._attempts.pop(user_id, None)  # a new position gets its own retries
+        self.received += 1
+
+    def pending(self) -> int:
+        return len(self._latest)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._latest:
+                return
+
+            batch, self._latest = self._latest, {}
+            rows = [(user_id, lat, lng) for user_id, (lat, lng) in batch.items()]
+            try:
+                await run_in_threadpool(self._write_batch, rows)
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.error("❌ Failed to flush %s locations: %s", len(rows), e)
+                # retry on the next flush unless newer positions arrived meanwhile,
+                # a position that keeps failing (bad row, permanent error) is dropped
+                for user_id, position in batch.items():
+                    if user_id in self._latest:
+                        continue
+                    attempts = self._attempts.get(user_id, 0) + 1
+                    if attempts >= self.max_retries:
+                        self._attempts.pop(user_id, None)
+                        self.dropped += 1
+                        continue
+                    self._attempts[user_id] = attempts
+                    self._latest[user_id] = position
+                return
+
+            self.written += len(rows)
+            for user_id, lat, lng in rows:
+                self._attempts.pop(user_id, None)
+                # swap in a moved copy instead of evicting, so live users keep hitting the cache -
+                # never mutate the cached UserFull, requests in flight hold that same instance
+                location = {"lat": lat, "lng": lng}
+                principal_cache.replace(user_id, lambda principal: principal.model_copy(update={"location": location}))
+
+    def _write_batch(self, rows: List[Tuple[int, float, float]]):
+        """Sync bulk write, runs in the threadpool"""
+        with engine.begin() as connection:
+            for start in range(0, len(rows), self.max_batch):
+                statement, params = build_bulk_update(rows[start:start + self.max_batch])
+                connection.execute(statement, params)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._latest),
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped
+        }
+
+
+location_buffer = LocationBuffer(
+    interval=settings.LOCATION_FLUSH_INTERVAL_SECONDS,
+    max_batch=settings.LOCATION_FLUSH_MAX_BATCH,
+    max_retries=settings.LOCATION_FLUSH_MAX_RETRIES
+)
@@ -0,0 +1,57 @@
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from app.websocket.live_positions import haversine_km
+
+# decisions
+ACCEPTED = "accepted"
+RATE_LIMITED = "rate_limited"   # over the max message rate, nothing is processed
+TOO_SOON = "too_soon"           # within the minimum interval of the last accepted update
+NOT_MOVED = "not_moved"         # moved less than the minimum distance
+
+# process wide counters, shown on /health/location
+throttle_counters: Dict[str, int] = {ACCEPTED: 0, RATE_LIMITED: 0, TOO_SOON: 0, NOT_MOVED: 0}
+
+
+class LocationThrottle:
+    """Per-connection throttle for /ws/location updates"""
+
+    def __init__(self, min_interval: float = 0.8, min_distance_m: float = 10.0, max_per_second: float = 5.0):
+        self.min_interval = min_interval
+        self.min_distance_m = min_distance_m
+        self.max_per_second = max_per_second
+        self._recent: Deque[float] = deque()  # message times in the last second
+        self._last_accepted: Optional[Tuple[float, float, float]] = None  # (time, lat, lng)
+        self.counters: Dict[str, int] = {ACCEPTED: 0, RATE_LIMITED: 0, TOO_SOON: 0, NOT_MOVED: 0}
+
+    def check(self, lat: float, lng: float, now: Optional[float] = None) -> str:
+        """Decide what to do with an update, accepted ones become the new reference point"""
+        now = time.monotonic() if now is None else now
+        decision = self._decide(lat, lng, now)
+        if decision == ACCEPTED:
+            self._last_accepted = (now, lat, lng)
+        self.counters[decision] += 1
+        throttle_counters[decision] += 1
+        return decision
+
+    def _decide(self, lat: float, lng: float, now: float) -> str:
+        while self._recent and self._recent[0] <= now - 1.0:
+            self._recent.popleft()
+        if len(self._recent) >= self.max_per_second:
+            return RATE_LIMITED
+        self._recent.append(now)
+
+        if self._last_accepted is None:
+            return ACCEPTED
+
+        last_time, last_lat, last_lng = self._last_accepted
+        if now - last_time < self.min_interval:
+            return TOO_SOON
+        if haversine_km(last_lat, last_lng, lat, lng) * 1000 < self.min_distance_m:
+            return NOT_MOVED
+        return ACCEPTED
+
+    @property
+    def suppressed(self) -> int:
+        return self.counters[RATE_LIMITED] + self.counters[TOO_SOON] + self.counters[NOT_MOVED]
@@ -0,0 +1,452 @@
+# scripts/bench_endpoints.py
+# Latency / throughput of the hot endpoints against a seeded local Postgres (scripts/seed_bulk.py)
+# usage:
+#   python scripts/bench_endpoints.py                                   # in-process ASGI client, every scenario
+#   python scripts/bench_endpoints.py --base-url http://localhost:8000  # a running uvicorn (same SECRET_KEY / db)
+#   python scripts/bench_endpoints.py --scenarios search_name,club_page --requests 500 --concurrency 20
+#   python scripts/bench_endpoints.py --save-baseline bench_baseline.json
+#   python scripts/bench_endpoints.py --baseline bench_baseline.json --tolerance 0.2   # exit 1 on regression
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+sys.path.append('.')
+
+SORT_OPTIONS = ("name", "created_at", "members_count", "distance", "relevance")
+SEARCH_NAMES = ("Tel", "Haifa", "Jeru", "Ashdod", "Netanya", "Holon")
+
+# (latencies in seconds, errors, wall clock seconds)
+RunResult = Tuple[List[float], int, float]
+# same plus extra counters reported next to the timings (e.g. throttled websocket replies)
+CountedRunResult = Tuple[List[float], int, float, Dict[str, int]]
+
+
+# ---------- stats / baseline ----------
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize(latencies: List[float], errors: int, elapsed: float, counts: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        **(counts or {}),
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of results vs baseline, both in the report format"""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or current.get("skipped") or previous.get("skipped"):
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if previous[key] > 0 and current[key] > previous[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {previous[key]} -> {current[key]}")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput_rps {previous['throughput_rps']} -> {current['throughput_rps']}")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+# ---------- runner ----------
+
+async def run_concurrent(total: int, concurrency: int, call: Callable[[int], Awaitable[bool]]) -> RunResult:
+    """Run call(0..total-1) on `concurrency` workers, timing every call"""
+    latencies: List[float] = []
+    errors = 0
+    indexes = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in indexes:
+            started = time.perf_counter()
+            try:
+                ok = await call(index)
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return latencies, errors, time.perf_counter() - started
+
+
+class ASGIWebSocket:
+    """Minimal in-process websocket client, runs the app's websocket route on this loop"""
+
+    def __init__(self, app, path: str, query_string: str):
+        self._app = app
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws",
+            "path": path, "raw_path": path.encode(), "query_string": query_string.encode(),
+            "headers": [(b"host", b"bench")], "subprotocols": [],
+            "client": ("127.0.0.1", 0), "server": ("bench", 80)
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        await self._inbox.put({"type": "websocket.connect"})
+        self._task = asyncio.create_task(self._app(self._scope, self._inbox.get, self._outbox.put))
+        message = await self._outbox.get()
+        if message["type"] != "websocket.accept":
+            raise ConnectionError(f"websocket rejected: {message}")
+
+    async def send(self, text: str):
+        await self._inbox.put({"type": "websocket.receive", "text": text})
+
+    async def recv(self) -> str:
+        message = await self._outbox.get()
+        if message["type"] == "websocket.close":
+            raise ConnectionError(f"websocket closed: {message}")
+        return message.get("text") or message.get("bytes", b"").decode()
+
+    async def close(self):
+        await self._inbox.put({"type": "websocket.disconnect", "code": 1000})
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=5)
+            except Exception:
+                pass  # the handler's own disconnect/teardown errors aren't the client's problem
+
+
+class BenchContext:
+    """http client, websocket factory and the seeded rows the scenarios pick from"""
+
+    def __init__(self, client, app=None, base_url: Optional[str] = None):
+        self.client = client
+        self.app = app
+        self.base_url = base_url
+        self.tokens: Dict[int, str] = {}
+        self.member_ids: List[int] = []
+        self.club_ids: List[int] = []
+        self.private_club: Optional[Tuple[int, int]] = None  # (club_id, admin_id)
+        self.joiner_ids: List[int] = []
+
+    @property
+    def remote(self) -> bool:
+        return self.base_url is not None
+
+    def token(self, user_id: int) -> str:
+        from app.utils.security import create_token
+        if user_id not in self.tokens:
+            self.tokens[user_id] = create_token(str(user_id))
+        return self.tokens[user_id]
+
+    async def call(self, method: str, path: str, user_id: int, **kwargs) -> bool:
+        response = await self.client.request(
+            method, path, headers={"Authorization": f"Bearer {self.token(user_id)}"}, **kwargs
+        )
+        if response.status_code >= 400:
+            return False
+        # the envelope carries the real status
+        return response.json().get("status", 200) < 400
+
+    async def websocket(self, path: str, user_id: int):
+        query = f"token={self.token(user_id)}"
+        if not self.remote:
+            socket = ASGIWebSocket(self.app, path, query)
+            await socket.connect()
+            return socket
+        import websockets
+        url = self.base_url.replace("http", "ws", 1).rstrip("/") + f"{path}?{query}"
+        return await websockets.connect(url)
+
+    def load_fixtures(self, limit: int, joiners: int):
+        """Pick deterministic users/clubs from the seeded db"""
+        from sqlalchemy import text
+        from app.core.database import engine
+
+        with engine.connect() as connection:
+            self.member_ids = list(connection.execute(text(
+                "SELECT DISTINCT user_id FROM members ORDER BY user_id LIMIT :limit"
+            ), {"limit": limit}).scalars())
+            self.club_ids = list(connection.execute(text(
+                "SELECT id FROM clubs ORDER BY id LIMIT :limit"
+            ), {"limit": limit}).scalars())
+            row = connection.execute(text(
+                "SELECT id, admin_id FROM clubs WHERE is_private AND member_count + :joiners <= max_players "
+                "ORDER BY id LIMIT 1"
+            ), {"joiners": joiners}).first()
+            if row is not None:
+                self.private_club = (row.id, row.admin_id)
+                # users that never asked to join, so join -> accept -> leave starts clean
+                self.joiner_ids = list(connection.execute(text(
+                    "SELECT u.id FROM users u WHERE u.id <> :admin_id "
+                    "AND NOT EXISTS (SELECT 1 FROM members m WHERE m.club_id = :club_id AND m.user_id = u.id) "
+                    "AND NOT EXISTS (SELECT 1 FROM club_join_requests r WHERE r.club_id = :club_id AND r.user_id = u.id) "
+                    "ORDER BY u.id LIMIT :limit"
+                ), {"club_id": row.id, "admin_id": row.admin_id, "limit": joiners}).scalars())
+
+        if not self.member_ids or not self.club_ids:
+            raise SystemExit("❌ No members/clubs found, seed the db first (scripts/seed_bulk.py)")
+
+
+# ---------- scenarios ----------
+
+def search_scenario(sort_by: str):
+    async def scenario(ctx: BenchContext, args) -> RunResult:
+        async def call(index):
+            params = {"sort_by": sort_by, "limit": args.page_size}
+            if sort_by == "relevance":
+                params["name"] = SEARCH_NAMES[index % len(SEARCH_NAMES)]
+            user_id = ctx.member_ids[index % len(ctx.member_ids)]
+            return await ctx.call("GET", "/clubs/search", user_id, params=params)
+        return await run_concurrent(args.requests, args.concurrency, call)
+    return scenario
+
+async def autocomplete(ctx: BenchContext, args) -> RunResult:
+    async def call(index):
+        user_id = ctx.member_ids[index % len(ctx.member_ids)]
+        prefix = SEARCH_NAMES[index % len(SEARCH_NAMES)][:2 + index % 3]
+        return await ctx.call("GET", "/clubs/autocomplete", user_id, params={"q": prefix})
+    return await run_concurrent(args.requests, args.concurrency, call)
+
+async def club_page(ctx: BenchContext, args) -> RunResult:
+    async def call(index):
+        user_id = ctx.member_ids[index % len(ctx.member_ids)]
+        return await ctx.call("GET", f"/clubs/{ctx.club_ids[index % len(ctx.club_ids)]}", user_id)
+    return await run_concurrent(args.requests, args.concurrency, call)
+
+async def my_clubs(ctx: BenchContext, args) -> RunResult:
+    async def call(index):
+        return await ctx.call("GET", "/clubs/my-clubs", ctx.member_ids[index % len(ctx.member_ids)])
+    return await run_concurrent(args.requests, args.concurrency, call)
+
+async def join_accept(ctx: BenchContext, args) -> Optional[RunResult]:
+    """One request = join a private club, admin accepts, then leave again (keeps the db reusable)"""
+    if ctx.private_club is None or not ctx.joiner_ids:
+        return None
+    club_id, admin_id = ctx.private_club
+
+    async def call(index):
+        user_id = ctx.joiner_ids[index]
+        return (
+            await ctx.call("POST", f"/clubs/{club_id}/join", user_id)
+            and await ctx.call("POST", f"/clubs/{club_id}/accept-request/{user_id}", admin_id)
+            and await ctx.call("DELETE", f"/clubs/{club_id}/leave", user_id)
+        )
+    return await run_concurrent(min(args.requests, len(ctx.joiner_ids)), args.concurrency, call)
+
+async def sse_storm(ctx: BenchContext, args) -> Optional[RunResult]:
+    """One request = an event fanned out to --sse-clients open streams, timed until all of them got it"""
+    if ctx.remote:
+        return None  # needs the manager of this process
+    from app.core.sse_manager import SSEEvent, sse_manager
+
+    user_ids = (ctx.member_ids * (args.sse_clients // len(ctx.member_ids) + 1))[:args.sse_clients]
+    connections = [(user_id, await sse_manager.connect(user_id)) for user_id in user_ids]
+    targets = sorted(set(user_ids))
+    latencies: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    try:
+        for index in range(args.requests):
+            sent = time.perf_counter()
+            await sse_manager.send_to_multiple_users(targets, SSEEvent(event_type="bench:storm", data={"seq": index}))
+            try:
+                received = await asyncio.wait_for(
+                    asyncio.gather(*(connection.get() for _, connection in connections)), timeout=5
+                )
+                errors += sum(1 for event in received if event is None)
+            except asyncio.TimeoutError:
+                errors += 1
+            latencies.append(time.perf_counter() - sent)
+    finally:
+        for user_id, connection in connections:
+            await sse_manager.disconnect(user_id, connection)
+    return latencies, errors, time.perf_counter() - started
+
+async def ws_location_flood(ctx: BenchContext, args) -> CountedRunResult:
+    """
+    --ws-clients sockets each sending --ws-messages moving updates, timed per round trip.
+    Every client is paced at --ws-interval (default: just under the per-connection rate limit),
+    so the load grows with the number of clients; throttled replies are counted on their own.
+    """
+    from app.core.config import settings
+
+    interval = args.ws_interval if args.ws_interval is not None else 1.1 / settings.LOCATION_MAX_UPDATES_PER_SECOND
+    rng = random.Random(args.seed)
+    latencies: List[float] = []
+    errors = 0
+    counts = {"rate_limited": 0, "suppressed": 0}
+
+    async def client(user_id: int):
+        nonlocal errors
+        lat, lng = 32.0853 + rng.uniform(-0.1, 0.1), 34.7818 + rng.uniform(-0.1, 0.1)
+        try:
+            socket = await ctx.websocket("/ws/location", user_id)
+        except Exception:
+            errors += args.ws_messages
+            return
+        try:
+            first = time.perf_counter()
+            for index in range(args.ws_messages):
+                # fixed schedule, a slow round trip doesn't push the next sends closer together
+                await asyncio.sleep(max(0.0, first + index * interval - time.perf_counter()))
+                lat, lng = lat + rng.uniform(-0.001, 0.001), lng + rng.uniform(-0.001, 0.001)
+                sent = time.perf_counter()
+                await socket.send(json.dumps({"lat": lat, "lng": lng}))
+                reply = json.loads(await socket.recv())
+                latencies.append(time.perf_counter() - sent)
+                if "error" in reply:
+                    errors += 1
+                elif reply.get("status") in counts:
+                    counts[reply["status"]] += 1
+        except Exception:
+            errors += 1
+        finally:
+            await socket.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(user_id) for user_id in ctx.member_ids[:args.ws_clients]))
+    return latencies, errors, time.perf_counter() - started, counts
+
+SCENARIOS: Dict[str, Callable[[BenchContext, Any], Awaitable[Optional[Union[RunResult, CountedRunResult]]]]] = {
+    **{f"search_{sort_by}": search_scenario(sort_by) for sort_by in SORT_OPTIONS},
+    "autocomplete": autocomplete,
+    "club_page": club_page,
+    "my_clubs": my_clubs,
+    "join_accept": join_accept,
+    "sse_storm": sse_storm,
+    "ws_location_flood": ws_location_flood,
+}
+
+
+# ---------- driver ----------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+async def run_all(ctx: BenchContext, names: List[str], args) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name in names:
+        scenario = SCENARIOS[name]
+        if args.warmup:
+            warmup_args = argparse.Namespace(**{**vars(args), "requests": args.warmup})
+            await scenario(ctx, warmup_args)
+        outcome = await scenario(ctx, args)
+        if outcome is None:
+            results[name] = {"skipped": True}
+            print(f"  ⏭️  {name:24} skipped", file=sys.stderr)
+            continue
+        results[name] = summary = summarize(*outcome)
+        print(
+            f"  ✅ {name:24} {summary['throughput_rps']:9.1f} req/s  p50 {summary['p50_ms']:8.2f}  "
+            f"p95 {summary['p95_ms']:8.2f}  p99 {summary['p99_ms']:8.2f} ms  errors {summary['errors']}"
+            + (f"  rate_limited {summary['rate_limited']}  suppressed {summary['suppressed']}" if "rate_limited" in summary else ""),
+            file=sys.stderr
+        )
+    return results
+
+async def bench(args) -> Dict[str, Any]:
+    import httpx
+
+    names = [name.strip() for name in args.scenarios.split(",")] if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"❌ Unknown scenarios: {', '.join(unknown)} (available: {', '.join(SCENARIOS)})")
+
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+            ctx = BenchContext(client, base_url=args.base_url)
+            ctx.load_fixtures(args.users, args.requests + args.warmup)
+            scenarios = await run_all(ctx, names, args)
+    else:
+        from app.main import app
+        # httpx doesn't run the lifespan, start the background services ourselves
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+                ctx = BenchContext(client, app=app)
+                ctx.load_fixtures(args.users, args.requests + args.warmup)
+                scenarios = await run_all(ctx, names, args)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "mode": "http" if args.base_url else "asgi",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed
+        },
+        "scenarios": scenarios
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the hot endpoints")
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--scenarios", help=f"comma separated, default all: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests before each scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--users", type=int, default=1000, help="distinct seeded users/clubs to rotate through")
+    parser.add_argument("--sse-clients", type=int, default=500)
+    parser.add_argument("--ws-clients", type=int, default=50)
+    parser.add_argument("--ws-messages", type=int, default=50)
+    parser.add_argument("--ws-interval", type=float, help="seconds between updates of one client (default: just under LOCATION_MAX_UPDATES_PER_SECOND)")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against this report, exit 1 on regression")
+    parser.add_argument("--save-baseline", help="write the report as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown vs the baseline")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print(f"📊 {args.requests} requests per scenario, concurrency {args.concurrency}", file=sys.stderr)
+    report = asyncio.run(bench(args))
+
+    body = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(body + "\n")
+    else:
+        print(body)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(body + "\n")
+        print(f"💾 Baseline saved to {args.save_baseline}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) vs {args.baseline}:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  - {regression}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ No regressions vs {args.baseline} (tolerance {args.tolerance:.0%})", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
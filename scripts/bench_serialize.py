@@ -0,0 +1,108 @@
+# scripts/bench_serialize.py
+# micro-benchmark for a search page: per-club populate_captains + model_validate + jsonable_encoder (old)
+# vs serialize_clubs + json_response (batched TypeAdapter validation, pydantic-core JSON)
+# usage: python scripts/bench_serialize.py [--clubs 100] [--members 100] [--repeat 5]
+import argparse
+import sys
+import time
+from datetime import datetime
+
+sys.path.append('.')
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.crud.club import serialize_clubs
+from app.models.club import Club
+from app.models.member import Member
+from app.models.user import User
+from app.models.enums import SportCategoryEnum, ClubStatusEnum
+from app.schemas.club import ClubFull
+from app.utils.response import success_response, json_response
+
+def make_page(clubs: int, members: int) -> list:
+    """Transient (never flushed) clubs with loaded members/users, like a search page"""
+    page = []
+    for club_id in range(1, clubs + 1):
+        admin = User(
+            id=club_id * 100000, first_name="Admin", last_name=str(club_id), image="default-profile.jpg",
+            email=f"admin{club_id}@example.com", phone={"prefix": "+972", "number": "0500000000"}
+        )
+        club_members = []
+        for index in range(members):
+            user_id = club_id * 100000 + index + 1
+            user = User(
+                id=user_id, first_name="Player", last_name=str(index), image="default-profile.jpg",
+                email=f"player{user_id}@example.com", phone={"prefix": "+972", "number": "0501234567"}
+            )
+            club_members.append(Member(
+                id=user_id, club_id=club_id, user_id=user_id, user=user, total_goals=index,
+                total_assists=0, total_games=10, skill_rating=7.5, positions=["MIDFIELDER"]
+            ))
+        club = Club(
+            id=club_id, name=f"Club {club_id}", description="Weekly pickup game", image="default-club.jpg",
+            admin_id=admin.id, sport_category=SportCategoryEnum.FOOTBALL, is_private=False,
+            max_players=members + 10, member_count=members, status=ClubStatusEnum.ACTIVE,
+            location={"city": "Tel Aviv", "lat": 32.08, "lng": 34.78},
+            captains_ids=[member.id for member in club_members[:: max(members // 10, 1)]],
+            created_at=datetime.now(), updated_at=datetime.now()
+        )
+        set_committed_value(club, "admin", admin)
+        set_committed_value(club, "members", club_members)
+        set_committed_value(club, "pending_join_requests", [])
+        page.append(club)
+    return page
+
+def legacy_serialize(clubs: list) -> list:
+    """The previous per-club path (models only)"""
+    result = []
+    for club in clubs:
+        club_dict = {}
+        for column in club.__table__.columns:
+            club_dict[column.name] = getattr(club, column.name)
+        club_dict['admin'] = club.admin
+        club_dict['members'] = club.members
+        club_dict['pending_requests'] = club.pending_requests
+        captains = []
+        if club.captains_ids and club.members:
+            captains = [member for member in club.members if member.id in club.captains_ids]
+        club_dict['captains'] = captains
+        result.append(ClubFull.model_validate(club_dict))
+    return result
+
+def legacy_response(clubs: list) -> list:
+    """What FastAPI did with the old result: jsonable_encoder over the envelope"""
+    return jsonable_encoder(success_response(data=legacy_serialize(clubs), message="Clubs retrieved successfully"))
+
+def batched_response(clubs: list) -> bytes:
+    return json_response(data=serialize_clubs(clubs), message="Clubs retrieved successfully").body
+
+def best_of(fn, page, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(page)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark club page serialization")
+    parser.add_argument("--clubs", type=int, default=100)
+    parser.add_argument("--members", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    page = make_page(args.clubs, args.members)
+    assert [club.model_dump() for club in legacy_serialize(page)] == [club.model_dump() for club in serialize_clubs(page)]
+
+    print(f"📊 {args.clubs} clubs x {args.members} members (best of {args.repeat})")
+    for label, legacy_fn, batched_fn in (
+        ("models", legacy_serialize, serialize_clubs),
+        ("response", legacy_response, batched_response),
+    ):
+        legacy = best_of(legacy_fn, page, args.repeat)
+        batched = best_of(batched_fn, page, args.repeat)
+        print(f"  {label:9}: legacy {legacy * 1000:8.1f} ms | batched {batched * 1000:8.1f} ms | {legacy / batched:6.2f}x")
+
+if __name__ == "__main__":
+    main()
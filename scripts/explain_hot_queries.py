@@ -0,0 +1,138 @@
+# scripts/explain_hot_queries.py
+# EXPLAIN ANALYZE of the hot lookups, to check what an index migration buys
+# usage (against a seeded db, see scripts/seed_bulk.py):
+#   python scripts/explain_hot_queries.py --output before.json
+#   alembic upgrade head
+#   python scripts/explain_hot_queries.py --compare before.json
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+sys.path.append('.')
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+# (name, where it comes from, sql) - kept in the shape the ORM emits
+HOT_QUERIES = [
+    ("member_exists", "crud.club.join_club / leave_club",
+     "SELECT id FROM members WHERE club_id = :club_id AND user_id = :user_id LIMIT 1"),
+    ("user_memberships", "crud.club.get_user_clubs (member_club_ids)",
+     "SELECT club_id FROM members WHERE user_id = :user_id"),
+    ("owned_clubs", "crud.club.create_club (owned_clubs)",
+     "SELECT id FROM clubs WHERE admin_id = :user_id"),
+    ("my_clubs", "crud.club.get_user_clubs",
+     "SELECT * FROM clubs WHERE admin_id = :user_id "
+     "OR id IN (SELECT club_id FROM members WHERE user_id = :user_id) ORDER BY id"),
+    ("club_members", "selectinload(Club.members)",
+     "SELECT * FROM members WHERE club_id = ANY(:club_ids)"),
+    ("club_events", "Club.events",
+     "SELECT * FROM events WHERE club_id = :club_id"),
+    ("event_games", "Event.games",
+     "SELECT * FROM games WHERE event_id = ANY(:event_ids)"),
+    ("phone_exists", "crud.user.register",
+     "SELECT id FROM users WHERE (phone ->> 'number') = :phone_number LIMIT 1"),
+    ("captain_clubs", "clubs a member captains",
+     "SELECT id FROM clubs WHERE captains_ids @> ARRAY[CAST(:member_id AS integer)]"),
+]
+
+
+def pick_params(connection) -> Dict[str, Any]:
+    """Real ids from the db: the busiest user/club so the lookups return rows"""
+    def scalar(sql, default=0):
+        value = connection.execute(text(sql)).scalar()
+        return default if value is None else value
+
+    user_id = scalar("SELECT user_id FROM members GROUP BY user_id ORDER BY count(*) DESC, user_id LIMIT 1")
+    club_ids = list(connection.execute(text(
+        "SELECT club_id FROM members WHERE user_id = :user_id ORDER BY club_id"
+    ), {"user_id": user_id}).scalars()) or [0]
+    event_ids = list(connection.execute(text(
+        "SELECT id FROM events WHERE club_id = :club_id ORDER BY id LIMIT 50"
+    ), {"club_id": club_ids[0]}).scalars()) or [0]
+    return {
+        "user_id": user_id,
+        "club_id": club_ids[0],
+        "club_ids": club_ids,
+        "event_ids": event_ids,
+        "phone_number": scalar("SELECT phone ->> 'number' FROM users WHERE phone ->> 'number' IS NOT NULL ORDER BY id LIMIT 1", ""),
+        "member_id": scalar("SELECT captains_ids[1] FROM clubs WHERE cardinality(captains_ids) > 0 ORDER BY id LIMIT 1"),
+    }
+
+def plan_nodes(plan: Dict[str, Any]) -> List[str]:
+    """'Index Scan on members' style labels of every node in the plan tree"""
+    label = plan["Node Type"]
+    if "Index Name" in plan:
+        label += f" using {plan['Index Name']}"
+    elif "Relation Name" in plan:
+        label += f" on {plan['Relation Name']}"
+    nodes = [label]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+def explain(connection, sql: str, params: Dict[str, Any], runs: int) -> Dict[str, Any]:
+    """Best of `runs` EXPLAIN ANALYZE executions (the first one warms the cache)"""
+    best = None
+    for _ in range(runs):
+        result = connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+        plan = (json.loads(result) if isinstance(result, str) else result)[0]
+        if best is None or plan["Execution Time"] < best["Execution Time"]:
+            best = plan
+    return {
+        "execution_ms": round(best["Execution Time"], 3),
+        "planning_ms": round(best["Planning Time"], 3),
+        "rows": best["Plan"].get("Actual Rows"),
+        "nodes": plan_nodes(best["Plan"])
+    }
+
+def print_report(report: Dict[str, Any], before: Optional[Dict[str, Any]] = None):
+    for name, result in report["queries"].items():
+        scans = ", ".join(node for node in result["nodes"] if "Scan" in node)
+        line = f"  {name:18} {result['execution_ms']:10.3f} ms"
+        previous = before.get("queries", {}).get(name) if before else None
+        if previous:
+            speedup = previous["execution_ms"] / result["execution_ms"] if result["execution_ms"] else 0
+            line = f"  {name:18} {previous['execution_ms']:10.3f} -> {result['execution_ms']:10.3f} ms ({speedup:6.1f}x)"
+        print(line)
+        if previous and previous["nodes"] != result["nodes"]:
+            print(f"      before: {', '.join(node for node in previous['nodes'] if 'Scan' in node)}")
+        print(f"      {'after' if previous else 'plan'}:  {scans}")
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE the hot queries")
+    parser.add_argument("--dsn", default=settings.DATABASE_URL)
+    parser.add_argument("--runs", type=int, default=3, help="executions per query, the fastest is kept")
+    parser.add_argument("--output", help="save the report as JSON (e.g. before.json)")
+    parser.add_argument("--compare", help="a report saved before the migration")
+    args = parser.parse_args()
+
+    engine = create_engine(args.dsn)
+    with engine.connect() as connection:
+        params = pick_params(connection)
+        report = {"params": params, "queries": {}}
+        for name, source, sql in HOT_QUERIES:
+            try:
+                report["queries"][name] = {"source": source, **explain(connection, sql, params, args.runs)}
+            except Exception as e:
+                print(f"❌ {name}: {e}")
+                connection.rollback()
+        connection.rollback()  # EXPLAIN ANALYZE runs the statements, nothing to keep
+
+    before = None
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+
+    print(f"📊 Hot queries for user {params['user_id']} / club {params['club_id']} (best of {args.runs})")
+    print_report(report, before)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+# scripts/seed_bulk.py
+"""
+Bulk perf dataset generator (data.py is for the small demo set).
+
+    python scripts/seed_bulk.py --users 1000000 --clubs 50000 --memberships 5000000 --workers 8 --truncate
+
+Rows are written with COPY (psycopg2) or multi-row INSERT batches (--method insert),
+in parallel chunks. Every chunk has its own rng seeded from (--seed, table, chunk),
+and ids are assigned up front, so the same arguments always give the same dataset
+no matter how many workers run it. All users share one precomputed password hash.
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from multiprocessing import Pool
+
+sys.path.append('.')
+
+from sqlalchemy import ARRAY, create_engine, insert, text
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.club import Club
+from app.models.member import Member
+from app.models.club_join_request import ClubJoinRequest
+from app.models.event import Event
+from app.models.game import Game
+from app.models.role import Role
+from app.models.enums import (
+    SportCategoryEnum, ClubStatusEnum, RequestStatusEnum, EventStatusEnum,
+    StrongSideEnum, AccountStatusEnum, FootballPositionsEnum, BasketballPositionsEnum
+)
+from app.utils.security import hash_password
+
+# (city, lat, lng), users and clubs are spread around these
+CITIES = [
+    ("Tel Aviv", 32.0853, 34.7818),
+    ("Jerusalem", 31.7683, 35.2137),
+    ("Haifa", 32.7940, 34.9896),
+    ("Rishon Letzion", 31.9730, 34.7925),
+    ("Petah Tikva", 32.0840, 34.8878),
+    ("Ashdod", 31.8044, 34.6553),
+    ("Netanya", 32.3215, 34.8532),
+    ("Beer Sheva", 31.2518, 34.7913),
+    ("Holon", 32.0158, 34.7874),
+    ("Ramat Gan", 32.0684, 34.8248),
+]
+FIRST_NAMES = ["Ori", "David", "Sarah", "Michael", "Noa", "Yossi", "Dana", "Avi", "Maya", "Eitan", "Tamar", "Omer"]
+LAST_NAMES = ["Cohen", "Levi", "Mizrahi", "Peretz", "Biton", "Dahan", "Friedman", "Azulay", "Katz", "Malka"]
+CLUB_WORDS = ["United", "City", "Stars", "Lions", "Eagles", "Rangers", "Strikers", "Legends", "Warriors", "Kings"]
+
+FOOTBALL_POSITIONS = [position.value for position in FootballPositionsEnum]
+BASKETBALL_POSITIONS = [position.value for position in BasketballPositionsEnum]
+
+TABLES = [User, Club, Member, ClubJoinRequest, Event, Game]
+
+# image only has a python-side default on the models, COPY / INSERT of raw rows has to write it
+DEFAULT_USER_IMAGE = User.__table__.c.image.default.arg
+DEFAULT_CLUB_IMAGE = Club.__table__.c.image.default.arg
+DEFAULT_EVENT_IMAGE = Event.__table__.c.image.default.arg
+
+USER_COLUMNS = [
+    "id", "first_name", "last_name", "image", "year_of_birth", "email", "is_email_verified", "phone",
+    "city", "country", "sport_category", "positions", "cm", "kg", "strong_side", "avg_skill_rating",
+    "password", "account_status", "location", "favorite_fields", "friends", "friend_requests",
+    "club_requests", "total_games", "total_points", "total_assists", "role_id", "created_at"
+]
+CLUB_COLUMNS = [
+    "id", "name", "description", "image", "admin_id", "captains_ids", "sport_category", "is_private",
+    "max_players", "member_count", "status", "location", "lat", "lng", "created_at"
+]
+MEMBER_COLUMNS = [
+    "id", "club_id", "user_id", "total_goals", "total_assists", "total_games", "skill_rating",
+    "positions", "created_at"
+]
+JOIN_REQUEST_COLUMNS = ["id", "club_id", "user_id", "status", "created_at"]
+EVENT_COLUMNS = [
+    "id", "name", "description", "image", "club_id", "location", "start_time", "end_time", "teams",
+    "sport_category", "status", "max_participants", "min_participants_to_start", "cost", "created_at"
+]
+GAME_COLUMNS = ["id", "name", "event_id", "teams", "goals", "result", "winner", "created_at"]
+
+_engine = None
+
+
+def _get_engine(dsn):
+    """One engine per worker process"""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(dsn, pool_size=1, max_overflow=0)
+    return _engine
+
+def _rng(seed, table, chunk_index):
+    # str seeds are hashed with sha512, so this is stable across processes and runs
+    return random.Random(f"{seed}:{table}:{chunk_index}")
+
+def _jitter(rng, lat, lng, spread=0.15):
+    return round(lat + rng.uniform(-spread, spread), 6), round(lng + rng.uniform(-spread, spread), 6)
+
+
+# ---------- COPY / INSERT writers ----------
+
+def _copy_value(value, is_array):
+    if value is None:
+        return None
+    if isinstance(value, Enum):
+        return value.name  # db enum labels are the enum names
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        if is_array:
+            return "{" + ",".join(json.dumps(item) for item in value) + "}"
+        return json.dumps(value)
+    return value
+
+def write_rows(connection, model, columns, rows, method, batch_size=1000):
+    """Write a list of row tuples with COPY or multi-row INSERTs"""
+    if not rows:
+        return
+    table = model.__table__
+
+    if method == "copy":
+        array_flags = [isinstance(table.c[column].type, ARRAY) for column in columns]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(value, flag) for value, flag in zip(row, array_flags)])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()  # raw psycopg2 cursor
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+        return
+
+    for start in range(0, len(rows), batch_size):
+        batch = [dict(zip(columns, row)) for row in rows[start:start + batch_size]]
+        connection.execute(insert(table).values(batch))
+
+
+# ---------- row generators ----------
+
+def generate_users(ctx, chunk_index, start, end):
+    """Users with index in [start, end), club admins get the premium role"""
+    rng = _rng(ctx["seed"], "users", chunk_index)
+    rows = []
+    for index in range(start, end):
+        user_id = ctx["user_base"] + index
+        city, city_lat, city_lng = rng.choice(CITIES)
+        lat, lng = _jitter(rng, city_lat, city_lng)
+        is_football = rng.random() < 0.8
+        positions = rng.sample(FOOTBALL_POSITIONS if is_football else BASKETBALL_POSITIONS, rng.randint(1, 3))
+        is_admin = index % ctx["admin_stride"] == 0 and index // ctx["admin_stride"] < ctx["clubs"]
+        rows.append((
+            user_id,
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            DEFAULT_USER_IMAGE,
+            rng.randint(1970, 2010),
+            f"user{user_id}@seed.goalgg.test",
+            rng.random() < 0.7,
+            {"prefix": "+972", "number": f"05{user_id:08d}"},
+            city,
+            "Israel",
+            SportCategoryEnum.FOOTBALL if is_football else SportCategoryEnum.BASKETBALL,
+            positions,
+            rng.randint(155, 205),
+            rng.randint(50, 110),
+            rng.choice(list(StrongSideEnum)),
+            round(rng.uniform(3, 10), 1),
+            ctx["password_hash"],
+            AccountStatusEnum.ACTIVE,
+            {"lat": lat, "lng": lng},
+            [], [], [], [],
+            rng.randint(0, 300),
+            rng.randint(0, 200),
+            rng.randint(0, 150),
+            ctx["premium_role_id"] if is_admin else ctx["user_role_id"],
+            ctx["reference_date"] - timedelta(days=rng.randint(0, 1000))
+        ))
+    return {User: (USER_COLUMNS, rows)}
+
+def generate_clubs(ctx, chunk_index, start, end):
+    """Clubs with index in [start, end) plus their members, join requests, events and games"""
+    rng = _rng(ctx["seed"], "clubs", chunk_index)
+    users = ctx["users"]
+    user_base = ctx["user_base"]
+    reference_date = ctx["reference_date"]
+    clubs, members, join_requests, events, games = [], [], [], [], []
+
+    for index in range(start, end):
+        club_id = ctx["club_base"] + index
+        admin_id = user_base + index * ctx["admin_stride"]
+        city, city_lat, city_lng = rng.choice(CITIES)
+        lat, lng = _jitter(rng, city_lat, city_lng)
+        sport = SportCategoryEnum.FOOTBALL if rng.random() < 0.8 else SportCategoryEnum.BASKETBALL
+        positions = FOOTBALL_POSITIONS if sport == SportCategoryEnum.FOOTBALL else BASKETBALL_POSITIONS
+        max_players = rng.choice(ctx["max_players_choices"])
+        is_private = rng.random() < ctx["private_ratio"]
+
+        # admin is always the first member, like crud.club.create_club
+        wanted = max(1, min(max_players, users, int(rng.gauss(ctx["members_per_club"], ctx["members_per_club"] * 0.4))))
+        member_user_ids = [admin_id]
+        taken = {admin_id}
+        while len(member_user_ids) < wanted:
+            user_id = user_base + rng.randrange(users)
+            if user_id not in taken:
+                taken.add(user_id)
+                member_user_ids.append(user_id)
+
+        # member / request / event ids are strided per club so chunks never overlap
+        member_ids = []
+        for slot, user_id in enumerate(member_user_ids):
+            member_id = ctx["member_base"] + index * ctx["member_stride"] + slot
+            member_ids.append(member_id)
+            members.append((
+                member_id, club_id, user_id,
+                rng.randint(0, 40), rng.randint(0, 30), rng.randint(0, 60),
+                round(rng.uniform(3, 10), 1),
+                rng.sample(positions, rng.randint(1, 2)),
+                reference_date - timedelta(days=rng.randint(0, 365))
+            ))
+
+        captains = rng.sample(member_ids[1:], min(2, len(member_ids) - 1))
+        clubs.append((
+            club_id,
+            f"{city} {rng.choice(CLUB_WORDS)} {club_id}"[:30],
+            f"{sport.value.title()} club in {city}",
+            DEFAULT_CLUB_IMAGE,
+            admin_id,
+            captains,
+            sport,
+            is_private,
+            max_players,
+            len(member_user_ids),
+            ClubStatusEnum.FULL if len(member_user_ids) >= max_players else ClubStatusEnum.ACTIVE,
+            {"city": city, "country": "Israel", "address": None, "lat": lat, "lng": lng},
+            lat,
+            lng,
+            reference_date - timedelta(days=rng.randint(0, 1000))
+        ))
+
+        if is_private and len(member_user_ids) < max_players:
+            for slot in range(rng.randint(0, ctx["requests_per_private_club"])):
+                user_id = user_base + rng.randrange(users)
+                if user_id in taken:
+                    continue
+                taken.add(user_id)
+                join_requests.append((
+                    ctx["request_base"] + index * ctx["requests_per_private_club"] + slot,
+                    club_id, user_id, RequestStatusEnum.PENDING,
+                    reference_date - timedelta(days=rng.randint(0, 30))
+                ))
+
+        for slot in range(ctx["events_per_club"]):
+            event_id = ctx["event_base"] + index * ctx["events_per_club"] + slot
+            start_time = reference_date + timedelta(days=rng.randint(-180, 60), hours=rng.randint(8, 21))
+            completed = start_time < reference_date
+            players = rng.sample(member_user_ids, min(len(member_user_ids), 10))
+            half = len(players) // 2
+            events.append((
+                event_id,
+                f"{city} {sport.value} night {slot + 1}",
+                f"Weekly {sport.value} game of club {club_id}",
+                DEFAULT_EVENT_IMAGE,
+                club_id,
+                {"address": f"{city} field {rng.randint(1, 20)}", "lat": lat, "lng": lng},
+                start_time,
+                start_time + timedelta(hours=2),
+                {"a": players[:half], "b": players[half:]},
+                sport,
+                EventStatusEnum.COMPLETED if completed else EventStatusEnum.UPCOMING,
+                rng.choice((10, 14, 20, 50)),
+                5,
+                rng.choice((0.0, 20.0, 30.0, 50.0)),
+                start_time - timedelta(days=rng.randint(1, 14))
+            ))
+
+            # only played events have games
+            if not completed:
+                continue
+            team_a, team_b = players[:half] or players, players[half:]
+            for game_slot in range(ctx["games_per_event"]):
+                score_a, score_b = rng.randint(0, 5), rng.randint(0, 5)
+                goals = [{"team": "a", "scorer": rng.choice(team_a), "assist": None} for _ in range(score_a)]
+                goals += [{"team": "b", "scorer": rng.choice(team_b), "assist": None} for _ in range(score_b)]
+                games.append((
+                    ctx["game_base"] + (event_id - ctx["event_base"]) * ctx["games_per_event"] + game_slot,
+                    f"Game {game_slot + 1}",
+                    event_id,
+                    ["a", "b"],
+                    goals,
+                    {"team_a": score_a, "team_b": score_b},
+                    "a" if score_a > score_b else "b" if score_b > score_a else "draw",
+                    start_time
+                ))
+
+    return {
+        Club: (CLUB_COLUMNS, clubs),
+        Member: (MEMBER_COLUMNS, members),
+        ClubJoinRequest: (JOIN_REQUEST_COLUMNS, join_requests),
+        Event: (EVENT_COLUMNS, events),
+        Game: (GAME_COLUMNS, games),
+    }
+
+GENERATORS = {"users": generate_users, "clubs": generate_clubs}
+
+
+def run_chunk(job):
+    """Generate and write one chunk in its own transaction (runs in a worker process)"""
+    kind, chunk_index, start, end, ctx = job
+    started = time.perf_counter()
+    tables = GENERATORS[kind](ctx, chunk_index, start, end)
+    with _get_engine(ctx["dsn"]).begin() as connection:
+        # clubs -> members/requests/events -> games, parents first
+        for model in TABLES:
+            if model in tables:
+                columns, rows = tables[model]
+                write_rows(connection, model, columns, rows, ctx["method"])
+    counts = {model.__tablename__: len(rows) for model, (_, rows) in tables.items()}
+    return kind, chunk_index, counts, time.perf_counter() - started
+
+
+# ---------- driver ----------
+
+def _chunks(kind, total, chunk_size, ctx):
+    return [
+        (kind, chunk_index, start, min(start + chunk_size, total), ctx)
+        for chunk_index, start in enumerate(range(0, total, chunk_size))
+    ]
+
+def _next_id(connection, model):
+    return connection.execute(text(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {model.__tablename__}")).scalar()
+
+def _role_ids(connection):
+    roles = dict(connection.execute(text(f"SELECT name, id FROM {Role.__tablename__}")).all())
+    if "user" not in roles or "premium" not in roles:
+        print("❌ Roles are missing, run scripts/roles.py first")
+        sys.exit(1)
+    return roles["user"], roles["premium"]
+
+def run_jobs(pool, jobs, label):
+    totals = {}
+    started = time.perf_counter()
+    for done, (kind, chunk_index, counts, elapsed) in enumerate(pool.imap_unordered(run_chunk, jobs), start=1):
+        for table, count in counts.items():
+            totals[table] = totals.get(table, 0) + count
+        print(f"  ✅ {label} chunk {chunk_index} ({done}/{len(jobs)}) in {elapsed:.1f}s")
+    print(f"  ⏱️  {label}: {totals} in {time.perf_counter() - started:.1f}s")
+
+def seed(args):
+    engine = create_engine(args.dsn)
+    members_per_club = max(1, args.memberships // max(args.clubs, 1))
+    if args.clubs > args.users:
+        print("❌ Every club needs its own admin, --clubs must be <= --users")
+        sys.exit(1)
+
+    with engine.begin() as connection:
+        if args.truncate:
+            print("🧹 Truncating seeded tables...")
+            names = ", ".join(model.__tablename__ for model in reversed(TABLES))
+            connection.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+        user_role_id, premium_role_id = _role_ids(connection)
+        bases = {f"{name}_base": _next_id(connection, model) for name, model in (
+            ("user", User), ("club", Club), ("member", Member),
+            ("request", ClubJoinRequest), ("event", Event), ("game", Game)
+        )}
+
+    print("🔐 Hashing the shared password once...")
+    max_players_choices = tuple(max(25, int(members_per_club * factor)) for factor in (1.5, 2, 3))
+    ctx = {
+        "dsn": args.dsn,
+        "method": args.method,
+        "seed": args.seed,
+        "password_hash": hash_password(args.password),
+        "reference_date": datetime.fromisoformat(args.reference_date),
+        "users": args.users,
+        "clubs": args.clubs,
+        "admin_stride": max(1, args.users // max(args.clubs, 1)),
+        "members_per_club": members_per_club,
+        "max_players_choices": max_players_choices,
+        "member_stride": max(max_players_choices),
+        "private_ratio": args.private_ratio,
+        "requests_per_private_club": args.requests_per_private_club,
+        "events_per_club": args.events_per_club,
+        "games_per_event": args.games_per_event,
+        "user_role_id": user_role_id,
+        "premium_role_id": premium_role_id,
+        **bases
+    }
+
+    print(f"🚀 Seeding {args.users} users, {args.clubs} clubs (~{members_per_club} members each) "
+          f"with {args.workers} workers via {args.method}...")
+    started = time.perf_counter()
+    with Pool(args.workers) as pool:
+        # users first, clubs reference them
+        run_jobs(pool, _chunks("users", args.users, args.chunk_size, ctx), "users")
+        run_jobs(pool, _chunks("clubs", args.clubs, max(1, args.chunk_size // max(members_per_club, 1)), ctx), "clubs")
+
+    print("🔧 Resetting sequences and analyzing...")
+    with engine.begin() as connection:
+        for model in TABLES:
+            name = model.__tablename__
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), COALESCE((SELECT MAX(id) FROM {name}), 1))"
+            ))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for model in TABLES:
+            connection.execute(text(f"ANALYZE {model.__tablename__}"))
+
+    print(f"\n🎉 Done in {time.perf_counter() - started:.1f}s, every seeded user's password is '{args.password}'")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a large deterministic dataset for perf testing")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--clubs", type=int, default=50_000)
+    parser.add_argument("--memberships", type=int, default=5_000_000, help="approximate total, admins included")
+    parser.add_argument("--events-per-club", type=int, default=4)
+    parser.add_argument("--games-per-event", type=int, default=2)
+    parser.add_argument("--private-ratio", type=float, default=0.3)
+    parser.add_argument("--requests-per-private-club", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="rows per user chunk / members per club chunk")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--method", choices=("copy", "insert"), default="copy")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--reference-date", default="2025-06-01", help="'now' of the dataset, keeps it reproducible")
+    parser.add_argument("--dsn", default=settings.DATABASE_URL)
+    parser.add_argument("--truncate", action="store_true", help="empty the seeded tables first (roles are kept)")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    seed(parse_args())
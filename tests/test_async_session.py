@@ -0,0 +1,66 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.core.database import run_in_session
+from app.crud import club as crud_club, club_async, user as crud_user, user_async
+
+
+@pytest.fixture
+def sqlite_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    session = Session(bind=engine)
+    yield session
+    session.close()
+    engine.dispose()
+
+def select_one(session):
+    return session.execute(text("SELECT 1")).scalar(), threading.get_ident()
+
+@pytest.mark.asyncio
+async def test_sync_session_runs_in_the_threadpool(sqlite_session):
+    value, thread_id = await run_in_session(sqlite_session, select_one)
+
+    assert value == 1
+    assert thread_id != threading.get_ident()  # not on the event loop
+
+@pytest.mark.asyncio
+async def test_async_session_runs_through_run_sync():
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+    try:
+        async with AsyncSession(engine) as session:
+            value, _ = await run_in_session(session, select_one)
+    finally:
+        await engine.dispose()
+
+    assert value == 1
+
+@pytest.mark.asyncio
+async def test_user_async_passes_the_session_to_the_sync_crud(sqlite_session, monkeypatch):
+    monkeypatch.setattr(crud_user, "get_user_by_id", lambda session, user_id: (session, user_id, select_one(session)[0]))
+
+    assert await user_async.get_user_by_id(sqlite_session, 5) == (sqlite_session, 5, 1)
+
+@pytest.mark.asyncio
+async def test_club_async_passes_the_arguments_through(sqlite_session, monkeypatch):
+    calls = []
+
+    def search_clubs(current_user, db, **kwargs):
+        calls.append((db, kwargs))
+        return [select_one(db)[0]], None
+
+    monkeypatch.setattr(crud_club, "search_clubs", search_clubs)
+    user = SimpleNamespace(id=1)
+
+    result = await club_async.search_clubs(user, sqlite_session, name="hap", sort_by="distance", radius_km=3.0, limit=5)
+
+    assert result == ([1], None)
+    db, kwargs = calls[0]
+    assert db is sqlite_session
+    assert (kwargs["name"], kwargs["sort_by"], kwargs["radius_km"], kwargs["limit"]) == ("hap", "distance", 3.0, 5)
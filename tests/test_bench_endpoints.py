@@ -0,0 +1,117 @@
+import argparse
+import json
+from types import SimpleNamespace
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import WebSocketRoute
+
+from scripts.bench_endpoints import ASGIWebSocket, compare, percentile, run_concurrent, summarize, ws_location_flood
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([], 95) == 0.0
+
+def test_summarize_reports_milliseconds_and_throughput():
+    summary = summarize([0.01, 0.02, 0.03, 0.04], errors=1, elapsed=2.0)
+
+    assert summary["requests"] == 4
+    assert summary["errors"] == 1
+    assert summary["throughput_rps"] == 2.0
+    assert summary["p50_ms"] == 20.0
+    assert summary["max_ms"] == 40.0
+
+def test_summarize_keeps_extra_counts():
+    summary = summarize([0.01], errors=0, elapsed=1.0, counts={"rate_limited": 2, "suppressed": 3})
+
+    assert summary["rate_limited"] == 2
+    assert summary["suppressed"] == 3
+    assert summary["requests"] == 1
+
+def test_compare_flags_slower_percentiles_lower_throughput_and_new_errors():
+    base = {"requests": 100, "errors": 0, "throughput_rps": 100.0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0}
+    baseline = {"scenarios": {"club_page": base, "my_clubs": base, "sse_storm": {"skipped": True}}}
+    results = {"scenarios": {
+        "club_page": {**base, "p95_ms": 21.0},  # within tolerance
+        "my_clubs": {**base, "p99_ms": 40.0, "throughput_rps": 70.0, "errors": 2},
+        "sse_storm": {**base, "p50_ms": 100.0},  # no baseline numbers
+        "club_new": base
+    }}
+
+    regressions = compare(results, baseline, tolerance=0.2)
+
+    assert regressions == [
+        "my_clubs: p99_ms 30.0 -> 40.0",
+        "my_clubs: throughput_rps 100.0 -> 70.0",
+        "my_clubs: errors 0 -> 2"
+    ]
+
+@pytest.mark.asyncio
+async def test_run_concurrent_times_every_call_and_counts_failures():
+    seen = []
+
+    async def call(index):
+        seen.append(index)
+        if index == 3:
+            raise RuntimeError("boom")
+        return index % 2 == 0
+
+    latencies, errors, elapsed = await run_concurrent(10, 4, call)
+
+    assert sorted(seen) == list(range(10))
+    assert len(latencies) == 10
+    assert errors == 5  # 1, 3 (raised), 5, 7, 9
+    assert elapsed >= 0
+
+@pytest.mark.asyncio
+async def test_asgi_websocket_round_trip():
+    async def echo(websocket):
+        assert websocket.query_params["token"] == "abc"
+        await websocket.accept()
+        while True:
+            text = await websocket.receive_text()
+            await websocket.send_text(text.upper())
+
+    app = Starlette(routes=[WebSocketRoute("/ws/echo", echo)])
+    socket = ASGIWebSocket(app, "/ws/echo", "token=abc")
+    await socket.connect()
+    await socket.send("hello")
+
+    assert await socket.recv() == "HELLO"
+    await socket.close()
+
+@pytest.mark.asyncio
+async def test_ws_location_flood_counts_throttled_replies_apart_from_errors():
+    replies = [{"status": "location updated"}, {"status": "suppressed", "reason": "too_soon"},
+               {"status": "rate_limited"}, {"error": "Invalid lat or lng"}]
+
+    class FakeSocket:
+        def __init__(self):
+            self.replies = iter(replies)
+
+        async def send(self, text):
+            json.loads(text)
+
+        async def recv(self):
+            return json.dumps(next(self.replies))
+
+        async def close(self):
+            pass
+
+    async def websocket(path, user_id):
+        return FakeSocket()
+
+    ctx = SimpleNamespace(member_ids=[1, 2], websocket=websocket)
+    args = argparse.Namespace(seed=1, ws_clients=2, ws_messages=4, ws_interval=0.0)
+
+    latencies, errors, _, counts = await ws_location_flood(ctx, args)
+
+    assert len(latencies) == 8
+    assert errors == 2
+    assert counts == {"rate_limited": 2, "suppressed": 2}
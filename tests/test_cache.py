@@ -0,0 +1,58 @@
+import time
+
+from app.core.cache import TTLCache
+
+
+def test_get_set_counts_hits_and_misses():
+    cache = TTLCache(max_size=10, ttl_seconds=60)
+    assert cache.get(1) is None
+    cache.set(1, "user-1")
+    assert cache.get(1) == "user-1"
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+def test_entries_expire():
+    cache = TTLCache(max_size=10, ttl_seconds=0.01)
+    cache.set(1, "user-1")
+    time.sleep(0.02)
+    assert cache.get(1) is None
+    assert len(cache) == 0
+
+def test_lru_eviction():
+    cache = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)  # 1 is now most recently used
+    cache.set(3, "c")
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+    assert cache.stats()["evictions"] == 1
+
+def test_invalidate():
+    cache = TTLCache(max_size=10, ttl_seconds=60)
+    cache.set(1, "a")
+    cache.invalidate(1)
+    cache.invalidate(2)  # missing keys are ignored
+    assert cache.get(1) is None
+
+def test_peek_leaves_counters_and_expiry_alone():
+    cache = TTLCache(max_size=10, ttl_seconds=0.05)
+    cache.set(1, "a")
+    assert cache.peek(1) == "a"
+    assert cache.peek(2) is None
+    assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 0
+    time.sleep(0.06)
+    assert cache.peek(1) is None
+
+def test_replace_keeps_the_expiry_and_skips_missing_entries():
+    cache = TTLCache(max_size=10, ttl_seconds=0.05)
+    cache.set(1, "a")
+    assert cache.replace(1, str.upper)
+    assert not cache.replace(2, str.upper)
+    assert cache.peek(1) == "A" and cache.peek(2) is None
+    time.sleep(0.06)
+    assert cache.peek(1) is None  # not extended by the replace
+    assert not cache.replace(1, str.upper)
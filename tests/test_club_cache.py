@@ -0,0 +1,106 @@
+import pytest
+
+from app.core.cache import (
+    ClubPayloadCache, InMemoryCacheBackend, RedisCacheBackend, UserClubsCache, etag_matches
+)
+
+
+class FakeRedis:
+    """The subset of redis.Redis used by RedisCacheBackend"""
+
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+
+    def get(self, key):
+        value = self.values.get(key)
+        return value.encode() if isinstance(value, str) else value
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.expiry[key] = ex
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    if request.param == "memory":
+        backend = InMemoryCacheBackend(max_size=10, ttl_seconds=60)
+    else:
+        backend = RedisCacheBackend(FakeRedis())
+    return ClubPayloadCache(backend, ttl_seconds=60)
+
+def test_payload_round_trip(cache):
+    version = cache.version(1)
+    assert cache.get(1, version) is None
+
+    etag = cache.set(1, version, '{"id": 1}')
+
+    assert cache.get(1, cache.version(1)) == (etag, '{"id": 1}')
+
+def test_invalidate_bumps_version(cache):
+    version = cache.version(1)
+    cache.set(1, version, '{"id": 1}')
+
+    cache.invalidate(1)
+
+    assert cache.version(1) == version + 1
+    assert cache.get(1, cache.version(1)) is None
+
+def test_write_during_load_is_not_served(cache):
+    # version read, then a join lands before the loaded payload is stored
+    version = cache.version(1)
+    cache.invalidate(1)
+    cache.set(1, version, '{"member_count": 1}')
+
+    assert cache.get(1, cache.version(1)) is None
+
+def test_redis_entries_get_a_ttl():
+    client = FakeRedis()
+    cache = ClubPayloadCache(RedisCacheBackend(client), ttl_seconds=300)
+    cache.set(7, 0, "{}")
+
+    assert client.expiry["club:7:v0"] == 300
+
+def test_etag_matching():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"def"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+def test_user_clubs_round_trip(cache):
+    user_clubs = UserClubsCache(cache, ttl_seconds=60)
+    version = user_clubs.version(5)
+    assert user_clubs.get(5, version) is None
+
+    etag = user_clubs.set(5, version, [1, 2], '{"total_clubs": 2}')
+
+    assert user_clubs.get(5, user_clubs.version(5)) == (etag, '{"total_clubs": 2}')
+
+def test_user_clubs_invalidated_by_membership_change(cache):
+    user_clubs = UserClubsCache(cache, ttl_seconds=60)
+    user_clubs.set(5, user_clubs.version(5), [1], '{"total_clubs": 1}')
+
+    user_clubs.invalidate(5)
+
+    assert user_clubs.get(5, user_clubs.version(5)) is None
+
+def test_user_clubs_invalidated_by_write_to_one_of_its_clubs(cache):
+    user_clubs = UserClubsCache(cache, ttl_seconds=60)
+    user_clubs.set(5, user_clubs.version(5), [1, 2], '{"total_clubs": 2}')
+
+    cache.invalidate(3)  # someone else's club
+    assert user_clubs.get(5, user_clubs.version(5)) is not None
+
+    cache.invalidate(2)  # e.g. a member left club 2
+    assert user_clubs.get(5, user_clubs.version(5)) is None
+
+def test_user_without_clubs_is_cached(cache):
+    user_clubs = UserClubsCache(cache, ttl_seconds=60)
+    etag = user_clubs.set(5, user_clubs.version(5), [], '{"total_clubs": 0}')
+
+    assert user_clubs.get(5, user_clubs.version(5)) == (etag, '{"total_clubs": 0}')
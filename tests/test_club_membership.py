@@ -0,0 +1,193 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql
+
+from app.crud import club as crud_club
+from app.crud.club import claim_seat_statement, release_seat_statement
+from app.models.club import Club
+from app.models.club_join_request import ClubJoinRequest
+from app.models.enums import ClubStatusEnum, RequestStatusEnum
+from app.models.member import Member
+from app.models.user import User
+
+
+def compile_statement(statement):
+    compiled = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True})
+    return str(compiled), compiled.params
+
+def test_claim_seat_only_passes_when_a_seat_is_left():
+    sql, params = compile_statement(claim_seat_statement(7))
+
+    assert sql.endswith("WHERE clubs.id = %(id_1)s AND clubs.member_count < clubs.max_players")
+    assert params["id_1"] == 7
+
+def test_claim_seat_fills_only_active_or_full_clubs():
+    sql, params = compile_statement(claim_seat_statement(7))
+
+    assert "status=CASE WHEN (clubs.status IN (%(status_1_1)s, %(status_1_2)s) " \
+           "AND clubs.member_count + %(member_count_2)s >= clubs.max_players) THEN %(param_1)s ELSE clubs.status END" in sql
+    assert {params["status_1_1"], params["status_1_2"]} == {ClubStatusEnum.ACTIVE, ClubStatusEnum.FULL}
+    assert params["param_1"] == ClubStatusEnum.FULL
+
+def test_release_seat_reopens_only_full_clubs():
+    sql, params = compile_statement(release_seat_statement(7))
+
+    assert "member_count=greatest(clubs.member_count - %(member_count_1)s, %(greatest_1)s)" in sql
+    assert "status=CASE WHEN (clubs.status = %(status_1)s) THEN %(param_1)s ELSE clubs.status END" in sql
+    assert params["status_1"] == ClubStatusEnum.FULL
+    assert params["param_1"] == ClubStatusEnum.ACTIVE
+    assert sql.endswith("WHERE clubs.id = %(id_1)s")
+
+
+class FakeResult:
+    def __init__(self, row=None, rowcount=0):
+        self.row = row
+        self.rowcount = rowcount
+
+    def first(self):
+        return self.row
+
+class FakeQuery:
+    def __init__(self, session, model):
+        self.session = session
+        self.model = model
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        return self.session.rows.get(self.model)
+
+    def update(self, values, synchronize_session=None):
+        self.session.updates.append((self.model, values))
+        return self.session.update_counts.get(self.model, 0)
+
+class FakeSession:
+    """Just enough of a Session for join_club / accept_request, statements are recorded"""
+
+    def __init__(self, rows=None, update_counts=None, results=(), commit_errors=()):
+        self.rows = rows or {}
+        self.commit_errors = list(commit_errors)
+        self.update_counts = update_counts or {}
+        self.results = list(results)
+        self.statements = []
+        self.updates = []
+        self.added = []
+        self.calls = []
+
+    def query(self, model):
+        return FakeQuery(self, model)
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    def commit(self):
+        self.calls.append("commit")
+        if self.commit_errors:
+            raise self.commit_errors.pop(0)
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+@pytest.fixture
+def published(monkeypatch):
+    events = []
+    monkeypatch.setattr(crud_club.sse_manager, "publish", lambda user_id, event: events.append((user_id, event.event_type)))
+    return events
+
+def make_user(user_id, role_id=1):
+    return SimpleNamespace(id=user_id, first_name="Dana", last_name="Levi", role=SimpleNamespace(id=role_id),
+                           avg_skill_rating=3.5, positions=[])
+
+def private_club():
+    return SimpleNamespace(id=7, admin_id=1, is_private=True, member_count=3, max_players=10)
+
+def test_join_private_club_upserts_a_pending_request(published):
+    db = FakeSession(rows={Club: private_club()}, results=[FakeResult(row=(42,))])
+
+    result = crud_club.join_club(db, 7, make_user(2))
+
+    assert result == {"request_status": "pending"}
+    assert db.calls == ["commit"]
+    assert published == [(1, "club:join-request")]
+
+    sql, params = compile_statement(db.statements[0])
+    assert sql.startswith("INSERT INTO club_join_requests (club_id, user_id, status")
+    assert "ON CONFLICT ON CONSTRAINT uq_club_join_requests_club_user DO UPDATE SET " \
+           "status = %(param_1)s, updated_at = now() WHERE club_join_requests.status != %(status_1)s" in sql
+    assert sql.endswith("RETURNING club_join_requests.id")
+    assert params["param_1"] == RequestStatusEnum.PENDING
+    assert params["status_1"] == RequestStatusEnum.PENDING
+
+def test_join_private_club_twice_is_already_pending(published):
+    # the upsert's WHERE skipped the existing pending row, nothing was returned
+    db = FakeSession(rows={Club: private_club()}, results=[FakeResult(row=None)])
+
+    assert crud_club.join_club(db, 7, make_user(2)) == {"request_status": "already_pending"}
+    assert db.calls == ["rollback"]
+    assert published == []
+
+def test_accept_request_marks_it_accepted_takes_a_seat_and_adds_the_member(published):
+    db = FakeSession(
+        rows={Club: private_club(), User: make_user(2)},
+        update_counts={ClubJoinRequest: 1},
+        results=[FakeResult(rowcount=1)]
+    )
+
+    result = crud_club.accept_request(db, 7, make_user(1), 2)
+
+    assert result == {"membership_status": "joined", "user_id": 2, "user_name": "Dana Levi"}
+    assert db.updates == [(ClubJoinRequest, {ClubJoinRequest.status: RequestStatusEnum.ACCEPTED})]
+    assert "UPDATE clubs SET member_count" in compile_statement(db.statements[0])[0]
+    assert [(member.user_id, member.club_id) for member in db.added if isinstance(member, Member)] == [(2, 7)]
+    assert db.calls == ["commit"]
+    assert published == [(1, "club:user-joined"), (2, "club:request-approved")]
+
+def test_accept_without_a_pending_request_is_404(published):
+    db = FakeSession(rows={Club: private_club(), User: make_user(2)}, update_counts={ClubJoinRequest: 0})
+
+    with pytest.raises(HTTPException) as error:
+        crud_club.accept_request(db, 7, make_user(1), 2)
+
+    assert error.value.status_code == 404
+    assert db.statements == [] and db.added == []
+
+def test_accept_into_a_full_club_rolls_the_request_back(published):
+    db = FakeSession(
+        rows={Club: private_club(), User: make_user(2)},
+        update_counts={ClubJoinRequest: 1},
+        results=[FakeResult(rowcount=0)]
+    )
+
+    with pytest.raises(HTTPException) as error:
+        crud_club.accept_request(db, 7, make_user(1), 2)
+
+    assert error.value.status_code == 403
+    assert db.calls == ["rollback"]
+    assert db.added == [] and published == []
+
+def test_accept_after_a_concurrent_join_closes_the_request(published):
+    # the member insert hits uq_members_club_user, the user joined meanwhile
+    db = FakeSession(
+        rows={Club: private_club(), User: make_user(2), Member.id: (99,)},
+        update_counts={ClubJoinRequest: 1},
+        results=[FakeResult(rowcount=1)],
+        commit_errors=[IntegrityError("INSERT INTO members", {}, Exception("duplicate key"))]
+    )
+
+    with pytest.raises(HTTPException) as error:
+        crud_club.accept_request(db, 7, make_user(1), 2)
+
+    assert error.value.status_code == 409
+    # rolled back, then the still pending request is marked accepted on its own
+    assert db.calls == ["commit", "rollback", "commit"]
+    assert db.updates[-1] == (ClubJoinRequest, {ClubJoinRequest.status: RequestStatusEnum.ACCEPTED})
+    assert len(db.updates) == 2
+    assert published == []
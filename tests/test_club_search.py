@@ -0,0 +1,137 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, Session
+
+from app.crud import club as crud_club
+from app.crud.club import escape_like, name_search_filter
+from app.utils.pagination import encode_cursor
+
+
+def compile_sql(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+def test_like_wildcards_are_escaped():
+    assert escape_like("100%_club") == "100\\%\\_club"
+    assert escape_like("a\\b") == "a\\\\b"
+
+def test_plain_name_search_is_the_trigram_ilike_only():
+    sql = compile_sql(name_search_filter("hapoel"))
+
+    assert sql == "clubs.name ILIKE %(name_1)s ESCAPE '\\\\'"
+
+def test_name_filter_matches_the_index_expressions():
+    sql = compile_sql(name_search_filter("hapoel", full_text=True))
+
+    # ix_clubs_name_trgm
+    assert "clubs.name ILIKE" in sql
+    # ix_clubs_search_vector - the regconfig has to be inlined for the index to match
+    assert "to_tsvector('simple'::regconfig, clubs.name || ' ' || clubs.description) @@ plainto_tsquery('simple'::regconfig" in sql
+
+
+@pytest.fixture
+def captured(monkeypatch):
+    """Phase 1 statements of search_clubs, compiled instead of executed"""
+    statements = []
+
+    def fake_all(query):
+        statements.append(compile_sql(query.statement))
+        return []
+
+    monkeypatch.setattr(Query, "all", fake_all)
+    return statements
+
+def run_search(**kwargs):
+    return crud_club.search_clubs(current_user=None, db=Session(), **kwargs)
+
+@pytest.mark.parametrize("sort_by, key_sql, direction", [
+    ("name", "clubs.name", "ASC"),
+    ("created_at", "clubs.created_at", "DESC"),
+    ("members_count", "clubs.member_count", "DESC"),
+])
+def test_keyset_cursor_compares_the_sort_key(captured, sort_by, key_sql, direction):
+    last_key = "2025-01-01T00:00:00+00:00" if sort_by == "created_at" else "Maccabi" if sort_by == "name" else 10
+    cursor = encode_cursor(sort_by, [last_key, 42])
+    operator = "<" if direction == "DESC" else ">"
+
+    run_search(sort_by=sort_by, cursor=cursor)
+
+    sql = captured[0]
+    assert f"({key_sql}, clubs.id) {operator} (" in sql
+    assert "OFFSET" not in sql
+
+def test_relevance_key_is_double_precision_in_order_and_cursor(captured):
+    # similarity() is float4, compared against the float8 from the cursor the last row would repeat
+    cursor = encode_cursor("relevance", [0.3076923191547394, 42])
+
+    run_search(name="hapoel", sort_by="relevance", cursor=cursor)
+
+    sql = re.sub(r"%\(\w+\)s", "?", captured[0])
+    key_sql = "CAST(similarity(clubs.name, ?) AS FLOAT)"
+    assert f"ORDER BY {key_sql} DESC, clubs.id DESC" in sql
+    assert f"({key_sql}, clubs.id) < (?, ?)" in sql
+    # the selected key (what goes into next_cursor) is the cast one too
+    assert sql.count("similarity(") == sql.count("CAST(similarity(")
+
+def located_user(lat=32.08, lng=34.78):
+    return SimpleNamespace(id=1, location={"lat": lat, "lng": lng})
+
+def test_radius_filter_prunes_with_earth_box_then_checks_the_distance(captured):
+    crud_club.search_clubs(current_user=located_user(), db=Session(), radius_km=3)
+
+    sql = re.sub(r"%\(\w+\)s", "?", captured[0])
+    assert "earth_box(ll_to_earth(?, ?), ?) @> ll_to_earth(clubs.lat, clubs.lng)" in sql
+    assert "earth_distance(ll_to_earth(?, ?), ll_to_earth(clubs.lat, clubs.lng)) <= ?" in sql
+
+def test_distance_sort_orders_by_the_indexed_knn_operator(captured):
+    crud_club.search_clubs(current_user=located_user(), db=Session(), sort_by="distance")
+
+    sql = re.sub(r"%\(\w+\)s", "?", captured[0])
+    assert "clubs.lat IS NOT NULL AND clubs.lng IS NOT NULL" in sql
+    assert "ORDER BY ll_to_earth(clubs.lat, clubs.lng) <-> ll_to_earth(?, ?), clubs.id" in sql
+
+@pytest.mark.parametrize("location", [{}, {"lat": 32.08, "lng": None}])
+def test_distance_search_needs_the_user_location(captured, location):
+    user = SimpleNamespace(id=1, location=location)
+
+    with pytest.raises(HTTPException) as error:
+        crud_club.search_clubs(current_user=user, db=Session(), sort_by="distance")
+
+    assert error.value.status_code == 400
+
+@pytest.mark.parametrize("sort_by", ["name", "created_at", "members_count"])
+def test_phase_one_pages_club_ids_without_member_joins(captured, sort_by):
+    run_search(sort_by=sort_by, limit=20)
+
+    sql = captured[0]
+    assert sql.startswith("SELECT clubs.id, ")
+    assert "members" not in sql and "JOIN" not in sql
+    assert "LIMIT %(param_1)s OFFSET %(param_2)s" in sql
+
+def test_phase_two_loads_the_page_in_phase_one_order(monkeypatch):
+    statements = []
+
+    def fake_all(query):
+        statements.append(compile_sql(query.statement))
+        return [SimpleNamespace(id=1), SimpleNamespace(id=3)]  # db order, not the page order
+
+    monkeypatch.setattr(Query, "all", fake_all)
+
+    clubs = crud_club.load_clubs_by_ids(Session(), [3, 2, 1])
+
+    assert [club.id for club in clubs] == [3, 1]  # 2 disappeared in between
+    # members come from a separate selectinload IN query, not a join on the page query
+    assert re.search(r"WHERE clubs.id IN \(__\[POSTCOMPILE_id_\d+\]\)$", statements[0])
+    assert "JOIN members" not in statements[0]
+    assert crud_club.load_clubs_by_ids(Session(), []) == []
+    assert len(statements) == 1
+
+def test_search_only_matches_descriptions_with_full_text(captured):
+    run_search(name="hapoel")
+    run_search(name="hapoel", full_text=True)
+
+    assert "to_tsvector" not in captured[0]
+    assert "to_tsvector" in captured[1]
@@ -0,0 +1,27 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.crud.club import SUMMARY_FIELDS, parse_summary_fields, summary_options
+from app.models.club import Club
+
+
+def test_fields_always_include_id():
+    assert parse_summary_fields("name, member_count") == ["id", "name", "member_count"]
+    assert parse_summary_fields("id,name") == ["id", "name"]
+    assert parse_summary_fields(None) is None
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as error:
+        parse_summary_fields("name,members")
+    assert error.value.status_code == 400
+    assert "members" in error.value.detail
+
+def test_summary_query_selects_columns_only():
+    query = Session().query(Club).options(*summary_options(SUMMARY_FIELDS))
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+
+    assert "JOIN" not in sql
+    assert "clubs.description" not in sql
+    assert "clubs.member_count" in sql
@@ -0,0 +1,36 @@
+from sqlalchemy import UniqueConstraint
+
+from app.models.club import Club
+from app.models.event import Event
+from app.models.game import Game
+from app.models.member import Member
+from scripts.explain_hot_queries import plan_nodes
+
+
+def indexed_columns(model):
+    return {tuple(column.name for column in index.columns) for index in model.__table__.indexes}
+
+def test_members_are_unique_per_club_and_user():
+    unique = [
+        tuple(column.name for column in constraint.columns)
+        for constraint in Member.__table__.constraints
+        if isinstance(constraint, UniqueConstraint)
+    ]
+    assert ("club_id", "user_id") in unique
+
+def test_foreign_key_lookups_are_indexed():
+    assert ("user_id",) in indexed_columns(Member)
+    assert ("admin_id",) in indexed_columns(Club)
+    assert ("club_id",) in indexed_columns(Event)
+    assert ("event_id",) in indexed_columns(Game)
+
+def test_plan_nodes_flattens_the_plan_tree():
+    plan = {
+        "Node Type": "Nested Loop",
+        "Plans": [
+            {"Node Type": "Index Scan", "Index Name": "ix_members_user_id", "Relation Name": "members"},
+            {"Node Type": "Seq Scan", "Relation Name": "clubs"}
+        ]
+    }
+
+    assert plan_nodes(plan) == ["Nested Loop", "Index Scan using ix_members_user_id", "Seq Scan on clubs"]
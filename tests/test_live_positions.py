@@ -0,0 +1,42 @@
+import time
+
+from app.websocket.live_positions import LivePositionStore, haversine_km
+
+
+def test_haversine_known_distance():
+    # Tel Aviv - Jerusalem is roughly 54 km
+    assert 50 < haversine_km(32.0853, 34.7818, 31.7683, 35.2137) < 58
+
+def test_nearby_filters_by_radius_and_sorts_by_distance():
+    store = LivePositionStore(cell_degrees=0.01, ttl_seconds=60)
+    store.update(1, 32.0800, 34.7800)
+    store.update(2, 32.0900, 34.7800)   # ~1.1 km north
+    store.update(3, 32.1300, 34.7800)   # ~5.5 km north
+    store.update(4, 32.0801, 34.7801)   # next to the point
+
+    players = store.nearby(32.0800, 34.7800, radius_km=2, exclude_user_id=1)
+
+    assert [player["user_id"] for player in players] == [4, 2]
+    assert players[0]["distance_km"] < players[1]["distance_km"]
+
+def test_moving_player_changes_cell():
+    store = LivePositionStore(cell_degrees=0.01, ttl_seconds=60)
+    store.update(1, 32.08, 34.78)
+    store.update(1, 31.77, 35.21)
+
+    assert store.nearby(32.08, 34.78, radius_km=1) == []
+    assert [player["user_id"] for player in store.nearby(31.77, 35.21, radius_km=1)] == [1]
+    assert store.stats()["cells"] == 1
+
+def test_stale_positions_are_ignored_and_expired():
+    store = LivePositionStore(cell_degrees=0.01, ttl_seconds=60)
+    store.update(1, 32.08, 34.78, timestamp=time.time() - 120)
+    store.update(2, 32.08, 34.78)
+
+    assert [player["user_id"] for player in store.nearby(32.08, 34.78, radius_km=1)] == [2]
+    assert store.expire() == 1
+    assert store.get(1) is None
+
+    # freed slot is reused
+    store.update(3, 32.08, 34.78)
+    assert store.stats()["slots"] == 2
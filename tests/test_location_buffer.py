@@ -0,0 +1,104 @@
+from typing import Dict, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.cache import principal_cache
+from app.websocket.location_buffer import LocationBuffer, build_bulk_update
+
+
+class Principal(BaseModel):
+    # the bits of UserFull the flush touches
+    id: int
+    location: Dict[str, Optional[float]]
+
+
+def test_bulk_update_is_one_statement():
+    statement, params = build_bulk_update([(1, 32.0, 34.7), (2, 31.7, 35.2)])
+
+    sql = str(statement)
+    assert sql.count("UPDATE users") == 1
+    assert "(:id_0, CAST(:loc_0 AS json)), (:id_1, CAST(:loc_1 AS json))" in sql
+    assert params["id_1"] == 2
+    assert params["loc_0"] == '{"lat": 32.0, "lng": 34.7}'
+
+@pytest.mark.asyncio
+async def test_flush_writes_latest_position_per_user():
+    buffer = LocationBuffer(interval=60)
+    written = []
+    buffer._write_batch = written.append
+
+    buffer.put(1, 32.0, 34.0)
+    buffer.put(2, 31.0, 35.0)
+    buffer.put(1, 32.5, 34.5)
+    await buffer.flush()
+
+    assert sorted(written[0]) == [(1, 32.5, 34.5), (2, 31.0, 35.0)]
+    assert buffer.pending() == 0
+    assert buffer.stats()["coalesced"] == 1
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_positions_for_next_round():
+    buffer = LocationBuffer(interval=60)
+
+    def fail(rows):
+        raise RuntimeError("db down")
+
+    buffer._write_batch = fail
+    buffer.put(1, 32.0, 34.0)
+    await buffer.flush()
+
+    assert buffer.pending() == 1
+    assert buffer.stats()["failed_flushes"] == 1
+
+@pytest.mark.asyncio
+async def test_position_that_keeps_failing_is_dropped():
+    buffer = LocationBuffer(interval=60, max_retries=3)
+    attempts = []
+
+    def fail(rows):
+        attempts.append(rows)
+        raise RuntimeError("permanent error")
+
+    buffer._write_batch = fail
+    buffer.put(1, 32.0, 34.0)
+    for _ in range(5):
+        await buffer.flush()
+
+    assert len(attempts) == 3
+    assert buffer.pending() == 0
+    assert buffer.stats()["dropped"] == 1
+
+@pytest.mark.asyncio
+async def test_new_position_resets_the_retries():
+    buffer = LocationBuffer(interval=60, max_retries=2)
+
+    def fail(rows):
+        raise RuntimeError("db down")
+
+    buffer._write_batch = fail
+    buffer.put(1, 32.0, 34.0)
+    await buffer.flush()
+    buffer.put(1, 32.1, 34.1)
+    await buffer.flush()
+
+    assert buffer.pending() == 1
+    assert buffer.stats()["dropped"] == 0
+
+@pytest.mark.asyncio
+async def test_flush_moves_the_cached_principal_instead_of_evicting_it():
+    buffer = LocationBuffer(interval=60)
+    buffer._write_batch = lambda rows: None
+    principal = Principal(id=991, location={"lat": None, "lng": None})
+    principal_cache.set(991, principal)
+    try:
+        buffer.put(991, 32.0, 34.0)
+        await buffer.flush()
+
+        moved = principal_cache.peek(991)
+        assert moved.location == {"lat": 32.0, "lng": 34.0}
+        # a request holding the cached principal doesn't see it change under it
+        assert moved is not principal
+        assert principal.location == {"lat": None, "lng": None}
+    finally:
+        principal_cache.invalidate(991)
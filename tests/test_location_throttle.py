@@ -0,0 +1,34 @@
+from app.websocket.throttle import LocationThrottle, ACCEPTED, NOT_MOVED, RATE_LIMITED, TOO_SOON
+
+
+def test_updates_within_min_interval_are_suppressed():
+    throttle = LocationThrottle(min_interval=1.0, min_distance_m=0, max_per_second=100)
+
+    assert throttle.check(32.08, 34.78, now=0.0) == ACCEPTED
+    assert throttle.check(32.09, 34.78, now=0.5) == TOO_SOON
+    assert throttle.check(32.09, 34.78, now=1.2) == ACCEPTED
+
+def test_small_moves_are_suppressed():
+    throttle = LocationThrottle(min_interval=0, min_distance_m=10, max_per_second=100)
+
+    assert throttle.check(32.08, 34.78, now=0.0) == ACCEPTED
+    assert throttle.check(32.08003, 34.78, now=2.0) == NOT_MOVED   # ~3 m
+    assert throttle.check(32.0803, 34.78, now=4.0) == ACCEPTED     # ~33 m
+
+def test_rate_limit_per_second():
+    throttle = LocationThrottle(min_interval=0, min_distance_m=0, max_per_second=3)
+
+    decisions = [throttle.check(32.08 + index, 34.78, now=index * 0.1) for index in range(5)]
+
+    assert decisions.count(RATE_LIMITED) == 2
+    assert throttle.check(32.5, 34.78, now=1.5) == ACCEPTED
+    assert throttle.suppressed == 2
+
+def test_jittery_1hz_client_is_not_dropped_with_the_default_interval():
+    from app.core.config import settings
+
+    throttle = LocationThrottle(min_interval=settings.LOCATION_MIN_INTERVAL_SECONDS, min_distance_m=0, max_per_second=5)
+    now = 0.0
+    for index, gap in enumerate([0.0, 0.9, 1.1, 0.85, 1.0, 0.9]):
+        now += gap
+        assert throttle.check(32.08 + index * 0.001, 34.78, now=now) == ACCEPTED
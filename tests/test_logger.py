@@ -0,0 +1,26 @@
+import json
+import logging
+
+from app.core.logger import JsonFormatter, SamplingFilter
+
+
+def make_record(name="app.api.deps", level=logging.INFO, msg="User %s authenticated", args=(7,), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter().format(make_record(request_id="abc"))
+    entry = json.loads(line)
+
+    assert entry["message"] == "User 7 authenticated"
+    assert entry["logger"] == "app.api.deps"
+    assert entry["level"] == "INFO"
+    assert entry["request_id"] == "abc"
+
+def test_sampling_only_applies_to_info_of_sampled_loggers():
+    sampler = SamplingFilter(rate=0.0, logger_names=["app.api.deps"])
+
+    assert not sampler.filter(make_record())
+    assert sampler.filter(make_record(level=logging.WARNING))
+    assert sampler.filter(make_record(name="app.crud.club"))
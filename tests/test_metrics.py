@@ -0,0 +1,123 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import (
+    MetricsRegistry, RequestStats, current_request_stats, instrument_engine, label_set, record_request
+)
+
+
+def test_histogram_renders_prometheus_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "test", (0.1, 1.0))
+    latency.observe(0.05, route="/clubs/{club_id}")
+    latency.observe(0.5, route="/clubs/{club_id}")
+    registry.gauge("open_streams", "test", lambda: {label_set(kind="sse"): 3})
+
+    output = registry.render()
+
+    assert 'latency_seconds_bucket{route="/clubs/{club_id}",le="0.1"} 1' in output
+    assert 'latency_seconds_bucket{route="/clubs/{club_id}",le="+Inf"} 2' in output
+    assert 'latency_seconds_count{route="/clubs/{club_id}"} 2' in output
+    assert 'open_streams{kind="sse"} 3' in output
+
+def test_queries_are_counted_per_request():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    stats = RequestStats()
+    token = current_request_stats.set(stats)
+    try:
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+    finally:
+        current_request_stats.reset(token)
+
+    assert stats.queries == 3
+    assert stats.statements["SELECT 1"] == 3
+
+def test_failing_statement_does_not_leak_its_start_time():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    stats = RequestStats()
+    token = current_request_stats.set(stats)
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(Exception):
+                connection.execute(text("SELECT * FROM missing_table"))
+            connection.execute(text("SELECT 1"))
+            assert "query_start_time" not in connection.info
+    finally:
+        current_request_stats.reset(token)
+
+    assert stats.queries == 2
+    assert stats.statements["SELECT * FROM missing_table"] == 1
+    assert stats.statements["SELECT 1"] == 1
+
+def test_many_queries_are_flagged_as_n_plus_one(caplog):
+    stats = RequestStats()
+    stats.queries = 50
+    stats.statements["SELECT * FROM members WHERE club_id = ?"] = 49
+
+    with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+        record_request("GET", "/clubs/my-clubs", 200, 0.2, stats)
+
+    assert "Possible N+1 on GET /clubs/my-clubs" in caplog.text
+
+def test_counter_value_per_label_set():
+    registry = MetricsRegistry()
+    dropped = registry.counter("dropped_total", "test")
+    dropped.inc(policy="drop_oldest")
+    dropped.inc(3, policy="disconnect")
+
+    assert dropped.value(policy="drop_oldest") == 1
+    assert dropped.value(policy="disconnect") == 3
+    assert dropped.value(policy="coalesce") == 0
+    assert 'dropped_total{policy="disconnect"} 3' in registry.render()
+
+@pytest.fixture
+def health_client(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.api.deps import get_current_user
+    from app.core.database import get_session
+    from app.main import app
+
+    role = {"id": 1}
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=7, role_id=role["id"])
+    app.dependency_overrides[get_session] = lambda: None
+    yield TestClient(app), role
+    app.dependency_overrides.pop(get_current_user, None)
+    app.dependency_overrides.pop(get_session, None)
+
+def test_sse_stats_are_admin_only(health_client):
+    client, role = health_client
+    assert client.get("/health/sse", headers={"Authorization": "Bearer user"}).status_code == 403
+
+    role["id"] = 5
+    response = client.get("/health/sse", headers={"Authorization": "Bearer admin"})
+    assert response.status_code == 200
+    assert "connections" in response.json()
+
+def test_metrics_need_the_scrape_token_or_an_admin(health_client, monkeypatch):
+    from app.core.config import settings
+
+    from app.api import deps
+
+    client, role = health_client
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    # the scrape token is checked before the user, so get_current_user is called directly
+    async def current_user(credentials, db):
+        return SimpleNamespace(id=7, role_id=role["id"])
+    monkeypatch.setattr(deps, "get_current_user", current_user)
+
+    assert client.get("/metrics").status_code in (401, 403)
+    assert client.get("/metrics", headers={"Authorization": "Bearer user"}).status_code == 403
+    scraped = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert scraped.status_code == 200
+    assert "# TYPE sse_dropped_events_total counter" in scraped.text
+
+    role["id"] = 5
+    assert client.get("/metrics", headers={"Authorization": "Bearer admin"}).status_code == 200
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import WebSocketRoute
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.websocket import location
+
+
+@pytest.fixture
+def nearby_client(monkeypatch):
+    monkeypatch.setattr(location, "verify_token", lambda token: "5" if token == "ok" else None)
+    # club 1: user 5 is a member, club 2: user 5 isn't
+    monkeypatch.setattr(location, "get_club_coordinates", lambda club_id, user_id: ((32.08, 34.78), club_id == 1))
+
+    async def endpoint(websocket):
+        await location.club_nearby_players(
+            websocket,
+            int(websocket.path_params["club_id"]),
+            websocket.query_params.get("token", ""),
+            float(websocket.query_params.get("radius_km", "2"))
+        )
+
+    app = Starlette(routes=[WebSocketRoute("/nearby/{club_id}", endpoint)])
+    return TestClient(app)
+
+def close_code(client, url):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect(url) as websocket:
+            websocket.receive_json()
+    return closed.value.code
+
+@pytest.mark.parametrize("radius", ["0", "-1", "50.5", "nan"])
+def test_radius_out_of_bounds_is_rejected(nearby_client, radius):
+    assert close_code(nearby_client, f"/nearby/1?token=ok&radius_km={radius}") == 4000
+
+def test_non_member_can_not_watch_the_club(nearby_client):
+    assert close_code(nearby_client, "/nearby/2?token=ok") == 4003
+
+def test_member_gets_the_players_snapshot(nearby_client):
+    with nearby_client.websocket_connect("/nearby/1?token=ok&radius_km=50") as websocket:
+        message = websocket.receive_json()
+
+    assert message["club_id"] == 1
+    assert message["radius_km"] == 50
+
+@pytest.mark.asyncio
+async def test_listener_errors_are_logged(caplog):
+    async def broken():
+        raise RuntimeError("reader blew up")
+
+    async def disconnected():
+        raise WebSocketDisconnect(1000)
+
+    for reader in (broken, disconnected):
+        task = asyncio.create_task(reader())
+        await asyncio.wait({task})
+        location.log_listener_error(task)
+
+    errors = [record.getMessage() for record in caplog.records if record.levelname == "ERROR"]
+    assert errors == ["❌ Club nearby WebSocket reader failed: reader blew up"]
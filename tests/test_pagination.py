@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user
+from app.core.database import get_session
+from app.crud.user import get_all_users
+from app.main import app
+from app.utils.pagination import encode_cursor, decode_cursor, parse_datetime
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("name", ["Maccabi Haifa", 42])
+    assert decode_cursor(cursor, "name", size=2) == ["Maccabi Haifa", 42]
+
+def test_datetime_key_round_trip():
+    created_at = datetime(2025, 5, 27, 18, 58, tzinfo=timezone.utc)
+    last_key, last_id = decode_cursor(encode_cursor("created_at", [created_at, 7]), "created_at", size=2)
+    assert parse_datetime(last_key) == created_at
+    assert last_id == 7
+
+def test_cursor_for_another_sort_is_rejected():
+    cursor = encode_cursor("name", ["a", 1])
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, "distance", size=2)
+    assert exc.value.status_code == 400
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", encode_cursor("id", [1, 2])])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, "id", size=1)
+    assert exc.value.status_code == 400
+
+def test_empty_page_does_not_touch_the_db():
+    # the endpoint rejects limit < 1, the crud function still mustn't index an empty page
+    assert get_all_users(db=None, limit=0) == ([], None)
+
+@pytest.fixture
+def users_client():
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(email="test@example.com")
+    app.dependency_overrides[get_session] = lambda: None
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_current_user, None)
+    app.dependency_overrides.pop(get_session, None)
+
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": -1}, {"limit": 1001}, {"skip": -1}])
+def test_users_page_bounds_are_validated(users_client, params):
+    response = users_client.get("/users/", params=params)
+    assert response.status_code == 422
@@ -0,0 +1,83 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.utils.password_pool import PasswordPool
+from app.utils import password_hashing
+
+
+@pytest.fixture
+def fast_bcrypt(monkeypatch):
+    # low work factor so the tests don't spend seconds in bcrypt
+    monkeypatch.setattr(password_hashing, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=5))
+
+@pytest.mark.asyncio
+async def test_rehash_when_work_factor_was_raised(fast_bcrypt):
+    pool = PasswordPool(max_workers=0)
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret123")
+
+    valid, new_hash = await pool.verify_and_update("secret123", old_hash)
+    assert valid
+    assert new_hash is not None and "$05$" in new_hash
+
+    valid, new_hash = await pool.verify_and_update("secret123", new_hash)
+    assert valid and new_hash is None
+
+    assert (await pool.verify_and_update("wrong", old_hash)) == (False, None)
+
+@pytest.mark.asyncio
+async def test_process_pool_hashes_and_verifies():
+    pool = PasswordPool(max_workers=1, max_queue=4)
+    try:
+        hashed = await pool.hash("secret123")
+        valid, _ = await pool.verify_and_update("secret123", hashed)
+        assert valid
+    finally:
+        pool.shutdown()
+
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_with_503():
+    pool = PasswordPool(max_workers=1, max_queue=0)
+    try:
+        results = await asyncio.gather(
+            pool.hash("first"), pool.hash("second"), return_exceptions=True
+        )
+    finally:
+        pool.shutdown()
+
+    rejected = [result for result in results if isinstance(result, HTTPException)]
+    assert len(rejected) == 1
+    assert rejected[0].status_code == 503
+    assert pool.stats()["rejected"] == 1
+
+def test_login_returns_a_real_503_with_retry_after(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.core.database import get_session
+    from app.crud import user_async
+    from app.main import app
+
+    async def saturated(db, email, password):
+        raise HTTPException(status_code=503, detail="Server is busy, please try again", headers={"Retry-After": "1"})
+
+    monkeypatch.setattr(user_async, "login", saturated)
+    app.dependency_overrides[get_session] = lambda: None
+    try:
+        response = TestClient(app).post("/users/login", json={"email": "a@example.com", "password": "secret123"})
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_worker_module_does_not_import_logging_or_cache():
+    # what a spawned worker imports to unpickle the job
+    code = (
+        "import sys, app.utils.password_hashing; "
+        "print(sorted(m for m in ('app.core.logger', 'app.core.cache') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from app.models.club import Club
+from app.models.event import Event
+from app.models.user import User
+from app.schemas.club import ClubSummary
+from app.schemas.user import UserFull
+from scripts.seed_bulk import generate_clubs, generate_users
+
+
+def seed_ctx():
+    return {
+        "seed": 13,
+        "password_hash": "$2b$12$" + "x" * 53,
+        "reference_date": datetime(2026, 1, 1),
+        "users": 20,
+        "clubs": 2,
+        "admin_stride": 10,
+        "members_per_club": 5,
+        "max_players_choices": (25,),
+        "member_stride": 25,
+        "private_ratio": 0.5,
+        "requests_per_private_club": 2,
+        "events_per_club": 1,
+        "games_per_event": 1,
+        "user_role_id": 1,
+        "premium_role_id": 2,
+        "user_base": 1, "club_base": 1, "member_base": 1, "request_base": 1, "event_base": 1, "game_base": 1
+    }
+
+def first_row(tables, model):
+    columns, rows = tables[model]
+    return dict(zip(columns, rows[0]))
+
+def test_seeded_user_validates_as_user_full():
+    row = first_row(generate_users(seed_ctx(), 0, 0, 3), User)
+    role = {"id": row["role_id"], "name": "user", "max_clubs": 0, "max_players": 0, "cost": 0.0}
+
+    user = UserFull.model_validate({**row, "role": role, "updated_at": None,
+                                    "subscription_start_date": None, "subscription_end_date": None})
+
+    assert user.image == "default-profile.jpg"
+
+def test_seeded_club_validates_as_club_summary():
+    tables = generate_clubs(seed_ctx(), 0, 0, 2)
+
+    club = ClubSummary.model_validate(first_row(tables, Club))
+
+    assert club.image == "default-club.jpg"
+    assert first_row(tables, Event)["image"] == "default-event.jpg"
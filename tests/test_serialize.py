@@ -0,0 +1,50 @@
+import json
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.crud.club import serialize_clubs
+from app.models.club import Club
+from app.models.enums import SportCategoryEnum, ClubStatusEnum
+from app.models.member import Member
+from app.models.user import User
+from app.utils.response import json_response, success_response
+
+
+def make_club(club_id: int, members: int, captains_ids: list) -> Club:
+    club_members = []
+    for index in range(1, members + 1):
+        user = User(
+            id=index, first_name="Player", last_name=str(index), image="p.jpg",
+            email=f"p{index}@example.com", phone={"prefix": "+972", "number": "050"}
+        )
+        club_members.append(Member(
+            id=index, club_id=club_id, user_id=index, user=user, total_goals=0,
+            total_assists=0, total_games=0, skill_rating=None, positions=[]
+        ))
+    club = Club(
+        id=club_id, name=f"Club {club_id}", description="", image="c.jpg", admin_id=1,
+        sport_category=SportCategoryEnum.FOOTBALL, is_private=False, max_players=30,
+        member_count=members, status=ClubStatusEnum.ACTIVE, location={"lat": 32.0, "lng": 34.7},
+        captains_ids=captains_ids, created_at=datetime(2025, 1, 1)
+    )
+    set_committed_value(club, "admin", None)
+    set_committed_value(club, "members", club_members)
+    set_committed_value(club, "pending_join_requests", [])
+    return club
+
+def test_serialize_clubs_picks_captains():
+    clubs = serialize_clubs([make_club(1, 5, [2, 4]), make_club(2, 3, [])])
+
+    assert [captain.id for captain in clubs[0].captains] == [2, 4]
+    assert clubs[1].captains == []
+    assert len(clubs[0].members) == 5
+    assert clubs[0].member_count == 5
+
+def test_json_response_matches_jsonable_encoder():
+    clubs = serialize_clubs([make_club(1, 3, [1])])
+
+    response = json_response(data=clubs, message="ok", next_cursor=None)
+
+    assert json.loads(response.body) == jsonable_encoder(success_response(data=clubs, message="ok", next_cursor=None))
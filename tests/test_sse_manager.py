@@ -0,0 +1,208 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.sse_backends import InMemoryBackend, PostgresNotifyBackend
+from app.core.sse_manager import ReplayBuffer, SSEManager, SSEEvent, sse_dropped_events
+
+
+@pytest.mark.asyncio
+async def test_send_to_user_reaches_every_connection():
+    manager = SSEManager(InMemoryBackend())
+    first = await manager.connect(1)
+    second = await manager.connect(1)
+
+    await manager.send_to_user(1, SSEEvent(event_type="club:user-joined", data={"club_id": 3}))
+
+    for connection in (first, second):
+        event = await connection.get()
+        assert event.event_type == "club:user-joined"
+        assert event.data == {"club_id": 3}
+
+@pytest.mark.asyncio
+async def test_publish_from_worker_thread():
+    manager = SSEManager(InMemoryBackend())
+    await manager.start()
+    connection = await manager.connect(1)
+
+    # sync CRUD code runs in the threadpool and has no running loop
+    event = SSEEvent(event_type="club:join-request", data={})
+    await asyncio.to_thread(manager.publish, 1, event)
+
+    received = await asyncio.wait_for(connection.get(), timeout=1)
+    assert received.event_type == "club:join-request"
+    await manager.stop()
+
+@pytest.mark.asyncio
+async def test_postgres_notifications_are_delivered_in_batches():
+    backend = PostgresNotifyBackend(dsn="postgresql://unused", channel="test", batch_interval=0.01)
+    batches = []
+
+    async def deliver(batch):
+        batches.append(batch)
+
+    backend.attach(deliver)
+    for user_id in (1, 2, 1):
+        payload = json.dumps({"user_id": user_id, "event": SSEEvent(event_type="ping", data={}).to_dict()})
+        backend._on_notify(None, 0, "test", payload)
+
+    await asyncio.sleep(0.05)
+    assert len(batches) == 1
+    assert [user_id for user_id, _ in batches[0]] == [1, 2, 1]
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_newest_events():
+    manager = SSEManager(InMemoryBackend(), queue_maxsize=2, overflow_policy="drop_oldest")
+    connection = await manager.connect(1)
+
+    for index in range(4):
+        await manager.send_to_user(1, SSEEvent(event_type="ping", data={"n": index}))
+
+    assert [(await connection.get()).data["n"] for _ in range(2)] == [2, 3]
+    assert connection.stats()["dropped"] == 2
+
+@pytest.mark.asyncio
+async def test_coalesce_replaces_same_event_type():
+    manager = SSEManager(InMemoryBackend(), queue_maxsize=2, overflow_policy="coalesce")
+    connection = await manager.connect(1)
+
+    await manager.send_to_user(1, SSEEvent(event_type="club:join-request", data={"n": 0}))
+    await manager.send_to_user(1, SSEEvent(event_type="club:user-joined", data={"n": 1}))
+    await manager.send_to_user(1, SSEEvent(event_type="club:join-request", data={"n": 2}))
+
+    received = [(await connection.get()) for _ in range(2)]
+    assert [(event.event_type, event.data["n"]) for event in received] == [
+        ("club:user-joined", 1), ("club:join-request", 2)
+    ]
+    assert connection.stats()["coalesced"] == 1
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_closes_slow_consumer():
+    manager = SSEManager(InMemoryBackend(), queue_maxsize=1, overflow_policy="disconnect")
+    slow = await manager.connect(1)
+
+    await manager.send_to_user(1, SSEEvent(event_type="ping", data={}))
+    await manager.send_to_user(1, SSEEvent(event_type="ping", data={}))
+
+    assert slow.closed
+    assert await slow.get() is None
+    assert manager.get_connected_users() == []
+    assert manager.get_stats()["disconnected_slow_consumers"] == 1
+
+@pytest.mark.asyncio
+async def test_dropped_events_counter_outlives_the_stream():
+    manager = SSEManager(InMemoryBackend(), queue_maxsize=1, overflow_policy="drop_oldest")
+    before = sse_dropped_events.value(policy="drop_oldest")
+    connection = await manager.connect(1)
+
+    for index in range(3):
+        await manager.send_to_user(1, SSEEvent(event_type="ping", data={"n": index}))
+    await manager.disconnect(1, connection)
+
+    assert manager.get_stats()["dropped_events"] == 0  # open streams only
+    assert sse_dropped_events.value(policy="drop_oldest") - before == 2
+
+@pytest.mark.asyncio
+async def test_events_get_increasing_ids():
+    manager = SSEManager(InMemoryBackend())
+    connection = await manager.connect(1)
+
+    await manager.send_to_user(1, SSEEvent(event_type="ping", data={}))
+    await manager.send_to_user(1, SSEEvent(event_type="ping", data={}))
+
+    first, second = await connection.get(), await connection.get()
+    assert second.id > first.id
+    assert first.to_sse_format().startswith(f"id: {first.id}\n")
+
+@pytest.mark.asyncio
+async def test_reconnect_replays_events_after_last_event_id():
+    manager = SSEManager(InMemoryBackend())
+    connection = await manager.connect(1)
+    await manager.send_to_user(1, SSEEvent(event_type="ping", data={"n": 0}))
+    seen = await connection.get()
+    await manager.disconnect(1, connection)
+
+    # emitted while the client was reconnecting
+    await manager.send_to_user(1, SSEEvent(event_type="ping", data={"n": 1}))
+    await manager.send_to_user(1, SSEEvent(event_type="ping", data={"n": 2}))
+
+    resumed = await manager.connect(1, last_event_id=seen.id)
+    assert [(await resumed.get()).data["n"] for _ in range(2)] == [1, 2]
+
+@pytest.mark.asyncio
+async def test_replay_gap_asks_client_to_resync():
+    manager = SSEManager(InMemoryBackend())
+    manager._replay.size = 2
+    await manager.send_to_user(1, SSEEvent(event_type="ping", data={"n": 0}))
+    for index in range(1, 4):
+        await manager.send_to_user(1, SSEEvent(event_type="ping", data={"n": index}))
+
+    resumed = await manager.connect(1, last_event_id=1)
+    assert (await resumed.get()).event_type == "stream:resync"
+    # the client refetches its state, the partial replay isn't sent
+    assert resumed.stats()["depth"] == 0
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy", ["drop_oldest", "disconnect"])
+async def test_resync_survives_a_full_buffer(policy):
+    # replay ring as big as the stream buffer (the defaults), a gap plus a full replay behind it
+    manager = SSEManager(InMemoryBackend(), queue_maxsize=3, overflow_policy=policy)
+    manager._replay.size = 3
+    for index in range(6):
+        await manager.send_to_user(1, SSEEvent(event_type="ping", data={"n": index}))
+
+    resumed = await manager.connect(1, last_event_id=1)
+    assert not resumed.closed
+    assert (await resumed.get()).event_type == "stream:resync"
+
+    # live events after the resync still go through the overflow policy, the marker isn't evicted by them
+    for index in range(2):
+        await manager.send_to_user(1, SSEEvent(event_type="ping", data={"n": 10 + index}))
+    assert [(await resumed.get()).data["n"] for _ in range(2)] == [10, 11]
+
+@pytest.mark.asyncio
+async def test_replay_larger_than_the_buffer_is_a_resync():
+    manager = SSEManager(InMemoryBackend(), queue_maxsize=2, overflow_policy="disconnect")
+    first = None
+    for index in range(4):
+        event = SSEEvent(event_type="ping", data={"n": index})
+        await manager.send_to_user(1, event)
+        first = first or event
+
+    resumed = await manager.connect(1, last_event_id=first.id)  # 3 missed, room for 2
+    assert not resumed.closed
+    assert (await resumed.get()).event_type == "stream:resync"
+
+def test_replay_follows_arrival_order_not_id_order():
+    replay = ReplayBuffer(size=10)
+    # 20 was published (sequence) before 30 but its NOTIFY landed after it
+    for event_id in (10, 30, 20, 40):
+        replay.append(1, SSEEvent(event_type="ping", data={}, id=event_id))
+
+    missed, gap = replay.since(1, 30)
+    assert [event.id for event in missed] == [20, 40]
+    assert not gap
+
+@pytest.mark.asyncio
+async def test_started_postgres_backend_takes_ids_from_the_sequence():
+    executed = []
+
+    class FakePool:
+        async def execute(self, sql, *args):
+            executed.append((sql, args))
+
+    backend = PostgresNotifyBackend(dsn="postgresql://unused", channel="test")
+    manager = SSEManager(backend)
+    assert backend.assigns_event_ids is False  # not started, falls back to local ids
+
+    backend._publish_pool = FakePool()
+    event = SSEEvent(event_type="ping", data={})
+    await manager.send_to_user(1, event)
+    await manager.send_to_user(1, SSEEvent(event_type="ping", data={}, id=7))
+
+    assert event.id is None  # assigned by postgres, not by this worker's clock
+    (first_sql, first_args), (second_sql, _) = executed
+    assert "nextval($3::regclass)" in first_sql and first_args[2] == "sse_event_ids"
+    assert json.loads(first_args[1])["event"]["id"] is None
+    assert second_sql == "SELECT pg_notify($1, $2)"
@@ -0,0 +1,50 @@
+import hashlib
+import time
+
+import pytest
+from jose import jwt
+
+from app.core.config import settings
+from app.utils import security
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    security.token_cache.clear()
+    yield
+    security.token_cache.clear()
+
+def make_token(sub: str, expires_in: float) -> str:
+    return jwt.encode({"sub": sub, "exp": int(time.time() + expires_in)}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+def test_verified_token_is_cached():
+    token = make_token("7", 3600)
+
+    assert security.verify_token(token) == "7"
+    assert len(security.token_cache) == 1
+    assert security.verify_token(token) == "7"
+    assert security.token_cache.stats()["hits"] == 1
+
+def test_cached_entry_for_another_token_is_not_trusted():
+    token = make_token("7", 3600)
+    other = make_token("8", 3600)
+    # simulate a digest collision: other's slot holds token 7
+    security.token_cache.set(hashlib.sha256(other.encode()).digest(), (token, "7", time.time() + 3600))
+
+    assert security.verify_token(other) == "8"
+
+def test_expired_cached_token_is_rejected():
+    token = make_token("7", 3600)
+    security.token_cache.set(hashlib.sha256(token.encode()).digest(), (token, "7", time.time() - 1))
+
+    # falls back to a full decode, which is still valid here
+    assert security.verify_token(token) == "7"
+    assert security.verify_token(make_token("9", -10)) is None
+
+def test_hmac_backend_matches_jose():
+    token = make_token("7", 3600)
+
+    assert security.decode_token(token, "hmac")["sub"] == "7"
+    assert security.decode_token(token[:-2] + "xx", "hmac") is None
+    assert security.decode_token(make_token("7", -10), "hmac") is None
+    assert security.decode_token("not-a-token", "hmac") is None